@@ -0,0 +1,58 @@
+import os
+import sys
+import time
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sto_records import records_from_dicts  # noqa: E402
+from sto_snapshot import read_snapshot, write_snapshot  # noqa: E402
+from dataset import generate_data  # noqa: E402
+
+
+def best_of(repeat, func):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Порівняння швидкості JSON та бінарного знімка даних СТО.")
+    parser.add_argument("--vehicles", type=int, default=25000)
+    parser.add_argument("--orders", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    data = records_from_dicts(generate_data(args.vehicles, args.orders))
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for snapshot_format in ("json", "binary"):
+            path = os.path.join(tmp_dir, f"sto_data.{snapshot_format}")
+            save_time = best_of(args.repeat, lambda: write_snapshot(data, path, snapshot_format))
+            load_time = best_of(args.repeat, lambda: read_snapshot(path))
+            results[snapshot_format] = (save_time, load_time, os.path.getsize(path))
+
+        for snapshot_format in ("json", "binary"):
+            loaded, _ = read_snapshot(os.path.join(tmp_dir, f"sto_data.{snapshot_format}"))
+            assert {table: {key: record.to_row() for key, record in records.items()}
+                    for table, records in loaded.items()} == \
+                   {table: {key: record.to_row() for key, record in records.items()}
+                    for table, records in data.items()}, f"знімок {snapshot_format} не збігається з вихідними даними"
+
+    print(f"Транспортних засобів: {args.vehicles}, заявок: {args.orders}")
+    print(f"{'Формат':<8} {'Збереження, с':>14} {'Завантаження, с':>16} {'Розмір, МБ':>11}")
+    for snapshot_format, (save_time, load_time, size) in results.items():
+        print(f"{snapshot_format:<8} {save_time:>14.3f} {load_time:>16.3f} {size / 1024 / 1024:>11.1f}")
+
+    json_save, json_load, _ = results["json"]
+    binary_save, binary_load, _ = results["binary"]
+    print(f"Прискорення: збереження x{json_save / binary_save:.1f}, завантаження x{json_load / binary_load:.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,261 @@
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import platform
+import tempfile
+import datetime
+import contextlib
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sto_system import STOManagementSystem  # noqa: E402
+from dataset import SCALES, BRANDS, scale_size, write_dataset  # noqa: E402
+
+
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+# Назва сховища -> (файл даних, параметри STOManagementSystem).
+STORAGES = {
+    "json": ("sto_data.json", {}),
+    "json-journal": ("sto_data.json", {"journal": True}),
+    "binary": ("sto_data.bin", {}),
+    "sqlite": ("sto_data.db", {}),
+}
+PAYMENT_FILTERS = {"paid": "Оплачено", "unpaid": "Не оплачено"}
+
+
+def measure(func, args_list, budget):
+    # Викликає func для кожного набору аргументів, поки не вичерпано бюджет часу
+    # (але щонайменше один раз), і повертає статистику по окремих викликах.
+    timings = []
+    started = time.perf_counter()
+    for args in args_list:
+        start = time.perf_counter()
+        func(*args)
+        timings.append(time.perf_counter() - start)
+        if time.perf_counter() - started > budget:
+            break
+    timings.sort()
+    return {
+        "calls": len(timings),
+        "mean": sum(timings) / len(timings),
+        "median": timings[len(timings) // 2],
+        "p95": timings[min(len(timings) - 1, int(len(timings) * 0.95))],
+        "min": timings[0],
+        "max": timings[-1]
+    }
+
+
+def vehicle_filter_cases(brand, model, owner, reg_number):
+    # Кортежі аргументів get_vehicles(brand, model, payment, owner, reg).
+    cases = {}
+    for use_brand in (False, True):
+        for use_model in (False, True):
+            for payment in (None, "paid", "unpaid"):
+                name = "+".join(part for part, used in (("brand", use_brand), ("model", use_model)) if used)
+                if payment:
+                    name = f"{name}+payment={payment}" if name else f"payment={payment}"
+                cases[f"get_vehicles[{name or 'all'}]"] = (brand if use_brand else None,
+                                                           model if use_model else None,
+                                                           PAYMENT_FILTERS.get(payment), None, None)
+    cases["get_vehicles[owner]"] = (None, None, None, owner, None)
+    cases["get_vehicles[reg]"] = (None, None, None, None, reg_number)
+    # Запит, коротший за триграму, у SQLite іде повз повнотекстовий індекс.
+    cases["get_vehicles[reg-short]"] = (None, None, None, None, reg_number[-2:])
+    return cases
+
+
+def check(result):
+    ok, message = result
+    if not ok:
+        raise RuntimeError(message)
+
+
+def run_scale(scale, storage, ops, budget, seed, cache_size=0):
+    vehicles_count, orders_count = scale_size(scale)
+    rng = random.Random(seed)
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        file_name, options = STORAGES[storage]
+        data_file = os.path.join(tmp_dir, file_name)
+        data = write_dataset(data_file, vehicles_count, orders_count, seed)
+        vehicle_ids = [record["id"] for record in data["vehicles"].values()]
+        unpaid_ids = [record["id"] for record in data["repair_orders"].values() if record.status == "Не оплачено"]
+        order_ids = [record["id"] for record in data["repair_orders"].values()]
+        del data
+
+        system = STOManagementSystem(data_file, cache_size=cache_size, **options)
+        try:
+            results["load_data"] = measure(system.load_data, [()] * ops, budget)
+
+            for name, filters in vehicle_filter_cases(BRANDS[1], "Model 7", "Власник 7", "AA000007").items():
+                results[name] = measure(system.get_vehicles, [filters] * ops, budget)
+            results["get_repair_orders"] = measure(system.get_repair_orders, [()] * ops, budget)
+            results["get_repair_orders[vehicle]"] = measure(
+                system.get_repair_orders, [(rng.choice(vehicle_ids),) for _ in range(ops)], budget)
+            # Перший виклик будує стовпчики, решта працюють з кешем до наступної зміни даних.
+            results["get_revenue[month]"] = measure(system.get_revenue, [("month",)] * ops, budget)
+            results["get_revenue[day]"] = measure(system.get_revenue, [("day",)] * ops, budget)
+            results["get_receivables_ageing"] = measure(system.get_receivables_ageing, [()] * ops, budget)
+            results["get_totals_by_work_type"] = measure(system.get_totals_by_work_type, [()] * ops, budget)
+            results["get_totals_by_brand"] = measure(system.get_totals_by_brand, [()] * ops, budget)
+
+            def generate_invoice(order_id):
+                check(system.generate_invoice(order_id))
+
+            results["generate_invoice"] = measure(
+                generate_invoice, [(rng.choice(order_ids),) for _ in range(ops)], budget)
+
+            new_reg_numbers = [f"BENCH{i:06d}" for i in range(ops)]
+
+            def register_vehicle(reg_number):
+                check(system.register_vehicle("Skoda", "Octavia", 2020, reg_number, "Бенчмарк"))
+
+            results["register_vehicle"] = measure(register_vehicle, [(reg,) for reg in new_reg_numbers], budget)
+
+            def edit_vehicle(vehicle_id, owner):
+                check(system.edit_vehicle(vehicle_id, owner=owner))
+
+            results["edit_vehicle"] = measure(
+                edit_vehicle, [(rng.choice(vehicle_ids), f"Новий власник {i}") for i in range(ops)], budget)
+
+            def add_repair_order(vehicle_id):
+                check(system.add_repair_order(vehicle_id, "Діагностика", "", "", 500.0))
+
+            results["add_repair_order"] = measure(
+                add_repair_order, [(rng.choice(vehicle_ids),) for _ in range(ops)], budget)
+
+            def mark_order_paid(order_id):
+                check(system.mark_order_paid(order_id))
+
+            results["mark_order_paid"] = measure(
+                mark_order_paid, [(order_id,) for order_id in rng.sample(unpaid_ids, min(ops, len(unpaid_ids)))],
+                budget)
+
+            # Видаляємо лише щойно зареєстровані засоби: у них немає заявок.
+            registered = [system.storage.vehicle_id_by_reg(reg) for reg in new_reg_numbers]
+            registered = [vehicle_id for vehicle_id in registered if vehicle_id is not None]
+
+            def delete_vehicle(vehicle_id):
+                check(system.delete_vehicle(vehicle_id))
+
+            if registered:
+                results["delete_vehicle"] = measure(delete_vehicle, [(vehicle_id,) for vehicle_id in registered],
+                                                    budget)
+
+            results["save_data"] = measure(system.save_data, [()] * ops, budget)
+        finally:
+            system.close()
+    return results
+
+
+def compare(results, baseline, tolerance, min_delta):
+    # Регресія — медіана повільніша за базову більш ніж на tolerance і водночас
+    # більш ніж на min_delta секунд (щоб не реагувати на шум у мікросекундах).
+    regressions = []
+    for storage, scales in results.items():
+        for scale, methods in scales.items():
+            base_methods = baseline.get(storage, {}).get(scale, {})
+            for method, stats in methods.items():
+                base = base_methods.get(method)
+                if base is None:
+                    continue
+                delta = stats["median"] - base["median"]
+                if delta > min_delta and stats["median"] > base["median"] * (1 + tolerance):
+                    regressions.append((storage, scale, method, base["median"], stats["median"]))
+    return regressions
+
+
+def print_table(results, baseline):
+    for storage, scales in results.items():
+        for scale, methods in scales.items():
+            base_methods = baseline.get(storage, {}).get(scale, {})
+            print(f"\nСховище: {storage}, масштаб: {scale} {scale_size(scale)}")
+            print(f"{'Метод':<45} {'Викликів':>8} {'Медіана, мс':>12} {'p95, мс':>10} {'Базова, мс':>11}")
+            for method, stats in methods.items():
+                base = base_methods.get(method)
+                base_text = f"{base['median'] * 1000:>11.3f}" if base else f"{'-':>11}"
+                print(f"{method:<45} {stats['calls']:>8} {stats['median'] * 1000:>12.3f} "
+                      f"{stats['p95'] * 1000:>10.3f} {base_text}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Бенчмарк публічних методів STOManagementSystem на синтетичних даних.",
+        epilog="Базовий файл (benchmarks/baseline.json) містить абсолютні часи, виміряні на конкретній машині. "
+               "Перед порівнянням на іншій машині перегенеруйте його там же (--save-baseline), інакше "
+               "регресії та покращення відображатимуть різницю між машинами, а не між версіями коду.")
+    parser.add_argument("--scale", action="append", choices=list(SCALES),
+                        help="масштаб за кількістю заявок (можна вказати кілька разів; за замовчуванням 1k і 100k)")
+    parser.add_argument("--storage", action="append", choices=list(STORAGES),
+                        help="сховище (можна вказати кілька разів; за замовчуванням json-journal, як у CLI)")
+    parser.add_argument("--ops", type=int, default=50, help="максимум викликів кожного методу")
+    parser.add_argument("--budget", type=float, default=5.0, help="бюджет часу на один метод, с")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--cache-size", type=int, default=0,
+                        help="розмір кешу результатів; за замовчуванням 0 — повторні виклики з тими самими "
+                             "аргументами інакше міряли б лише влучання в кеш, а не вартість запитів")
+    parser.add_argument("--output", help="файл для результатів у JSON ('-' — стандартний вивід)")
+    parser.add_argument("--baseline", default=BASELINE_FILE, help="файл базових результатів для порівняння (залежить від машини)")
+    parser.add_argument("--save-baseline", action="store_true", help="записати результати як нові базові")
+    parser.add_argument("--tolerance", type=float, default=0.5, help="допустиме сповільнення медіани (0.5 = 50%%)")
+    parser.add_argument("--min-delta", type=float, default=0.001, help="мінімальна різниця медіан для регресії, с")
+    args = parser.parse_args(argv)
+
+    scales = args.scale or ["1k", "100k"]
+    storages = args.storage or ["json-journal"]
+
+    results = {}
+    # Методи СТО друкують повідомлення про помилки; у звіті вони лише заважають.
+    with contextlib.redirect_stdout(sys.stderr if args.output == "-" else sys.stdout):
+        for storage in storages:
+            results[storage] = {}
+            for scale in scales:
+                results[storage][scale] = run_scale(scale, storage, args.ops, args.budget, args.seed,
+                                                    args.cache_size)
+
+    report = {
+        "created": datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "ops": args.ops,
+        "cache_size": args.cache_size,
+        "results": results
+    }
+
+    baseline = {}
+    if not args.save_baseline and os.path.exists(args.baseline):
+        with open(args.baseline, "r", encoding="utf-8") as file:
+            baseline = json.load(file)["results"]
+
+    regressions = compare(results, baseline, args.tolerance, args.min_delta)
+    report["regressions"] = [
+        {"storage": storage, "scale": scale, "method": method, "baseline": base, "median": median}
+        for storage, scale, method, base, median in regressions
+    ]
+
+    if args.output == "-":
+        json.dump(report, sys.stdout, ensure_ascii=False, indent=2)
+        print()
+    else:
+        print_table(results, baseline)
+        if args.output:
+            with open(args.output, "w", encoding="utf-8") as file:
+                json.dump(report, file, ensure_ascii=False, indent=2)
+
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as file:
+            json.dump(report, file, ensure_ascii=False, indent=2)
+        print(f"Базові результати записано у {args.baseline}", file=sys.stderr)
+        return 0
+
+    for storage, scale, method, base, median in regressions:
+        print(f"РЕГРЕСІЯ {storage}/{scale}/{method}: {base * 1000:.3f} мс -> {median * 1000:.3f} мс",
+              file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,98 @@
+import os
+import sys
+import uuid
+import random
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sto_records import Vehicle, RepairOrder  # noqa: E402
+from sto_storage import open_storage  # noqa: E402
+from sto_snapshot import write_snapshot  # noqa: E402
+
+
+BRANDS = ["Toyota", "BMW", "Audi", "ЗАЗ", "Renault", "Skoda", "Volkswagen"]
+WORK_TYPES = ["Заміна масла", "Діагностика", "Ремонт ходової", "Шиномонтаж"]
+STATUSES = ["Оплачено", "Не оплачено"]
+
+# Масштаб задається кількістю заявок; на кожен транспортний засіб у середньому
+# припадає ORDERS_PER_VEHICLE заявок.
+SCALES = {"1k": 1000, "10k": 10000, "100k": 100000, "1M": 1000000}
+ORDERS_PER_VEHICLE = 4
+
+
+def scale_size(scale):
+    orders_count = SCALES[scale]
+    return max(1, orders_count // ORDERS_PER_VEHICLE), orders_count
+
+
+def iter_vehicle_dicts(vehicles_count, rng):
+    for i in range(vehicles_count):
+        vehicle_id = str(uuid.UUID(int=rng.getrandbits(128), version=4))
+        yield {
+            "id": vehicle_id,
+            "brand": rng.choice(BRANDS),
+            "model": f"Model {rng.randint(1, 30)}",
+            "year": rng.randint(1995, 2024),
+            "reg_number": f"AA{i:06d}",
+            "owner": f"Власник {rng.randint(1, vehicles_count)}",
+            "registration_date": f"2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d} 10:{rng.randint(0, 59):02d}:00"
+        }
+
+
+def iter_order_dicts(vehicle_ids, orders_count, rng):
+    for _ in range(orders_count):
+        order_id = str(uuid.UUID(int=rng.getrandbits(128), version=4))
+        yield {
+            "id": order_id,
+            "vehicle_id": rng.choice(vehicle_ids),
+            "date_created": f"2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d} "
+                            f"{rng.randint(8, 19):02d}:{rng.randint(0, 59):02d}:{rng.randint(0, 59):02d}",
+            "work_type": rng.choice(WORK_TYPES),
+            "parts": "фільтр, масло",
+            "resources": "",
+            "estimated_cost": round(rng.uniform(200, 20000), 2),
+            "status": rng.choice(STATUSES)
+        }
+
+
+def generate_data(vehicles_count, orders_count, seed=42):
+    rng = random.Random(seed)
+    data = {"vehicles": {}, "repair_orders": {}}
+    for vehicle in iter_vehicle_dicts(vehicles_count, rng):
+        data["vehicles"][vehicle["id"]] = vehicle
+    for order in iter_order_dicts(list(data["vehicles"]), orders_count, rng):
+        data["repair_orders"][order["id"]] = order
+    return data
+
+
+def generate_records(vehicles_count, orders_count, seed=42):
+    # Те саме, що generate_data, але одразу в компактних записах: на масштабі 1M
+    # проміжні словники зайняли б у кілька разів більше пам'яті, ніж самі дані.
+    rng = random.Random(seed)
+    vehicles = {}
+    for vehicle in iter_vehicle_dicts(vehicles_count, rng):
+        record = Vehicle.from_dict(vehicle)
+        vehicles[record.uid] = record
+    vehicle_ids = [record["id"] for record in vehicles.values()]
+    orders = {}
+    for order in iter_order_dicts(vehicle_ids, orders_count, rng):
+        record = RepairOrder.from_dict(order)
+        orders[record.uid] = record
+    return {"vehicles": vehicles, "repair_orders": orders}
+
+
+def write_dataset(path, vehicles_count, orders_count, seed=42, snapshot_format=None):
+    # Створює файл даних потрібного сховища: знімок JSON/бінарний або базу SQLite.
+    data = generate_records(vehicles_count, orders_count, seed)
+    if str(path).endswith((".db", ".sqlite", ".sqlite3")):
+        storage = open_storage(path)
+        storage.load()
+        storage.begin()
+        for table, records in data.items():
+            for record in records.values():
+                storage.set_record(table, record["id"], record)
+        storage.commit()
+        storage.close()
+    else:
+        write_snapshot(data, path, snapshot_format or "json")
+    return data
@@ -0,0 +1,165 @@
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+import tempfile
+import subprocess
+from urllib.parse import quote
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dataset import BRANDS, write_dataset  # noqa: E402
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class Client:
+    # Мінімальний HTTP/1.1 клієнт з постійним з'єднанням — лише для навантажувального тесту.
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+        self.reader = None
+        self.writer = None
+
+    async def request(self, method, path, payload=None):
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8") if payload is not None else b""
+        head = (f"{method} {path} HTTP/1.1\r\nHost: {self.host}\r\n"
+                f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n")
+        self.writer.write(head.encode("latin-1") + body)
+        await self.writer.drain()
+
+        response_head = await self.reader.readuntil(b"\r\n\r\n")
+        lines = response_head.decode("latin-1").split("\r\n")
+        status = int(lines[0].split(" ", 2)[1])
+        length = 0
+        for line in lines[1:]:
+            if line.lower().startswith("content-length:"):
+                length = int(line.split(":", 1)[1])
+        return status, json.loads(await self.reader.readexactly(length))
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+
+
+def percentile(values, fraction):
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+async def run_client(host, port, deadline, vehicle_ids, order_ids, write_ratio, rng, latencies, errors):
+    client = Client(host, port)
+    try:
+        while time.perf_counter() < deadline:
+            action = rng.random()
+            if action < write_ratio / 2:
+                kind, method, path = "add_order", "POST", "/orders"
+                payload = {"vehicle_id": rng.choice(vehicle_ids), "work_type": "Діагностика",
+                           "estimated_cost": 500.0}
+            elif action < write_ratio:
+                kind, method, path, payload = "pay", "POST", f"/orders/{rng.choice(order_ids)}/pay", None
+            elif action < write_ratio + (1 - write_ratio) * 0.2:
+                kind, method, path, payload = "invoice", "GET", f"/orders/{rng.choice(order_ids)}/invoice", None
+            elif action < write_ratio + (1 - write_ratio) * 0.4:
+                kind, method, path, payload = "vehicle_orders", "GET", \
+                    f"/orders?vehicle_id={rng.choice(vehicle_ids)}", None
+            else:
+                kind, method = "list_vehicles", "GET"
+                path, payload = f"/vehicles?brand={quote(rng.choice(BRANDS))}&limit=20", None
+
+            start = time.perf_counter()
+            status, _ = await client.request(method, path, payload)
+            latencies.setdefault(kind, []).append(time.perf_counter() - start)
+            if status >= 400:
+                errors[kind] = errors.get(kind, 0) + 1
+    finally:
+        client.close()
+
+
+async def run_load(host, port, clients, duration, vehicle_ids, order_ids, write_ratio, seed):
+    latencies = {}
+    errors = {}
+    deadline = time.perf_counter() + duration
+    started = time.perf_counter()
+    await asyncio.gather(*(run_client(host, port, deadline, vehicle_ids, order_ids, write_ratio,
+                                      random.Random(seed + i), latencies, errors)
+                           for i in range(clients)))
+    return latencies, errors, time.perf_counter() - started
+
+
+def start_server(data_file):
+    process = subprocess.Popen([sys.executable, os.path.join(ROOT, "sto_server.py"), "--data", data_file,
+                                "--port", "0"], stdout=subprocess.PIPE, text=True, encoding="utf-8")
+    line = process.stdout.readline()
+    if not line:
+        process.kill()
+        raise RuntimeError("Сервіс не запустився.")
+    host, port = line.strip().rsplit("//", 1)[1].rsplit(":", 1)
+    return process, host, int(port)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Навантажувальний тест HTTP-сервісу СТО: запитів/с і затримка p99.")
+    parser.add_argument("--vehicles", type=int, default=5000)
+    parser.add_argument("--orders", type=int, default=20000)
+    parser.add_argument("--clients", type=int, default=50, help="кількість одночасних з'єднань")
+    parser.add_argument("--duration", type=float, default=10.0, help="тривалість тесту, с")
+    parser.add_argument("--write-ratio", type=float, default=0.2, help="частка запитів, що змінюють дані")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="записати результати у JSON-файл")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        data_file = os.path.join(tmp_dir, "sto_data.json")
+        data = write_dataset(data_file, args.vehicles, args.orders, args.seed)
+        vehicle_ids = [record["id"] for record in data["vehicles"].values()]
+        order_ids = [record["id"] for record in data["repair_orders"].values()]
+        del data
+
+        process, host, port = start_server(data_file)
+        try:
+            latencies, errors, elapsed = asyncio.run(run_load(host, port, args.clients, args.duration, vehicle_ids,
+                                                              order_ids, args.write_ratio, args.seed))
+        finally:
+            process.terminate()
+            process.wait()
+
+    all_latencies = sorted(value for values in latencies.values() for value in values)
+    total = len(all_latencies)
+    report = {
+        "clients": args.clients,
+        "seconds": elapsed,
+        "requests": total,
+        "requests_per_second": total / elapsed if elapsed else 0.0,
+        "p50_ms": percentile(all_latencies, 0.5) * 1000,
+        "p99_ms": percentile(all_latencies, 0.99) * 1000,
+        "errors": sum(errors.values()),
+        "endpoints": {}
+    }
+    for kind, values in sorted(latencies.items()):
+        values.sort()
+        report["endpoints"][kind] = {"requests": len(values), "errors": errors.get(kind, 0),
+                                     "p50_ms": percentile(values, 0.5) * 1000,
+                                     "p99_ms": percentile(values, 0.99) * 1000}
+
+    print(f"З'єднань: {args.clients}, запитів: {total} за {elapsed:.1f} с — "
+          f"{report['requests_per_second']:.0f} запитів/с, p50 {report['p50_ms']:.2f} мс, "
+          f"p99 {report['p99_ms']:.2f} мс, помилок: {report['errors']}")
+    for kind, stats in report["endpoints"].items():
+        print(f"  {kind:<15} {stats['requests']:>8} запитів  p50 {stats['p50_ms']:>8.2f} мс  "
+              f"p99 {stats['p99_ms']:>8.2f} мс  помилок {stats['errors']}")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(report, file, ensure_ascii=False, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
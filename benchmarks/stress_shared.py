@@ -0,0 +1,122 @@
+import os
+import sys
+import time
+import random
+import argparse
+import tempfile
+import multiprocessing
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sto_system import STOManagementSystem  # noqa: E402
+
+
+CONFLICT_MARKER = "іншому терміналі"
+
+
+def worker(worker_id, data_file, operations, common_regs, compact_threshold, start_event, seed):
+    rng = random.Random(seed + worker_id)
+    system = STOManagementSystem(data_file, shared=True, compact_threshold=compact_threshold)
+    counts = {"registered": 0, "deleted": 0, "orders": 0, "paid": 0, "edited": 0, "conflicts": 0, "rejected": 0}
+    own_vehicles = []
+
+    def done(result, counter):
+        ok, message = result
+        if ok:
+            counts[counter] += 1
+        elif CONFLICT_MARKER in message:
+            counts["conflicts"] += 1
+        else:
+            counts["rejected"] += 1
+        return ok
+
+    start_event.wait()
+    started = time.perf_counter()
+    for i in range(operations):
+        action = rng.random()
+        vehicle_ids = list(system.data["vehicles"]) if system.data["vehicles"] else []
+        if action < 0.25 or not vehicle_ids:
+            # Частина номерів спільна для всіх процесів — кожен має зареєструватися рівно один раз.
+            reg_number = rng.choice(common_regs) if rng.random() < 0.3 else f"W{worker_id}-{i}"
+            if done(system.register_vehicle("Skoda", "Octavia", 2020, reg_number, f"Процес {worker_id}"),
+                    "registered") and not reg_number.startswith("COMMON"):
+                own_vehicles.append(system.storage.vehicle_id_by_reg(reg_number))
+        elif action < 0.55:
+            vehicle = system.storage.get_vehicle(rng.choice(vehicle_ids))
+            if vehicle is not None:
+                done(system.add_repair_order(vehicle["id"], "Діагностика", "", "", 100.0), "orders")
+        elif action < 0.7:
+            unpaid = [order["id"] for order in system.iter_repair_orders(limit=50)
+                      if order["status"] == "Не оплачено"]
+            if unpaid:
+                done(system.mark_order_paid(rng.choice(unpaid)), "paid")
+        elif action < 0.9:
+            vehicle = system.storage.get_vehicle(rng.choice(vehicle_ids))
+            if vehicle is not None:
+                done(system.edit_vehicle(vehicle["id"], owner=f"Власник {worker_id}-{i}"), "edited")
+        elif own_vehicles:
+            done(system.delete_vehicle(own_vehicles.pop()), "deleted")
+
+    counts["seconds"] = time.perf_counter() - started
+    system.close()
+    return counts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Стрес-тест спільного файлу даних: N процесів змінюють дані одночасно.")
+    parser.add_argument("--processes", type=int, default=4)
+    parser.add_argument("--operations", type=int, default=500, help="операцій на процес")
+    parser.add_argument("--common-regs", type=int, default=20, help="кількість номерів, за які процеси змагаються")
+    parser.add_argument("--compact-threshold", type=int, default=64 * 1024,
+                        help="поріг ущільнення журналу, байтів (малий — щоб ущільнення траплялось під час тесту)")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args(argv)
+
+    common_regs = [f"COMMON{i:03d}" for i in range(args.common_regs)]
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        data_file = os.path.join(tmp_dir, "sto_data.json")
+        with multiprocessing.Manager() as manager:
+            start_event = manager.Event()
+            with multiprocessing.Pool(args.processes) as pool:
+                pending = [pool.apply_async(worker, (worker_id, data_file, args.operations, common_regs,
+                                                     args.compact_threshold, start_event, args.seed))
+                           for worker_id in range(args.processes)]
+                time.sleep(0.5)
+                started = time.perf_counter()
+                start_event.set()
+                results = [result.get() for result in pending]
+                elapsed = time.perf_counter() - started
+
+        system = STOManagementSystem(data_file, shared=True)
+        vehicles = system.get_vehicles()
+        orders = system.get_repair_orders()
+        reg_numbers = [vehicle["reg_number"] for vehicle in vehicles]
+
+        totals = {key: sum(result[key] for result in results) for key in results[0] if key != "seconds"}
+        problems = []
+        if len(vehicles) != totals["registered"] - totals["deleted"]:
+            problems.append(f"транспортних засобів {len(vehicles)}, очікувалось "
+                            f"{totals['registered'] - totals['deleted']}")
+        if len(orders) != totals["orders"]:
+            problems.append(f"заявок {len(orders)}, очікувалось {totals['orders']}")
+        if len(set(reg_numbers)) != len(reg_numbers):
+            problems.append("реєстраційні номери повторюються")
+        if not system.check_consistency():
+            problems.append("агрегати не відповідають даним")
+        system.close()
+
+    operations = args.processes * args.operations
+    print(f"Процесів: {args.processes}, операцій: {operations}, час: {elapsed:.2f} с, "
+          f"{operations / elapsed:.0f} операцій/с")
+    print(", ".join(f"{key}: {value}" for key, value in totals.items()))
+    print(f"Спільних номерів зареєстровано: {sum(reg in reg_numbers for reg in common_regs)} з {len(common_regs)}")
+    if problems:
+        for problem in problems:
+            print(f"ПОМИЛКА: {problem}")
+        return 1
+    print("Дані узгоджені: жодна зміна не втрачена.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
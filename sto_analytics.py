@@ -0,0 +1,143 @@
+import datetime
+import itertools
+from operator import itemgetter
+
+import numpy as np
+
+from sto_records import timestamp_to_number
+
+
+PERIODS = ("day", "week", "month")
+AGEING_BUCKETS = (30, 60, 90)
+GROUP_FIELDS = ("work_type", "brand")
+UNPAID_STATUS = "Не оплачено"
+
+_SECONDS_PER_DAY = 86400
+_MISSING_DATE = np.iinfo(np.int64).min
+
+
+def _encode(values):
+    # Текстовий стовпчик -> (коди int32, мітки), мітки в порядку першої появи.
+    labels = {value: code for code, value in enumerate(dict.fromkeys(values))}
+    codes = np.fromiter(map(labels.__getitem__, values), dtype=np.int32, count=len(values))
+    return codes, list(labels)
+
+
+def _day_start(value):
+    seconds = timestamp_to_number(value)
+    if not isinstance(seconds, int):
+        raise ValueError(f"Некоректна дата: {value}. Очікується формат РРРР-ММ-ДД.")
+    return seconds - seconds % _SECONDS_PER_DAY
+
+
+class OrderColumns:
+    # Стовпчикове представлення заявок: кожне поле — окремий масив NumPy, а текстові
+    # поля (тип робіт, марка) закодовані цілими числами з таблицею міток.
+    def __init__(self, facts):
+        rows = list(facts)
+        # zip(*rows) на сотнях тисяч рядків змушує збирач сміття обходити кожен кортеж.
+        created, cost, status, work_type, brand = (list(map(itemgetter(i), rows)) for i in range(5))
+        self.size = len(rows)
+        try:
+            self.created = np.array(created, dtype=np.int64)
+        except (TypeError, ValueError):
+            # Трапляються дати, які не вдалося розібрати, — вони не потрапляють у звіти за періодами.
+            self.created = np.fromiter((value if type(value) is int else _MISSING_DATE for value in created),
+                                       dtype=np.int64, count=self.size)
+        self.cost = np.array(cost, dtype=np.float64)
+        self.unpaid = np.array(status, dtype=object) == UNPAID_STATUS
+        self.unpaid_cost = np.where(self.unpaid, self.cost, 0.0)
+        self.has_date = self.created != _MISSING_DATE
+        self.groups = {"work_type": _encode(work_type), "brand": _encode(brand)}
+
+
+class OrderAnalytics:
+    # Стовпчики будуються один раз на версію даних сховища; доки дані не змінились,
+    # кожен звіт — це кілька векторних операцій над готовими масивами.
+    def __init__(self, storage, archive=None):
+        self.storage = storage
+        self.archive = archive
+        self.builds = 0
+        self._columns = None
+        self._version = None
+
+    def columns(self):
+        self.storage.refresh()
+        version = (self.storage.data_version, self.archive.version if self.archive is not None else 0)
+        if self._columns is None or version != self._version:
+            facts = self.storage.iter_order_facts()
+            if version[1]:
+                # Заархівовані заявки теж входять у звіти, тож архівування їх не змінює.
+                facts = itertools.chain(facts, self.archive.iter_order_facts(self.storage.get_order))
+            self._columns = OrderColumns(facts)
+            self._version = version
+            self.builds += 1
+        return self._columns
+
+    def revenue(self, period="month", date_from=None, date_to=None):
+        if period not in PERIODS:
+            raise ValueError(f"Невідомий період: {period}. Доступні: {', '.join(PERIODS)}.")
+        columns = self.columns()
+        mask = columns.has_date.copy()
+        if date_from:
+            mask &= columns.created >= _day_start(date_from)
+        if date_to:
+            mask &= columns.created < _day_start(date_to) + _SECONDS_PER_DAY
+
+        days = columns.created[mask] // _SECONDS_PER_DAY
+        if period == "week":
+            # 1970-01-01 — четвер; тиждень починається з понеділка.
+            days -= (days + 3) % 7
+        elif period == "month":
+            days = days.astype("datetime64[D]").astype("datetime64[M]").astype("datetime64[D]").astype(np.int64)
+
+        starts, inverse = np.unique(days, return_inverse=True)
+        orders = np.bincount(inverse, minlength=len(starts))
+        total = np.bincount(inverse, weights=columns.cost[mask], minlength=len(starts))
+        unpaid = np.bincount(inverse, weights=columns.unpaid_cost[mask], minlength=len(starts))
+
+        labels = np.datetime_as_string(starts.astype("datetime64[D]"))
+        if period == "month":
+            labels = [label[:7] for label in labels]
+        return [{"period": str(label), "orders": int(count), "total": float(amount),
+                 "paid": float(amount - owed), "unpaid": float(owed)}
+                for label, count, amount, owed in zip(labels, orders, total, unpaid)]
+
+    def receivables_ageing(self, as_of=None, buckets=AGEING_BUCKETS):
+        # Неоплачені заявки за віком у днях: 0–30, 31–60, 61–90, понад 90.
+        columns = self.columns()
+        if as_of:
+            now = _day_start(as_of) + _SECONDS_PER_DAY - 1
+        else:
+            now = timestamp_to_number(datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+
+        mask = columns.unpaid & columns.has_date
+        ages = (now - columns.created[mask]) // _SECONDS_PER_DAY
+        index = np.searchsorted(np.asarray(buckets), ages, side="left")
+        orders = np.bincount(index, minlength=len(buckets) + 1)
+        amounts = np.bincount(index, weights=columns.cost[mask], minlength=len(buckets) + 1)
+        oldest = np.zeros(len(buckets) + 1, dtype=np.int64)
+        np.maximum.at(oldest, index, ages)
+
+        lower = (0,) + tuple(limit + 1 for limit in buckets)
+        labels = [f"{start}–{end}" for start, end in zip(lower, buckets)] + [f"понад {buckets[-1]}"]
+        rows = [{"bucket": label, "orders": int(count), "amount": float(amount), "oldest_days": int(days)}
+                for label, count, amount, days in zip(labels, orders, amounts, oldest)]
+
+        undated = columns.unpaid & ~columns.has_date
+        if undated.any():
+            rows.append({"bucket": "без дати", "orders": int(undated.sum()),
+                         "amount": float(columns.cost[undated].sum()), "oldest_days": 0})
+        return rows
+
+    def totals_by(self, field):
+        if field not in GROUP_FIELDS:
+            raise ValueError(f"Невідоме поле групування: {field}. Доступні: {', '.join(GROUP_FIELDS)}.")
+        columns = self.columns()
+        codes, labels = columns.groups[field]
+        orders = np.bincount(codes, minlength=len(labels))
+        total = np.bincount(codes, weights=columns.cost, minlength=len(labels))
+        unpaid = np.bincount(codes, weights=columns.unpaid_cost, minlength=len(labels))
+        return [{field: labels[i], "orders": int(orders[i]), "total": float(total[i]),
+                 "paid": float(total[i] - unpaid[i]), "unpaid": float(unpaid[i])}
+                for i in np.argsort(-total, kind="stable")]
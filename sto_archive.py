@@ -0,0 +1,90 @@
+import os
+import gzip
+import json
+import zlib
+import itertools
+
+from sto_records import timestamp_to_number
+
+
+ARCHIVE_SUFFIX = ".archive.jsonl.gz"
+ARCHIVE_AGE_DAYS = 365
+ARCHIVE_CHUNK_SIZE = 10000
+
+
+class OrderArchive:
+    # Холодне сховище заархівованих заявок: gzip-файл з JSON Lines. Кожен запуск
+    # архівування дописує окремий gzip-член одним записом, тож наявні дані ніколи не
+    # переписуються. Файл читається лише на вимогу (історія, повторний рахунок) і
+    # тримається в пам'яті, доки не зміниться його розмір.
+    def __init__(self, path):
+        self.path = path
+        self.bytes_written = 0
+        self._orders = None
+        self._by_vehicle = None
+        self._loaded_size = None
+
+    @property
+    def version(self):
+        try:
+            return os.path.getsize(self.path)
+        except OSError:
+            return 0
+
+    def append(self, rows):
+        payload = "".join(json.dumps(dict(row), ensure_ascii=False, separators=(",", ":")) + "\n" for row in rows)
+        compressed = gzip.compress(payload.encode("utf-8"))
+        with open(self.path, "ab") as file:
+            file.write(compressed)
+            file.flush()
+            os.fsync(file.fileno())
+        self.bytes_written += len(compressed)
+
+    def _load(self):
+        size = self.version
+        if self._orders is not None and size == self._loaded_size:
+            return
+        orders = {}
+        if size:
+            try:
+                with gzip.open(self.path, "rt", encoding="utf-8") as file:
+                    for line in file:
+                        # Повтор ID лишається після збою між записом в архів і видаленням
+                        # з робочих даних — береться останній запис.
+                        row = json.loads(line)
+                        orders[row["id"]] = row
+            except (EOFError, ValueError, zlib.error):
+                # Обірваний останній член після аварійного завершення.
+                pass
+        by_vehicle = {}
+        for order_id, row in orders.items():
+            by_vehicle.setdefault(row["vehicle_id"], []).append(order_id)
+        self._orders, self._by_vehicle, self._loaded_size = orders, by_vehicle, size
+
+    def __len__(self):
+        self._load()
+        return len(self._orders)
+
+    def get_order(self, order_id):
+        self._load()
+        return self._orders.get(order_id)
+
+    def iter_orders(self, vehicle_id=None, live=None):
+        # live(order_id) повертає заявку з робочих даних: такі заявки архівування не
+        # встигло видалити з них, тож в архіві вони ще не рахуються.
+        self._load()
+        order_ids = self._by_vehicle.get(vehicle_id, ()) if vehicle_id else self._orders
+        for order_id in order_ids:
+            if live is None or live(order_id) is None:
+                yield self._orders[order_id]
+
+    def find_ids_by_prefix(self, prefix, limit=2):
+        self._load()
+        prefix = prefix.lower()
+        return list(itertools.islice((order_id for order_id in self._orders if order_id.startswith(prefix)), limit))
+
+    def iter_order_facts(self, live=None):
+        # Ті самі кортежі, що й Storage.iter_order_facts(), — для аналітики за всю історію.
+        for row in self.iter_orders(live=live):
+            yield (timestamp_to_number(row["date_created"]), row["estimated_cost"], row["status"], row["work_type"],
+                   row["brand"])
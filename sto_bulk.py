@@ -0,0 +1,153 @@
+import csv
+import sys
+import json
+import time
+import argparse
+
+
+FORMATS = ("csv", "jsonl")
+FORMAT_SUFFIXES = {".csv": "csv", ".jsonl": "jsonl", ".ndjson": "jsonl"}
+IMPORT_CHUNK_SIZE = 5000
+
+
+def detect_format(path, file_format=None):
+    if file_format:
+        if file_format not in FORMATS:
+            raise ValueError(f"Невідомий формат: {file_format}. Доступні: {', '.join(FORMATS)}.")
+        return file_format
+    for suffix, detected in FORMAT_SUFFIXES.items():
+        if str(path).lower().endswith(suffix):
+            return detected
+    raise ValueError(f"Не вдалося визначити формат файлу {path}. Вкажіть csv або jsonl.")
+
+
+def read_chunks(path, file_format=None, chunk_size=IMPORT_CHUNK_SIZE):
+    # Читає файл потоком і віддає пакети кортежів (номер рядка, словник, помилка).
+    # Номер рядка — номер запису у файлі (у CSV без заголовка), щоб звіт про помилки
+    # можна було зіставити з вихідним файлом.
+    file_format = detect_format(path, file_format)
+    chunk = []
+    with open(path, "r", encoding="utf-8-sig", newline="") as file:
+        if file_format == "csv":
+            rows = ((row_number, row, None) for row_number, row in enumerate(csv.DictReader(file), 1))
+        else:
+            rows = _jsonl_rows(file)
+        for item in rows:
+            chunk.append(item)
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+    if chunk:
+        yield chunk
+
+
+def _jsonl_rows(file):
+    for row_number, line in enumerate(file, 1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as e:
+            yield row_number, None, f"Некоректний JSON: {str(e)}"
+            continue
+        if isinstance(row, dict):
+            yield row_number, row, None
+        else:
+            yield row_number, None, "Рядок має бути JSON-об'єктом."
+
+
+def write_rows(path, rows, fields, file_format=None):
+    # rows — будь-який ітератор відображень; рядки записуються по одному, без
+    # побудови повного списку в пам'яті.
+    file_format = detect_format(path, file_format)
+    started = time.perf_counter()
+    count = 0
+    with open(path, "w", encoding="utf-8", newline="") as file:
+        if file_format == "csv":
+            writer = csv.writer(file)
+            writer.writerow(fields)
+            for row in rows:
+                writer.writerow([row[field] for field in fields])
+                count += 1
+        else:
+            for row in rows:
+                file.write(json.dumps({field: row[field] for field in fields}, ensure_ascii=False) + "\n")
+                count += 1
+    elapsed = time.perf_counter() - started
+    return {
+        "count": count,
+        "seconds": elapsed,
+        "per_second": count / elapsed if elapsed > 0 else 0.0,
+        "output": path
+    }
+
+
+class ErrorReport:
+    # Помилки імпорту пишуться у CSV одразу, тож звіт не накопичується в пам'яті.
+    # Файл створюється лише тоді, коли трапилась перша помилка.
+    def __init__(self, path):
+        self.path = path
+        self.count = 0
+        self._file = None
+        self._writer = None
+
+    def add(self, row_number, message):
+        if self._file is None:
+            self._file = open(self.path, "w", encoding="utf-8", newline="")
+            self._writer = csv.writer(self._file)
+            self._writer.writerow(["row", "error"])
+        self._writer.writerow([row_number, message])
+        self.count += 1
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def print_result(success, result, action):
+    if not success:
+        print(result)
+        return 1
+    if action == "import":
+        print(f"Імпортовано: {result['imported']}, відхилено: {result['rejected']} "
+              f"за {result['seconds']:.2f} с ({result['per_second']:.0f} рядків/с).")
+        if result["errors"]:
+            print(f"Звіт про помилки: {result['errors']}")
+    else:
+        print(f"Експортовано: {result['count']} за {result['seconds']:.2f} с "
+              f"({result['per_second']:.0f} рядків/с) у {result['output']}")
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Потоковий імпорт та експорт даних СТО у CSV і JSON Lines.")
+    parser.add_argument("action", choices=["import", "export"])
+    parser.add_argument("table", choices=["vehicles", "orders"])
+    parser.add_argument("file", help="файл .csv або .jsonl")
+    parser.add_argument("--data", default="sto_data.json", help="файл даних (.json, .bin або .db)")
+    parser.add_argument("--format", choices=FORMATS, help="формат файлу, якщо його не видно з розширення")
+    parser.add_argument("--chunk-size", type=int, default=IMPORT_CHUNK_SIZE,
+                        help="скільки рядків імпорту зберігати однією транзакцією")
+    parser.add_argument("--errors", help="файл звіту про помилки імпорту (за замовчуванням <файл>.errors.csv)")
+    args = parser.parse_args(argv)
+
+    from sto_system import STOManagementSystem
+
+    system = STOManagementSystem(args.data, journal=True)
+    try:
+        if args.action == "import" and args.table == "vehicles":
+            result = system.import_vehicles(args.file, args.format, args.chunk_size, args.errors)
+        elif args.action == "import":
+            result = system.import_repair_orders(args.file, args.format, args.chunk_size, args.errors)
+        elif args.table == "vehicles":
+            result = system.export_vehicles(args.file, args.format)
+        else:
+            result = system.export_repair_orders(args.file, args.format)
+    finally:
+        system.close()
+    return print_result(*result, args.action)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
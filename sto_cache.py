@@ -0,0 +1,61 @@
+from collections import OrderedDict
+
+
+class ResultCache:
+    # Кеш результатів запитів, прив'язаний до версії даних: будь-яка зміна даних
+    # змінює версію, і тоді весь кеш скидається. Розмір обмежено кількістю записів
+    # і сумарною кількістю рядків у них; понад ліміт витісняються найдавніше вжиті.
+    def __init__(self, max_entries=64, max_rows=500000):
+        self.max_entries = max_entries
+        self.max_rows = max_rows
+        self.version = None
+        self.rows = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self._entries = OrderedDict()
+
+    def get(self, key, version, compute):
+        # compute() повертає (значення, кількість рядків у ньому).
+        if version != self.version:
+            if self._entries:
+                self.invalidations += 1
+            self.clear()
+            self.version = version
+
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+        self.misses += 1
+        value, size = compute()
+        if self.max_entries and size <= self.max_rows:
+            self._entries[key] = (value, size)
+            self.rows += size
+            while len(self._entries) > self.max_entries or self.rows > self.max_rows:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self.rows -= evicted_size
+                self.evictions += 1
+        return value
+
+    def clear(self):
+        self._entries.clear()
+        self.rows = 0
+
+    def reset_stats(self):
+        self.hits = self.misses = self.evictions = self.invalidations = 0
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "rows": self.rows,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations
+        }
@@ -0,0 +1,274 @@
+import os
+import sys
+import json
+import time
+import uuid
+import shlex
+import functools
+import argparse
+
+from sto_table import TableRenderer
+from sto_storage import ConflictError
+from sto_system import (STOManagementSystem, VEHICLE_SORT_KEYS, ORDER_SORT_KEYS, ORDER_STATUSES, VEHICLE_COLUMNS,
+                        ORDER_COLUMNS, main as interactive_main)
+
+
+PAYMENT_FILTERS = {"paid": "Оплачено", "unpaid": "Не оплачено"}
+
+
+def positive_int(value):
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError("має бути додатним числом")
+    return number
+
+
+def add_commands(subparsers):
+    # --json можна вказати й після команди; SUPPRESS не дає підкоманді затерти загальний прапорець.
+    output = argparse.ArgumentParser(add_help=False)
+    output.add_argument("--json", action="store_true", default=argparse.SUPPRESS,
+                        help="виводити результат як JSON")
+    add_parser = functools.partial(subparsers.add_parser, parents=[output])
+
+    command = add_parser("register", help="зареєструвати транспортний засіб")
+    command.add_argument("brand")
+    command.add_argument("model")
+    command.add_argument("year", type=int)
+    command.add_argument("reg_number")
+    command.add_argument("owner")
+
+    command = add_parser("add-order", help="додати заявку на ремонт")
+    command.add_argument("vehicle", help="реєстраційний номер або ID (можна перші символи)")
+    command.add_argument("work_type")
+    command.add_argument("cost", type=float)
+    command.add_argument("--parts", default="")
+    command.add_argument("--resources", default="")
+
+    command = add_parser("pay", help="позначити заявку як оплачену")
+    command.add_argument("order", help="ID заявки (можна перші символи)")
+
+    command = add_parser("invoice", help="згенерувати рахунок")
+    command.add_argument("order", help="ID заявки (можна перші символи)")
+    command.add_argument("--output", help="записати рахунок у файл замість виведення")
+
+    command = add_parser("list-vehicles", help="список транспортних засобів")
+    command.add_argument("--brand")
+    command.add_argument("--model")
+    command.add_argument("--owner")
+    command.add_argument("--reg", help="частина реєстраційного номера")
+    command.add_argument("--payment", choices=PAYMENT_FILTERS)
+    command.add_argument("--sort", choices=VEHICLE_SORT_KEYS)
+    command.add_argument("--limit", type=positive_int)
+
+    command = add_parser("list-orders", help="список заявок на ремонт")
+    command.add_argument("--vehicle", help="реєстраційний номер або ID транспортного засобу")
+    command.add_argument("--status", choices=PAYMENT_FILTERS)
+    command.add_argument("--archived", action="store_true", help="разом із заархівованими заявками")
+    command.add_argument("--sort", choices=ORDER_SORT_KEYS)
+    command.add_argument("--limit", type=positive_int)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        description="Система управління СТО. Без команди запускається інтерактивне меню.")
+    parser.add_argument("--data", default="sto_data.json", help="файл даних (.json, .bin або .db)")
+    parser.add_argument("--batch", metavar="FILE",
+                        help="виконати команди з файлу (по одній на рядок, '-' — зі стандартного входу)")
+    parser.add_argument("--atomic", action="store_true",
+                        help="у пакетному режимі скасувати всі зміни, якщо хоч одна команда не вдалась")
+    parser.add_argument("--json", action="store_true", help="виводити результати як JSON, по рядку на команду")
+    add_commands(parser.add_subparsers(dest="command", metavar="команда"))
+    return parser
+
+
+def build_batch_parser():
+    parser = argparse.ArgumentParser(prog="batch", add_help=False)
+    add_commands(parser.add_subparsers(dest="command", metavar="команда", required=True))
+    return parser
+
+
+def read_batch(path):
+    # Файл розбирається повністю ще до відкриття даних: якщо хоч один рядок некоректний,
+    # жодна команда не виконується. Порожні рядки та коментарі (#) пропускаються.
+    parser = build_batch_parser()
+    commands = []
+    errors = 0
+    file = sys.stdin if path == "-" else open(path, "r", encoding="utf-8")
+    try:
+        for line_number, line in enumerate(file, 1):
+            try:
+                words = shlex.split(line, comments=True)
+                if not words:
+                    continue
+                commands.append((line_number, parser.parse_args(words)))
+            except (ValueError, SystemExit):
+                # argparse уже вивів причину у stderr.
+                print(f"{path}:{line_number}: некоректна команда: {line.strip()}", file=sys.stderr)
+                errors += 1
+    finally:
+        if file is not sys.stdin:
+            file.close()
+    return commands, errors
+
+
+def resolve_vehicle(system, reference):
+    vehicle_id = system.storage.vehicle_id_by_reg(reference)
+    if vehicle_id is not None:
+        return True, vehicle_id
+    found, vehicle = system.find_vehicle_by_prefix(reference)
+    return (True, vehicle["id"]) if found else (False, vehicle)
+
+
+def run_register(system, args):
+    success, message = system.register_vehicle(args.brand, args.model, args.year, args.reg_number, args.owner)
+    result = {"ok": success, "message": message}
+    if success:
+        result["id"] = system.storage.vehicle_id_by_reg(args.reg_number)
+    return result
+
+
+def run_add_order(system, args):
+    found, vehicle_id = resolve_vehicle(system, args.vehicle)
+    if not found:
+        return {"ok": False, "message": vehicle_id}
+    order_id = str(uuid.uuid4())
+    success, message = system.add_repair_order(vehicle_id, args.work_type, args.parts, args.resources, args.cost,
+                                               order_id)
+    result = {"ok": success, "message": message}
+    if success:
+        result["id"] = order_id
+    return result
+
+
+def run_pay(system, args):
+    found, order = system.find_order_by_prefix(args.order)
+    if not found:
+        return {"ok": False, "message": order}
+    if order["status"] != ORDER_STATUSES[0]:
+        return {"ok": False, "message": "Заявка вже оплачена."}
+    success, message = system.mark_order_paid(order["id"])
+    return {"ok": success, "message": message, "id": order["id"]}
+
+
+def run_invoice(system, args):
+    found, order = system.find_order_by_prefix(args.order)
+    if not found:
+        return {"ok": False, "message": order}
+    success, invoice = system.generate_invoice(order["id"])
+    if not success:
+        return {"ok": False, "message": invoice}
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            file.write(invoice)
+        return {"ok": True, "message": f"Рахунок збережено у файл {args.output}", "id": order["id"]}
+    return {"ok": True, "invoice": invoice, "id": order["id"]}
+
+
+def run_list_vehicles(system, args):
+    rows = system.iter_vehicles(args.brand, args.model, PAYMENT_FILTERS.get(args.payment), args.sort, args.limit,
+                                filter_owner=args.owner, filter_reg=args.reg)
+    return {"ok": True, "items": [dict(row) for row in rows]}
+
+
+def run_list_orders(system, args):
+    vehicle_id = None
+    if args.vehicle:
+        found, vehicle_id = resolve_vehicle(system, args.vehicle)
+        if not found:
+            return {"ok": False, "message": vehicle_id}
+    if args.archived:
+        rows = system.get_repair_orders(vehicle_id, include_archived=True)
+    else:
+        rows = system.storage.iter_orders(vehicle_id)
+    if args.status:
+        status = PAYMENT_FILTERS[args.status]
+        rows = (row for row in rows if row["status"] == status)
+    rows = STOManagementSystem._paginate(rows, ORDER_SORT_KEYS, args.sort, args.limit, None)[0]
+    return {"ok": True, "items": [dict(row) for row in rows]}
+
+
+COMMANDS = {
+    "register": run_register,
+    "add-order": run_add_order,
+    "pay": run_pay,
+    "invoice": run_invoice,
+    "list-vehicles": run_list_vehicles,
+    "list-orders": run_list_orders,
+}
+
+
+def print_result(command, result, as_json):
+    if as_json:
+        print(json.dumps(dict(result, command=command), ensure_ascii=False))
+        return
+    if not result["ok"]:
+        print(result["message"], file=sys.stderr)
+    elif "invoice" in result:
+        print(result["invoice"])
+    elif "items" not in result:
+        print(f"{result['message']} ID: {result['id']}" if "id" in result else result["message"])
+    else:
+        columns = VEHICLE_COLUMNS if command == "list-vehicles" else ORDER_COLUMNS
+        for line in TableRenderer(columns).render(result["items"]):
+            print(line)
+
+
+class BatchAborted(Exception):
+    pass
+
+
+def run_batch(system, commands, atomic=False, as_json=False):
+    # Усі команди виконуються в одній транзакції: дані завантажуються один раз при
+    # відкритті системи і зберігаються один раз наприкінці пакета.
+    started = time.perf_counter()
+    failed = 0
+    try:
+        with system.transaction():
+            for line_number, args in commands:
+                result = COMMANDS[args.command](system, args)
+                print_result(args.command, result, as_json or getattr(args, "json", False))
+                if not result["ok"]:
+                    failed += 1
+                    if atomic:
+                        raise BatchAborted(f"рядок {line_number}")
+    except BatchAborted as e:
+        print(f"Пакет скасовано ({str(e)}), зміни не збережено.", file=sys.stderr)
+        return 1
+    except (ConflictError, OSError) as e:
+        # Збій під час фіксації транзакції: команди вже виконано в пам'яті, але на диск нічого не потрапило.
+        print(f"Не вдалося зберегти пакет ({str(e)}), зміни не збережено.", file=sys.stderr)
+        return 1
+    print(f"Виконано команд: {len(commands)}, з помилками: {failed} за {time.perf_counter() - started:.2f} с.",
+          file=sys.stderr)
+    return 1 if failed else 0
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.batch and args.command:
+        parser.error("команду і --batch не можна вказувати разом")
+    if not args.batch and not args.command:
+        interactive_main(args.data)
+        return 0
+
+    commands = [(0, args)]
+    if args.batch:
+        commands, errors = read_batch(args.batch)
+        if errors:
+            return 2
+
+    shared = os.environ.get("STO_SHARED", "").lower() in ("1", "true", "yes")
+    system = STOManagementSystem(args.data, journal=True, shared=shared)
+    try:
+        if args.batch:
+            return run_batch(system, commands, args.atomic, args.json)
+        result = COMMANDS[args.command](system, args)
+        print_result(args.command, result, args.json)
+        return 0 if result["ok"] else 1
+    finally:
+        system.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,144 @@
+from bisect import bisect_left, insort
+
+from sto_records import format_id
+
+
+_HEX_DIGITS = frozenset("0123456789abcdef")
+_DASH_POSITIONS = (8, 13, 18, 23)
+
+
+def uuid_prefix_range(prefix):
+    # Префікс рядкового UUID відповідає суцільному діапазону його 128-бітного числа,
+    # тому пошук зводиться до двох бінарних пошуків у відсортованому списку ключів.
+    prefix = prefix.lower()
+    if len(prefix) > 36:
+        return None
+    for position, char in enumerate(prefix):
+        if position in _DASH_POSITIONS:
+            if char != "-":
+                return None
+        elif char not in _HEX_DIGITS:
+            return None
+
+    digits = prefix.replace("-", "")
+    shift = 4 * (32 - len(digits))
+    value = int(digits, 16) if digits else 0
+    return value << shift, (value + 1) << shift
+
+
+class PrefixIndex:
+    MAX_PENDING = 1024
+
+    def __init__(self, keys=()):
+        self._keys = []
+        self._pending = []
+        self._text_keys = set()
+        for key in keys:
+            if isinstance(key, int):
+                self._keys.append(key)
+            else:
+                self._text_keys.add(key)
+        self._keys.sort()
+
+    def add(self, key):
+        if not isinstance(key, int):
+            self._text_keys.add(key)
+            return
+        # Нові ключі спершу збираються в невеликий буфер, щоб масове додавання
+        # не зсувало весь відсортований список на кожному записі.
+        self._pending.append(key)
+        if len(self._pending) > self.MAX_PENDING:
+            self._flush()
+
+    def discard(self, key):
+        if not isinstance(key, int):
+            self._text_keys.discard(key)
+            return
+        position = bisect_left(self._keys, key)
+        if position < len(self._keys) and self._keys[position] == key:
+            del self._keys[position]
+        elif key in self._pending:
+            self._pending.remove(key)
+
+    def _flush(self):
+        if len(self._pending) == 1:
+            insort(self._keys, self._pending[0])
+        else:
+            self._keys.extend(self._pending)
+            self._keys.sort()
+        self._pending = []
+
+    def find(self, prefix, limit=2):
+        matches = []
+        bounds = uuid_prefix_range(prefix)
+        if bounds is not None:
+            low, high = bounds
+            position = bisect_left(self._keys, low)
+            while position < len(self._keys) and self._keys[position] < high and len(matches) < limit:
+                matches.append(self._keys[position])
+                position += 1
+            matches.extend(key for key in self._pending if low <= key < high)
+
+        if self._text_keys:
+            matches.extend(key for key in self._text_keys if key.startswith(prefix))
+        return [format_id(key) for key in matches[:limit]]
+
+
+class NgramIndex:
+    # Інвертований індекс триграм для пошуку за підрядком. Триграми посилаються не на
+    # рядки, а на різні значення поля (у нижньому регістрі), а вже значення — на
+    # ідентифікатори записів: марок і моделей небагато, тож індекс лишається малим.
+    N = 3
+
+    def __init__(self):
+        self._grams = {}
+        self._values = {}
+
+    def add(self, key, text):
+        value = text.casefold()
+        keys = self._values.get(value)
+        if keys is None:
+            keys = self._values[value] = set()
+            for gram in _ngrams(value, self.N):
+                self._grams.setdefault(gram, set()).add(value)
+        keys.add(key)
+
+    def discard(self, key, text):
+        value = text.casefold()
+        keys = self._values.get(value)
+        if keys is None:
+            return
+        keys.discard(key)
+        if not keys:
+            del self._values[value]
+            for gram in _ngrams(value, self.N):
+                values = self._grams.get(gram)
+                if values is not None:
+                    values.discard(value)
+                    if not values:
+                        del self._grams[gram]
+
+    def search(self, query):
+        query = query.casefold()
+        if len(query) < self.N:
+            # Короткий запит не має жодної триграми — перевіряємо різні значення поля.
+            candidates = self._values
+        else:
+            postings = []
+            for gram in _ngrams(query, self.N):
+                values = self._grams.get(gram)
+                if not values:
+                    return set()
+                postings.append(values)
+            postings.sort(key=len)
+            candidates = postings[0].intersection(*postings[1:])
+
+        keys = set()
+        for value in candidates:
+            if query in value:
+                keys.update(self._values[value])
+        return keys
+
+
+def _ngrams(value, n):
+    return {value[i:i + n] for i in range(len(value) - n + 1)}
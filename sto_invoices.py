@@ -0,0 +1,138 @@
+import os
+import time
+import string
+from collections import deque
+
+
+INVOICE_TEMPLATE = """
+==================================================
+                РАХУНОК НА ОПЛАТУ
+==================================================
+Номер рахунку: {number}
+Дата створення: {date_created}
+--------------------------------------------------
+Власник: {owner}
+Транспортний засіб: {brand} {model}
+Реєстраційний номер: {reg_number}
+--------------------------------------------------
+Тип робіт: {work_type}
+Запчастини: {parts}
+Ресурси: {resources}
+--------------------------------------------------
+Загальна вартість: {estimated_cost:.2f} грн.
+Статус оплати: {status}
+==================================================
+            """
+
+# Повний ID заявки йде останнім: у тексті рахунку лише короткий номер, а імена файлів
+# пакетної генерації мають бути унікальними.
+INVOICE_FIELDS = ("number", "date_created", "owner", "brand", "model", "reg_number", "work_type", "parts",
+                  "resources", "estimated_cost", "status", "order_id")
+
+
+class InvoiceTemplate:
+    # Шаблон розбирається один раз у printf-рядок із фіксованим порядком полів,
+    # тож рендеринг рахунку — це одна операція форматування над кортежем значень.
+    def __init__(self, template, fields):
+        positions = {field: index for index, field in enumerate(fields)}
+        parts = []
+        self.order = []
+        for literal, field, spec, conversion in string.Formatter().parse(template):
+            parts.append(literal.replace("%", "%%"))
+            if field is None:
+                continue
+            if conversion:
+                raise ValueError(f"Перетворення !{conversion} у шаблоні рахунку не підтримується.")
+            parts.append(f"%{spec}" if spec else "%s")
+            self.order.append(positions[field])
+        self.format = "".join(parts)
+
+    def render(self, values):
+        return self.format % tuple(values[index] for index in self.order)
+
+
+DEFAULT_TEMPLATE = InvoiceTemplate(INVOICE_TEMPLATE, INVOICE_FIELDS)
+
+
+def invoice_values(order_id, order, vehicle):
+    return (order_id[:8], order["date_created"], vehicle["owner"], vehicle["brand"], vehicle["model"],
+            vehicle["reg_number"], order["work_type"], order["parts"] or "Не вказано",
+            order["resources"] or "Не вказано", order["estimated_cost"], order["status"], order_id)
+
+
+def render_invoice(values):
+    return DEFAULT_TEMPLATE.render(values)
+
+
+def _render_chunk(chunk, output_dir=None):
+    # У режимі каталогу процес сам записує свої файли — запис теж іде паралельно.
+    # Для архіву повертаємо закодований текст, а в архів його пише головний процес.
+    rendered = [(f"invoice_{values[-1]}.txt", DEFAULT_TEMPLATE.render(values).encode("utf-8")) for values in chunk]
+    if output_dir is None:
+        return rendered
+    for filename, payload in rendered:
+        with open(os.path.join(output_dir, filename), "wb") as file:
+            file.write(payload)
+    return len(rendered)
+
+
+def _chunks(rows, chunk_size):
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def write_invoices(rows, output, archive=False, workers=None, chunk_size=1000):
+    # rows — ітератор кортежів invoice_values(); рахунки рендеряться пакетами у пулі
+    # процесів і записуються по мірі готовності, тож у пам'яті тримається лише
+    # кілька пакетів незалежно від загальної кількості рахунків.
+    started = time.perf_counter()
+    count = 0
+    zip_file = None
+    output_dir = None
+    if archive:
+        import zipfile
+        zip_file = zipfile.ZipFile(output, "w", compression=zipfile.ZIP_DEFLATED)
+    else:
+        os.makedirs(output, exist_ok=True)
+        output_dir = output
+
+    def collect(result):
+        if zip_file is None:
+            return result
+        for filename, payload in result:
+            zip_file.writestr(filename, payload)
+        return len(result)
+
+    try:
+        if workers is not None and workers <= 1:
+            for chunk in _chunks(rows, chunk_size):
+                count += collect(_render_chunk(chunk, output_dir))
+        else:
+            from concurrent.futures import ProcessPoolExecutor
+
+            workers = workers or os.cpu_count() or 1
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                in_flight = deque()
+                for chunk in _chunks(rows, chunk_size):
+                    in_flight.append(executor.submit(_render_chunk, chunk, output_dir))
+                    while len(in_flight) >= 2 * workers:
+                        count += collect(in_flight.popleft().result())
+                while in_flight:
+                    count += collect(in_flight.popleft().result())
+    finally:
+        if zip_file is not None:
+            zip_file.close()
+
+    elapsed = time.perf_counter() - started
+    return {
+        "count": count,
+        "seconds": elapsed,
+        "per_second": count / elapsed if elapsed > 0 else 0.0,
+        "output": output
+    }
@@ -0,0 +1,57 @@
+import time
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+class FileLock:
+    # Міжпроцесне блокування через окремий файл-замок. На POSIX — flock зі спільним
+    # (читання) та ексклюзивним (запис) режимами; на Windows msvcrt підтримує лише
+    # ексклюзивне блокування, тож читачі там теж чекають один одного.
+    def __init__(self, path, timeout=30.0):
+        self.path = path
+        self.timeout = timeout
+        self._file = None
+
+    def acquire(self, shared=False):
+        if self._file is None:
+            self._file = open(self.path, "a+b")
+        deadline = time.monotonic() + self.timeout
+        while True:
+            try:
+                if fcntl is not None:
+                    fcntl.flock(self._file.fileno(), (fcntl.LOCK_SH if shared else fcntl.LOCK_EX) | fcntl.LOCK_NB)
+                else:
+                    self._file.seek(0)
+                    msvcrt.locking(self._file.fileno(), msvcrt.LK_NBLCK, 1)
+                return
+            except OSError:
+                if time.monotonic() >= deadline:
+                    raise TimeoutError(f"Не вдалося заблокувати {self.path}: файл зайнятий іншим процесом.")
+                time.sleep(0.001)
+
+    def release(self):
+        if self._file is None:
+            return
+        if fcntl is not None:
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+        else:
+            self._file.seek(0)
+            msvcrt.locking(self._file.fileno(), msvcrt.LK_UNLCK, 1)
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    @contextmanager
+    def locked(self, shared=False):
+        self.acquire(shared)
+        try:
+            yield self
+        finally:
+            self.release()
@@ -0,0 +1,316 @@
+import sys
+import uuid
+import datetime
+from collections.abc import Mapping
+from operator import attrgetter
+
+
+VEHICLE_FIELDS = ("id", "brand", "model", "year", "reg_number", "owner", "registration_date")
+ORDER_FIELDS = ("id", "vehicle_id", "date_created", "work_type", "parts", "resources", "estimated_cost", "status")
+STATS_FIELDS = ("orders_count", "unpaid_orders", "total_cost")
+ORDER_VEHICLE_FIELDS = ("brand", "model", "reg_number", "owner")
+ROLLUP_FIELDS = ("vehicle_id", "orders_count", "total_cost")
+
+_EPOCH = datetime.datetime(1970, 1, 1)
+_day_cache = {}
+_time_of_day = []
+
+
+def parse_id(value):
+    # Ідентифікатори — це UUID, тож у пам'яті тримаємо їх як 128-бітні числа.
+    # Рядки, що не є UUID (наприклад, відредаговані вручну), лишаються як є.
+    try:
+        if len(value) == 36 and value[8] == value[13] == value[18] == value[23] == "-":
+            return int(value.replace("-", ""), 16)
+        return uuid.UUID(value).int
+    except (TypeError, ValueError, AttributeError):
+        return value
+
+
+def format_id(key):
+    if not isinstance(key, int):
+        return key
+    value = f"{key:032x}"
+    return f"{value[:8]}-{value[8:12]}-{value[12:16]}-{value[16:20]}-{value[20:]}"
+
+
+def timestamp_to_number(value):
+    # Час у даних "настінний" (без часової зони), тому рахуємо секунди від
+    # 1970-01-01 00:00:00 без перерахунку у UTC — так перетворення завжди оборотне.
+    try:
+        return int((datetime.datetime.fromisoformat(value) - _EPOCH).total_seconds())
+    except (TypeError, ValueError):
+        return value
+
+
+def number_to_timestamp(value):
+    if not isinstance(value, int):
+        return value
+    if not _time_of_day:
+        _time_of_day.extend(f" {h:02d}:{m:02d}:{s:02d}" for h in range(24) for m in range(60) for s in range(60))
+    days, seconds = divmod(value, 86400)
+    date_part = _day_cache.get(days)
+    if date_part is None:
+        date_part = (_EPOCH + datetime.timedelta(days=days)).strftime("%Y-%m-%d")
+        _day_cache[days] = date_part
+    return date_part + _time_of_day[seconds]
+
+
+def intern_text(value):
+    return sys.intern(value) if type(value) is str else value
+
+
+class Record(Mapping):
+    # Записи та представлення доступні лише для читання і поводяться як словники
+    # з публічними полями, тому їх можна віддавати назовні без копіювання.
+    __slots__ = ()
+    FIELDS = ()
+    GETTERS = {}
+
+    def __getitem__(self, key):
+        try:
+            getter = self.GETTERS[key]
+        except KeyError:
+            raise KeyError(key) from None
+        return getter(self)
+
+    def __iter__(self):
+        return iter(self.FIELDS)
+
+    def __len__(self):
+        return len(self.FIELDS)
+
+    def __repr__(self):
+        return f"{type(self).__name__}({dict(self)!r})"
+
+    def to_dict(self):
+        return {field: self[field] for field in self.FIELDS}
+
+
+class Vehicle(Record):
+    __slots__ = ("uid", "brand", "model", "year", "reg_number", "owner", "registered_at")
+    FIELDS = VEHICLE_FIELDS
+
+    def __init__(self, uid, brand, model, year, reg_number, owner, registered_at):
+        self.uid = uid
+        self.brand = intern_text(brand)
+        self.model = intern_text(model)
+        self.year = year
+        self.reg_number = reg_number
+        self.owner = owner
+        self.registered_at = registered_at
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(parse_id(data["id"]), data["brand"], data["model"], data["year"], data["reg_number"],
+                   data["owner"], timestamp_to_number(data.get("registration_date")))
+
+    def to_row(self):
+        return (self.uid, self.brand, self.model, self.year, self.reg_number, self.owner, self.registered_at)
+
+    def to_dict(self):
+        return {
+            "id": format_id(self.uid),
+            "brand": self.brand,
+            "model": self.model,
+            "year": self.year,
+            "reg_number": self.reg_number,
+            "owner": self.owner,
+            "registration_date": number_to_timestamp(self.registered_at)
+        }
+
+
+Vehicle.GETTERS = {
+    "id": lambda record: format_id(record.uid),
+    "brand": attrgetter("brand"),
+    "model": attrgetter("model"),
+    "year": attrgetter("year"),
+    "reg_number": attrgetter("reg_number"),
+    "owner": attrgetter("owner"),
+    "registration_date": lambda record: number_to_timestamp(record.registered_at),
+}
+
+
+class RepairOrder(Record):
+    __slots__ = ("uid", "vehicle_uid", "created_at", "work_type", "parts", "resources", "estimated_cost", "status")
+    FIELDS = ORDER_FIELDS
+
+    def __init__(self, uid, vehicle_uid, created_at, work_type, parts, resources, estimated_cost, status):
+        self.uid = uid
+        self.vehicle_uid = vehicle_uid
+        self.created_at = created_at
+        self.work_type = intern_text(work_type)
+        self.parts = parts
+        self.resources = resources
+        self.estimated_cost = estimated_cost
+        self.status = intern_text(status)
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(parse_id(data["id"]), parse_id(data["vehicle_id"]), timestamp_to_number(data.get("date_created")),
+                   data["work_type"], data["parts"], data["resources"], data["estimated_cost"], data["status"])
+
+    def to_row(self):
+        return (self.uid, self.vehicle_uid, self.created_at, self.work_type, self.parts, self.resources,
+                self.estimated_cost, self.status)
+
+    def to_dict(self):
+        return {
+            "id": format_id(self.uid),
+            "vehicle_id": format_id(self.vehicle_uid),
+            "date_created": number_to_timestamp(self.created_at),
+            "work_type": self.work_type,
+            "parts": self.parts,
+            "resources": self.resources,
+            "estimated_cost": self.estimated_cost,
+            "status": self.status
+        }
+
+
+RepairOrder.GETTERS = {
+    "id": lambda record: format_id(record.uid),
+    "vehicle_id": lambda record: format_id(record.vehicle_uid),
+    "date_created": lambda record: number_to_timestamp(record.created_at),
+    "work_type": attrgetter("work_type"),
+    "parts": attrgetter("parts"),
+    "resources": attrgetter("resources"),
+    "estimated_cost": attrgetter("estimated_cost"),
+    "status": attrgetter("status"),
+}
+
+
+class OrderRollup(Record):
+    # Підсумок заархівованих (оплачених) заявок транспортного засобу; ключ — ID засобу.
+    __slots__ = ("uid", "orders_count", "total_cost")
+    FIELDS = ROLLUP_FIELDS
+
+    def __init__(self, uid, orders_count, total_cost):
+        self.uid = uid
+        self.orders_count = orders_count
+        self.total_cost = total_cost
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(parse_id(data["vehicle_id"]), data["orders_count"], data["total_cost"])
+
+    def to_row(self):
+        return (self.uid, self.orders_count, self.total_cost)
+
+    def to_dict(self):
+        return {
+            "vehicle_id": format_id(self.uid),
+            "orders_count": self.orders_count,
+            "total_cost": self.total_cost
+        }
+
+
+OrderRollup.GETTERS = {
+    "vehicle_id": lambda record: format_id(record.uid),
+    "orders_count": attrgetter("orders_count"),
+    "total_cost": attrgetter("total_cost"),
+}
+
+
+class VehicleView(Record):
+    __slots__ = ("vehicle", "orders_count", "unpaid_orders", "total_cost")
+    FIELDS = VEHICLE_FIELDS + STATS_FIELDS
+
+    def __init__(self, vehicle, orders_count, unpaid_orders, total_cost):
+        self.vehicle = vehicle
+        self.orders_count = orders_count
+        self.unpaid_orders = unpaid_orders
+        self.total_cost = total_cost
+
+    def __getitem__(self, key):
+        if key in STATS_FIELDS:
+            return getattr(self, key)
+        return self.vehicle[key]
+
+    def to_dict(self):
+        # Напряму з полів запису: dict(view) звертається до кожного поля через __getitem__.
+        row = self.vehicle.to_dict()
+        row["orders_count"] = self.orders_count
+        row["unpaid_orders"] = self.unpaid_orders
+        row["total_cost"] = self.total_cost
+        return row
+
+
+class OrderView(Record):
+    __slots__ = ("order", "vehicle")
+    FIELDS = ORDER_FIELDS + ORDER_VEHICLE_FIELDS
+
+    def __init__(self, order, vehicle):
+        self.order = order
+        self.vehicle = vehicle
+
+    def __getitem__(self, key):
+        if key in ORDER_VEHICLE_FIELDS:
+            return getattr(self.vehicle, key)
+        return self.order[key]
+
+    def to_dict(self):
+        row = self.order.to_dict()
+        vehicle = self.vehicle
+        row["brand"] = vehicle.brand
+        row["model"] = vehicle.model
+        row["reg_number"] = vehicle.reg_number
+        row["owner"] = vehicle.owner
+        return row
+
+
+class FrozenRow(Record):
+    # Звичайний словник-рядок (SQLite, архів) під тим самим інтерфейсом лише для читання:
+    # такі рядки лежать у кеші результатів і спільні для всіх, хто їх отримав.
+    __slots__ = ("row",)
+
+    def __init__(self, row):
+        self.row = row
+
+    def __getitem__(self, key):
+        return self.row[key]
+
+    def __iter__(self):
+        return iter(self.row)
+
+    def __len__(self):
+        return len(self.row)
+
+    def to_dict(self):
+        return dict(self.row)
+
+
+class TableView(Mapping):
+    # Таблиця сховища як відображення ID -> запис лише для читання. Записи читаються
+    # через get/iterate сховища, тож вигляд однаковий для JSON і SQLite і не тримає копії.
+    __slots__ = ("_get", "_iterate")
+
+    def __init__(self, get, iterate):
+        self._get = get
+        self._iterate = iterate
+
+    def __getitem__(self, record_id):
+        record = self._get(record_id) if isinstance(record_id, str) else None
+        if record is None:
+            raise KeyError(record_id)
+        return record if isinstance(record, Record) else FrozenRow(record)
+
+    def __iter__(self):
+        return (record["id"] for record in self._iterate())
+
+    def __len__(self):
+        return sum(1 for _ in self._iterate())
+
+    def __repr__(self):
+        return f"{type(self).__name__}({len(self)} записів)"
+
+
+def freeze_rows(rows):
+    return tuple(row if isinstance(row, Record) else FrozenRow(row) for row in rows)
+
+
+RECORD_TYPES = {"vehicles": Vehicle, "repair_orders": RepairOrder, "order_rollups": OrderRollup}
+
+
+def records_from_dicts(data):
+    return {table: {record.uid: record for record in map(RECORD_TYPES[table].from_dict, records.values())}
+            for table, records in data.items()}
@@ -0,0 +1,371 @@
+import re
+import sys
+import json
+import time
+import asyncio
+import argparse
+from urllib.parse import urlsplit, parse_qsl
+
+from sto_system import STOManagementSystem, PAGE_SIZE, VEHICLE_SORT_KEYS, ORDER_SORT_KEYS
+
+
+MAX_HEADER_SIZE = 64 * 1024
+MAX_BODY_SIZE = 1024 * 1024
+MAX_BATCH = 256
+
+HTTP_REASONS = {200: "OK", 201: "Created", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+                413: "Payload Too Large", 500: "Internal Server Error"}
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class WriteQueue:
+    # Усі зміни проходять через одну задачу-записувача. Заявки, що накопичились, поки
+    # виконувалась попередня пачка, застосовуються в одній транзакції: кожна зміна —
+    # у власній точці збереження, тож помилка однієї не скасовує інших, а на диск
+    # пачка записується одним збереженням.
+    def __init__(self, system, max_batch=MAX_BATCH):
+        self.system = system
+        self.max_batch = max_batch
+        self.queue = asyncio.Queue()
+        self.batches = 0
+        self.writes = 0
+        self._task = None
+
+    def start(self):
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    async def submit(self, method, *args):
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((method, args, future))
+        return await future
+
+    async def _run(self):
+        while True:
+            batch = [await self.queue.get()]
+            while len(batch) < self.max_batch and not self.queue.empty():
+                batch.append(self.queue.get_nowait())
+
+            results = []
+            try:
+                with self.system.transaction():
+                    for method, args, _ in batch:
+                        results.append(method(*args))
+            except Exception as e:
+                for _, _, future in batch:
+                    if not future.done():
+                        future.set_result((False, f"Помилка збереження даних: {str(e)}"))
+                continue
+
+            self.batches += 1
+            self.writes += len(batch)
+            for (_, _, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+
+
+class STOService:
+    def __init__(self, system):
+        self.system = system
+        self.writer = WriteQueue(system)
+        self.requests = 0
+        self.started = time.time()
+        self.routes = [
+            ("GET", r"/health", self.health),
+            ("GET", r"/stats", self.stats),
+            ("GET", r"/vehicles", self.list_vehicles),
+            ("POST", r"/vehicles", self.register_vehicle),
+            ("GET", r"/vehicles/([^/]+)", self.get_vehicle),
+            ("PATCH", r"/vehicles/([^/]+)", self.edit_vehicle),
+            ("DELETE", r"/vehicles/([^/]+)", self.delete_vehicle),
+            ("GET", r"/orders", self.list_orders),
+            ("POST", r"/orders", self.add_repair_order),
+            ("GET", r"/orders/([^/]+)", self.get_order),
+            ("POST", r"/orders/([^/]+)/pay", self.mark_order_paid),
+            ("GET", r"/orders/([^/]+)/invoice", self.generate_invoice),
+        ]
+        self.routes = [(method, re.compile(pattern + "$"), handler) for method, pattern, handler in self.routes]
+
+    async def dispatch(self, method, path, query, body):
+        allowed = False
+        for route_method, pattern, handler in self.routes:
+            match = pattern.match(path)
+            if match is None:
+                continue
+            if route_method != method:
+                allowed = True
+                continue
+            return await handler(query, body, *match.groups())
+        if allowed:
+            raise HTTPError(405, "Метод не підтримується для цього ресурсу.")
+        raise HTTPError(404, "Ресурс не знайдено.")
+
+    # --- читання: виконуються одразу над даними в пам'яті ---
+
+    async def health(self, query, body):
+        return 200, {"ok": True}
+
+    async def stats(self, query, body):
+        return 200, {
+            "ok": True,
+            "uptime_seconds": time.time() - self.started,
+            "requests": self.requests,
+            "write_batches": self.writer.batches,
+            "writes": self.writer.writes,
+            "system": self.system.get_stats()
+        }
+
+    async def list_vehicles(self, query, body):
+        sort_by, limit, cursor = _page_params(query, VEHICLE_SORT_KEYS)
+        rows, next_cursor = self.system.get_vehicles_page(
+            query.get("brand"), query.get("model"), query.get("payment"), sort_by, limit, cursor,
+            query.get("owner"), query.get("reg_number"))
+        return 200, {"ok": True, "items": [dict(row) for row in rows], "next_cursor": next_cursor}
+
+    async def list_orders(self, query, body):
+        sort_by, limit, cursor = _page_params(query, ORDER_SORT_KEYS)
+        rows, next_cursor = self.system.get_repair_orders_page(query.get("vehicle_id"), sort_by, limit, cursor)
+        return 200, {"ok": True, "items": [dict(row) for row in rows], "next_cursor": next_cursor}
+
+    async def get_vehicle(self, query, body, vehicle_id):
+        return 200, {"ok": True, "item": dict(self._vehicle(vehicle_id))}
+
+    async def get_order(self, query, body, order_id):
+        return 200, {"ok": True, "item": dict(self._order(order_id))}
+
+    async def generate_invoice(self, query, body, order_id):
+        return _result(self.system.generate_invoice(self._order(order_id)["id"]), key="invoice")
+
+    # --- зміни: серіалізуються через записувача ---
+
+    async def register_vehicle(self, query, body):
+        data = _require(body, "brand", "model", "year", "reg_number", "owner")
+        _require_text(data, "brand", "model", "reg_number", "owner")
+        if not isinstance(data["year"], int):
+            raise HTTPError(400, "Рік випуску має бути числом.")
+        status, payload = _result(await self.writer.submit(self.system.register_vehicle, data["brand"],
+                                                           data["model"], data["year"], data["reg_number"],
+                                                           data["owner"]), created=True)
+        if payload["ok"]:
+            payload["id"] = self.system.storage.vehicle_id_by_reg(data["reg_number"])
+        return status, payload
+
+    async def edit_vehicle(self, query, body, vehicle_id):
+        vehicle_id = self._vehicle(vehicle_id)["id"]
+        _require_text(body, "brand", "model", "reg_number", "owner")
+        if "year" in body and not isinstance(body["year"], int):
+            raise HTTPError(400, "Рік випуску має бути числом.")
+        return _result(await self.writer.submit(self.system.edit_vehicle, vehicle_id, body.get("brand"),
+                                                body.get("model"), body.get("year"), body.get("reg_number"),
+                                                body.get("owner")))
+
+    async def delete_vehicle(self, query, body, vehicle_id):
+        vehicle_id = self._vehicle(vehicle_id)["id"]
+        return _result(await self.writer.submit(self.system.delete_vehicle, vehicle_id))
+
+    async def add_repair_order(self, query, body):
+        data = _require(body, "vehicle_id", "work_type", "estimated_cost")
+        _require_text(data, "vehicle_id", "work_type", "parts", "resources")
+        cost = data["estimated_cost"]
+        if isinstance(cost, bool) or not isinstance(cost, (int, float)):
+            raise HTTPError(400, "Вартість має бути числом.")
+        vehicle_id = self._vehicle(data["vehicle_id"])["id"]
+        return _result(await self.writer.submit(self.system.add_repair_order, vehicle_id, data["work_type"],
+                                                body.get("parts", ""), body.get("resources", ""), float(cost)),
+                       created=True)
+
+    async def mark_order_paid(self, query, body, order_id):
+        order_id = self._order(order_id)["id"]
+        return _result(await self.writer.submit(self.system.mark_order_paid, order_id))
+
+    def _vehicle(self, vehicle_id):
+        found, vehicle = self.system.find_vehicle_by_prefix(vehicle_id)
+        if not found:
+            raise HTTPError(404, vehicle)
+        return vehicle
+
+    def _order(self, order_id):
+        found, order = self.system.find_order_by_prefix(order_id)
+        if not found:
+            raise HTTPError(404, order)
+        return order
+
+    # --- HTTP ---
+
+    async def handle_connection(self, reader, writer):
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    break
+                except asyncio.LimitOverrunError:
+                    await _send(writer, 413, {"ok": False, "error": "Заголовки запиту завеликі."}, False)
+                    break
+
+                keep_alive = await self.handle_request(head, reader, writer)
+                if not keep_alive:
+                    break
+        finally:
+            writer.close()
+
+    async def handle_request(self, head, reader, writer):
+        self.requests += 1
+        lines = head.decode("latin-1").split("\r\n")
+        try:
+            method, target, version = lines[0].split(" ", 2)
+        except ValueError:
+            await _send(writer, 400, {"ok": False, "error": "Некоректний рядок запиту."}, False)
+            return False
+
+        headers = {}
+        for line in lines[1:]:
+            if ":" in line:
+                name, value = line.split(":", 1)
+                headers[name.strip().lower()] = value.strip()
+        connection = headers.get("connection", "").lower()
+        keep_alive = connection == "keep-alive" if version == "HTTP/1.0" else connection != "close"
+
+        try:
+            length = int(headers.get("content-length") or 0)
+        except ValueError:
+            length = -1
+        if length < 0:
+            # Без коректної довжини тіло не відокремити від наступного запиту, тож з'єднання закривається.
+            await _send(writer, 400, {"ok": False, "error": "Некоректний заголовок Content-Length."}, False)
+            return False
+        if length > MAX_BODY_SIZE:
+            await _send(writer, 413, {"ok": False, "error": "Тіло запиту завелике."}, False)
+            return False
+        raw_body = await reader.readexactly(length) if length else b""
+
+        url = urlsplit(target)
+        query = dict(parse_qsl(url.query))
+        try:
+            body = json.loads(raw_body) if raw_body else {}
+            if not isinstance(body, dict):
+                raise HTTPError(400, "Тіло запиту має бути JSON-об'єктом.")
+            status, payload = await self.dispatch(method.upper(), url.path.rstrip("/") or "/", query, body)
+        except HTTPError as e:
+            status, payload = e.status, {"ok": False, "error": str(e)}
+        except ValueError as e:
+            status, payload = 400, {"ok": False, "error": f"Некоректний запит: {str(e)}"}
+        except Exception as e:
+            status, payload = 500, {"ok": False, "error": f"Внутрішня помилка: {str(e)}"}
+
+        await _send(writer, status, payload, keep_alive)
+        return keep_alive
+
+    async def serve(self, host, port):
+        self.writer.start()
+        server = await asyncio.start_server(self.handle_connection, host, port, limit=MAX_HEADER_SIZE)
+        return server
+
+
+def _int_param(query, name, default):
+    value = query.get(name)
+    if value is None:
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        raise HTTPError(400, f"Параметр {name} має бути числом.")
+
+
+def _page_params(query, sort_keys):
+    # Перевіряється до запиту: get_*_page ковтає помилки і повернув би 200 з порожнім списком.
+    sort_by = query.get("sort_by") or None
+    limit = _int_param(query, "limit", PAGE_SIZE)
+    cursor = query.get("cursor")
+    if limit < 1:
+        raise HTTPError(400, "Параметр limit має бути додатним числом.")
+    if sort_by and sort_by not in sort_keys:
+        raise HTTPError(400, f"Невідоме поле сортування: {sort_by}")
+    try:
+        STOManagementSystem._parse_cursor(cursor, sort_by)
+    except ValueError as e:
+        raise HTTPError(400, str(e))
+    return sort_by, limit, cursor
+
+
+def _require(body, *fields):
+    missing = [field for field in fields if field not in body]
+    if missing:
+        raise HTTPError(400, f"Не вказано поля: {', '.join(missing)}.")
+    return body
+
+
+def _require_text(body, *fields):
+    # null означає «не змінювати» (для редагування); будь-який інший нерядок відхиляється,
+    # бо потрапив би у збережені дані й зламав би пошук.
+    wrong = [field for field in fields if body.get(field) is not None and not isinstance(body[field], str)]
+    if wrong:
+        raise HTTPError(400, f"Поля мають бути рядками: {', '.join(wrong)}.")
+
+
+def _result(result, key="message", created=False):
+    ok, message = result
+    if not ok:
+        return 400, {"ok": False, "error": message}
+    return 201 if created else 200, {"ok": True, key: message}
+
+
+async def _send(writer, status, payload, keep_alive):
+    body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+    head = (f"HTTP/1.1 {status} {HTTP_REASONS.get(status, 'OK')}\r\n"
+            f"Content-Type: application/json; charset=utf-8\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+    writer.write(head.encode("latin-1") + body)
+    try:
+        await writer.drain()
+    except ConnectionError:
+        pass
+
+
+async def run_server(system, host="127.0.0.1", port=8080, ready=None):
+    service = STOService(system)
+    server = await service.serve(host, port)
+    address = server.sockets[0].getsockname()
+    print(f"Сервіс СТО слухає http://{address[0]}:{address[1]}", flush=True)
+    if ready is not None:
+        ready(address)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        await service.writer.stop()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Локальний HTTP/JSON сервіс системи управління СТО.")
+    parser.add_argument("--data", default="sto_data.json", help="файл даних (.json, .bin або .db)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--no-journal", action="store_true", help="зберігати повний знімок після кожної пачки змін")
+    args = parser.parse_args(argv)
+
+    system = STOManagementSystem(args.data, journal=not args.no_journal)
+    try:
+        asyncio.run(run_server(system, args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        system.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,496 @@
+import os
+import sys
+import json
+import heapq
+import argparse
+import itertools
+import multiprocessing
+
+from sto_lock import FileLock
+from sto_cli import positive_int
+from sto_records import Record
+from sto_table import Column, TableRenderer
+from sto_system import (STOManagementSystem, VEHICLE_SORT_KEYS, ORDER_SORT_KEYS, VEHICLE_COLUMNS, ORDER_COLUMNS,
+                        tabulate)
+
+
+NETWORK_LOCK_NAME = "sto_network.lock"
+NO_HOME_MESSAGE = "Не вказано власну філію: записувати можна лише у її шард."
+WORKER_STOP_TIMEOUT = 10.0
+SQLITE_SUFFIXES = (".db", ".sqlite", ".sqlite3")
+
+
+class ShardError(Exception):
+    pass
+
+
+# --- запити, що виконуються у процесі філії ---
+
+def _plain_rows(rows):
+    # Назад до фасаду рядки передаються звичайними словниками (їх треба серіалізувати).
+    return [row.to_dict() if isinstance(row, Record) else dict(row) for row in rows]
+
+
+def _query_vehicles(system, filters, sort_by, limit):
+    filter_brand, filter_model, filter_payment, filter_owner, filter_reg = filters
+    return _plain_rows(system.iter_vehicles(filter_brand, filter_model, filter_payment, sort_by, limit,
+                                            filter_owner=filter_owner, filter_reg=filter_reg))
+
+
+def _query_orders(system, vehicle_id, include_archived, filter_owner, filter_reg, sort_by, limit):
+    if not (filter_owner or filter_reg):
+        return _plain_rows(system.iter_repair_orders(vehicle_id, sort_by, limit, include_archived=include_archived))
+    # Історія власника чи номера: спершу його транспортні засоби, потім їхні заявки.
+    vehicle_ids = [vehicle["id"] for vehicle in system.iter_vehicles(filter_owner=filter_owner, filter_reg=filter_reg)
+                   if not vehicle_id or vehicle["id"] == vehicle_id]
+    rows = itertools.chain.from_iterable(system.iter_repair_orders(found, include_archived=include_archived)
+                                         for found in vehicle_ids)
+    return _plain_rows(STOManagementSystem._paginate(rows, ORDER_SORT_KEYS, sort_by, limit, None)[0])
+
+
+def _query_reg(system, reg_number):
+    return system.storage.vehicle_id_by_reg(reg_number)
+
+
+def _query_call(system, method, *args):
+    return getattr(system, method)(*args)
+
+
+SHARD_QUERIES = {
+    "vehicles": _query_vehicles,
+    "orders": _query_orders,
+    "reg": _query_reg,
+    "call": _query_call,
+}
+
+
+def _check_shared_journal(data_file):
+    # Термінал філії без спільного режиму не бере замок і при збереженні чи ущільненні
+    # перезаписує файл повністю, затираючи записи фасаду, тож такий шард не відкривається.
+    # Порожній або відсутній журнал перевірити нема як — лишається вимога STO_SHARED=1.
+    if str(data_file).endswith(SQLITE_SUFFIXES):
+        return
+    try:
+        with open(data_file + ".journal", "rb") as file:
+            first_line = file.readline()
+    except FileNotFoundError:
+        return
+    if not first_line:
+        return
+    try:
+        header = json.loads(first_line)
+    except ValueError:
+        header = None
+    if not isinstance(header, dict) or header.get("op") != "base":
+        raise ShardError(f"журнал {data_file}.journal ведеться не у спільному режимі; "
+                         "термінали філії мають працювати з STO_SHARED=1")
+
+
+def _serve_shard(connection, data_file):
+    # Процес філії тримає її дані завантаженими між запитами. Спільний режим підхоплює
+    # зміни, які тим часом записали термінали самої філії. Першою відповіддю процес
+    # повідомляє, чи вдалося відкрити шард.
+    try:
+        _check_shared_journal(data_file)
+        system = STOManagementSystem(data_file, journal=True, shared=True)
+    except Exception as e:
+        connection.send(("error", f"{type(e).__name__}: {str(e)}"))
+        connection.close()
+        return
+    connection.send(("ok", None))
+    try:
+        while True:
+            try:
+                request = connection.recv()
+            except EOFError:
+                break
+            if request is None:
+                break
+            query, args = request
+            try:
+                connection.send(("ok", SHARD_QUERIES[query](system, *args)))
+            except Exception as e:
+                connection.send(("error", f"{type(e).__name__}: {str(e)}"))
+    finally:
+        system.close()
+        connection.close()
+
+
+class ShardWorker:
+    def __init__(self, name, data_file):
+        self.name = name
+        self.data_file = data_file
+        context = multiprocessing.get_context()
+        self.connection, child = context.Pipe()
+        self.process = context.Process(target=_serve_shard, args=(child, data_file), name=f"sto-shard-{name}",
+                                       daemon=True)
+        self.process.start()
+        child.close()
+
+    def send(self, query, *args):
+        self.connection.send((query, args))
+
+    def receive(self):
+        try:
+            status, value = self.connection.recv()
+        except EOFError:
+            raise ShardError("процес філії завершився")
+        if status != "ok":
+            raise ShardError(value)
+        return value
+
+    def close(self):
+        try:
+            self.connection.send(None)
+        except OSError:
+            pass
+        self.process.join(WORKER_STOP_TIMEOUT)
+        if self.process.is_alive():
+            self.process.terminate()
+            self.process.join()
+        self.connection.close()
+
+
+class ShardedSystem:
+    # Фасад над мережею філій: кожна філія має власний файл даних (шард), який обслуговує
+    # окремий процес. Читання розсилається всім шардам паралельно, а результати зливаються;
+    # записи йдуть лише у шард власної філії (home). Реєстраційний номер перевіряється в
+    # усіх шардах під спільним замком мережі, тож двох однакових номерів у мережі не буде,
+    # якщо філії реєструють засоби через фасад. Термінали філій мають працювати у спільному
+    # режимі (STO_SHARED=1): лише тоді фасад бачить їхні записи, а вони не затирають його.
+    def __init__(self, branches, home=None, lock_file=None):
+        # branches — {назва філії: файл даних}.
+        if not branches:
+            raise ValueError("Не вказано жодної філії.")
+        if home is not None and home not in branches:
+            raise ValueError(f"Невідома філія: {home}.")
+        self.branches = dict(branches)
+        self.home = home
+        self.workers = {}
+        try:
+            for name, data_file in self.branches.items():
+                self.workers[name] = ShardWorker(name, data_file)
+            for name, worker in self.workers.items():
+                try:
+                    worker.receive()
+                except ShardError as e:
+                    raise ShardError(f"{name}: {str(e)}")
+        except Exception:
+            self.close()
+            raise
+        if lock_file is None and home is not None:
+            lock_file = os.path.join(os.path.dirname(os.path.abspath(self.branches[home])), NETWORK_LOCK_NAME)
+        self._lock = FileLock(lock_file) if lock_file else None
+
+    def close(self):
+        for worker in self.workers.values():
+            worker.close()
+        self.workers = {}
+        if getattr(self, "_lock", None) is not None:
+            self._lock.close()
+
+    def _scatter(self, query, *args):
+        # Спершу запит отримують усі шарди, і лише потім збираються відповіді — шарди
+        # працюють одночасно. Відповіді читаються з усіх, навіть якщо якийсь відмовив.
+        sent = []
+        try:
+            for worker in self.workers.values():
+                worker.send(query, *args)
+                sent.append(worker)
+        except Exception as e:
+            # Шарди, що вже отримали запит, відповідають у будь-якому разі; ці відповіді
+            # вичитуються, інакше наступний запит прочитав би чужу відповідь.
+            for worker in sent:
+                try:
+                    worker.receive()
+                except Exception:
+                    pass
+            raise ShardError(f"не вдалося надіслати запит: {str(e)}")
+        results = {}
+        errors = []
+        for name, worker in self.workers.items():
+            try:
+                results[name] = worker.receive()
+            except Exception as e:
+                errors.append(f"{name}: {str(e)}")
+        if errors:
+            raise ShardError("; ".join(errors))
+        return results
+
+    def _home_call(self, method, *args):
+        if self.home is None:
+            return False, NO_HOME_MESSAGE
+        worker = self.workers[self.home]
+        worker.send("call", method, *args)
+        return worker.receive()
+
+    def _branch_by_reg(self, reg_number):
+        for name, vehicle_id in self._scatter("reg", reg_number).items():
+            if vehicle_id is not None:
+                return name, vehicle_id
+        return None, None
+
+    # --- записи: лише у шард власної філії ---
+
+    def register_vehicle(self, brand, model, year, reg_number, owner):
+        try:
+            if self.home is None:
+                return False, NO_HOME_MESSAGE
+            # Замок мережі бере лише фасад: унікальність номера між філіями гарантована тільки
+            # для реєстрацій через фасад. Термінал філії перевіряє номер лише у власному шарді,
+            # тож його реєстрація може повторити номер іншої філії.
+            with self._lock.locked():
+                branch, _ = self._branch_by_reg(reg_number)
+                if branch is not None:
+                    return False, ("Помилка: транспортний засіб з таким реєстраційним номером "
+                                   f"вже зареєстровано у філії {branch}.")
+                return self._home_call("register_vehicle", brand, model, year, reg_number, owner)
+        except Exception as e:
+            return False, f"Помилка при реєстрації транспортного засобу: {str(e)}"
+
+    def edit_vehicle(self, vehicle_id, brand=None, model=None, year=None, reg_number=None, owner=None):
+        try:
+            if self.home is None or not reg_number:
+                return self._home_call("edit_vehicle", vehicle_id, brand, model, year, reg_number, owner)
+            # Як і в register_vehicle, перевірка між філіями діє лише для змін через фасад.
+            with self._lock.locked():
+                branch, found_id = self._branch_by_reg(reg_number)
+                if branch is not None and (branch, found_id) != (self.home, vehicle_id):
+                    return False, ("Помилка: транспортний засіб з таким реєстраційним номером "
+                                   f"вже зареєстровано у філії {branch}.")
+                return self._home_call("edit_vehicle", vehicle_id, brand, model, year, reg_number, owner)
+        except Exception as e:
+            return False, f"Помилка при редагуванні транспортного засобу: {str(e)}"
+
+    def delete_vehicle(self, vehicle_id):
+        try:
+            return self._home_call("delete_vehicle", vehicle_id)
+        except Exception as e:
+            return False, f"Помилка при видаленні транспортного засобу: {str(e)}"
+
+    def add_repair_order(self, vehicle_id, work_type, parts, resources, estimated_cost):
+        try:
+            return self._home_call("add_repair_order", vehicle_id, work_type, parts, resources, estimated_cost)
+        except Exception as e:
+            return False, f"Помилка при додаванні заявки на ремонт: {str(e)}"
+
+    def mark_order_paid(self, order_id):
+        try:
+            return self._home_call("mark_order_paid", order_id)
+        except Exception as e:
+            return False, f"Помилка при оновленні статусу заявки: {str(e)}"
+
+    # --- читання: паралельно з усіх шардів ---
+
+    def find_vehicle_by_reg(self, reg_number):
+        try:
+            rows = self.get_vehicles(filter_reg=reg_number)
+            for row in rows:
+                if row["reg_number"] == reg_number:
+                    return True, row
+            return False, "Транспортний засіб не знайдено."
+        except Exception as e:
+            return False, f"Помилка при пошуку транспортного засобу: {str(e)}"
+
+    def generate_invoice(self, order_id):
+        try:
+            for success, invoice in self._scatter("call", "generate_invoice", order_id).values():
+                if success:
+                    return True, invoice
+            return False, "Заявку не знайдено."
+        except Exception as e:
+            return False, f"Помилка при генерації рахунку: {str(e)}"
+
+    def get_vehicles(self, filter_brand=None, filter_model=None, filter_payment=None, filter_owner=None,
+                     filter_reg=None, sort_by=None, limit=None):
+        try:
+            filters = (filter_brand, filter_model, filter_payment, filter_owner, filter_reg)
+            results = self._scatter("vehicles", filters, sort_by, limit)
+            return _merge_rows(results, VEHICLE_SORT_KEYS, sort_by, limit)
+        except Exception as e:
+            print(f"Помилка при отриманні списку транспортних засобів: {str(e)}")
+            return []
+
+    def get_repair_orders(self, vehicle_id=None, include_archived=False, filter_owner=None, filter_reg=None,
+                          sort_by=None, limit=None):
+        try:
+            results = self._scatter("orders", vehicle_id, include_archived, filter_owner, filter_reg, sort_by, limit)
+            return _merge_rows(results, ORDER_SORT_KEYS, sort_by, limit)
+        except Exception as e:
+            print(f"Помилка при отриманні списку заявок: {str(e)}")
+            return []
+
+    def get_revenue(self, period="month", date_from=None, date_to=None):
+        try:
+            results = self._scatter("call", "get_revenue", period, date_from, date_to)
+            rows = _merge_totals(results.values(), "period", ("orders", "total", "paid", "unpaid"))
+            return sorted(rows, key=lambda row: row["period"])
+        except Exception as e:
+            print(f"Помилка при побудові звіту про виручку: {str(e)}")
+            return []
+
+    def get_receivables_ageing(self, as_of=None):
+        try:
+            results = self._scatter("call", "get_receivables_ageing", as_of)
+            return _merge_totals(results.values(), "bucket", ("orders", "amount"), ("oldest_days",))
+        except Exception as e:
+            print(f"Помилка при побудові звіту про заборгованість: {str(e)}")
+            return []
+
+    def get_totals_by_work_type(self):
+        return self._totals_by("work_type", "get_totals_by_work_type")
+
+    def get_totals_by_brand(self):
+        return self._totals_by("brand", "get_totals_by_brand")
+
+    def _totals_by(self, field, method):
+        try:
+            rows = _merge_totals(self._scatter("call", method).values(), field, ("orders", "total", "paid", "unpaid"))
+            return sorted(rows, key=lambda row: -row["total"])
+        except Exception as e:
+            print(f"Помилка при побудові звіту: {str(e)}")
+            return []
+
+
+def _merge_rows(results, sort_keys, sort_by, limit):
+    # Рядки кожного шарду позначаються філією. Відсортовані шарди зливаються злиттям
+    # (heapq.merge) — кожен уже повернув не більше limit своїх найкращих рядків.
+    for branch, rows in results.items():
+        for row in rows:
+            row["branch"] = branch
+    if not sort_by:
+        rows = itertools.chain.from_iterable(results.values())
+    else:
+        sort_key, reverse = sort_keys[sort_by]
+        rows = heapq.merge(*results.values(), key=sort_key, reverse=reverse)
+    return list(itertools.islice(rows, limit))
+
+
+def _merge_totals(results, key, sums, maxima=()):
+    # Підсумки шардів за однаковим ключем (період, тип робіт тощо) додаються; порядок
+    # ключів — порядок першої появи.
+    merged = {}
+    for rows in results:
+        for row in rows:
+            total = merged.get(row[key])
+            if total is None:
+                merged[row[key]] = dict(row)
+                continue
+            for field in sums:
+                total[field] += row[field]
+            for field in maxima:
+                total[field] = max(total[field], row[field])
+    return list(merged.values())
+
+
+def parse_branch(value):
+    name, separator, data_file = value.partition("=")
+    if not separator or not name or not data_file:
+        raise argparse.ArgumentTypeError("очікується НАЗВА=ФАЙЛ")
+    return name, data_file
+
+
+def print_rows(rows, columns, as_json):
+    if as_json:
+        print(json.dumps(rows, ensure_ascii=False))
+        return
+    for line in TableRenderer([Column("Філія", lambda row: row["branch"], max_width=20)] + columns).render(rows):
+        print(line)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Зведені звіти та реєстрація в мережі філій СТО.",
+        epilog="Термінали філій, з якими працює фасад, мають запускатися зі спільним журналом (STO_SHARED=1).")
+    parser.add_argument("--branch", dest="branches", action="append", type=parse_branch, required=True,
+                        metavar="НАЗВА=ФАЙЛ", help="філія та її файл даних (можна вказати кілька разів)")
+    parser.add_argument("--home", help="власна філія — лише в її файл дозволено записувати")
+    parser.add_argument("--json", action="store_true", help="виводити результат як JSON")
+    commands = parser.add_subparsers(dest="command", required=True, metavar="команда")
+
+    command = commands.add_parser("vehicles", help="транспортні засоби всіх філій")
+    command.add_argument("--owner")
+    command.add_argument("--reg")
+    command.add_argument("--sort", choices=VEHICLE_SORT_KEYS)
+    command.add_argument("--limit", type=positive_int)
+
+    command = commands.add_parser("orders", help="заявки всіх філій (історія власника чи засобу)")
+    command.add_argument("--owner")
+    command.add_argument("--reg")
+    command.add_argument("--archived", action="store_true")
+    command.add_argument("--sort", choices=ORDER_SORT_KEYS)
+    command.add_argument("--limit", type=positive_int)
+
+    command = commands.add_parser("revenue", help="виручка мережі за періодами")
+    command.add_argument("--period", choices=("day", "week", "month"), default="month")
+    command.add_argument("--from", dest="date_from")
+    command.add_argument("--to", dest="date_to")
+
+    commands.add_parser("ageing", help="неоплачені заявки мережі за віком")
+
+    command = commands.add_parser("totals", help="підсумки мережі за типами робіт чи марками")
+    command.add_argument("field", choices=("work_type", "brand"))
+
+    command = commands.add_parser("register", help="зареєструвати засіб у власній філії (--home)")
+    command.add_argument("brand")
+    command.add_argument("model")
+    command.add_argument("year", type=int)
+    command.add_argument("reg_number")
+    command.add_argument("owner")
+    args = parser.parse_args(argv)
+
+    branches = dict(args.branches)
+    if len(branches) != len(args.branches):
+        parser.error("назви філій мають бути різними")
+    if args.command == "register" and not args.home:
+        parser.error("для реєстрації вкажіть --home")
+
+    try:
+        system = ShardedSystem(branches, args.home)
+    except ShardError as e:
+        print(f"Не вдалося відкрити філію {str(e)}", file=sys.stderr)
+        return 1
+    try:
+        if args.command == "register":
+            success, message = system.register_vehicle(args.brand, args.model, args.year, args.reg_number,
+                                                       args.owner)
+            print(message)
+            return 0 if success else 1
+        if args.command == "vehicles":
+            print_rows(system.get_vehicles(filter_owner=args.owner, filter_reg=args.reg, sort_by=args.sort,
+                                           limit=args.limit), VEHICLE_COLUMNS, args.json)
+        elif args.command == "orders":
+            print_rows(system.get_repair_orders(include_archived=args.archived, filter_owner=args.owner,
+                                                filter_reg=args.reg, sort_by=args.sort, limit=args.limit),
+                       ORDER_COLUMNS, args.json)
+        elif args.command == "revenue":
+            rows = system.get_revenue(args.period, args.date_from, args.date_to)
+            if args.json:
+                print(json.dumps(rows, ensure_ascii=False))
+            else:
+                print(tabulate([[r['period'], r['orders'], r['total'], r['paid'], r['unpaid']] for r in rows],
+                               headers=["Період", "Заявок", "Сума, грн", "Оплачено, грн", "Не оплачено, грн"],
+                               floatfmt=".2f"))
+        elif args.command == "ageing":
+            rows = system.get_receivables_ageing()
+            if args.json:
+                print(json.dumps(rows, ensure_ascii=False))
+            else:
+                print(tabulate([[r['bucket'], r['orders'], r['amount'], r['oldest_days']] for r in rows],
+                               headers=["Вік, днів", "Заявок", "Сума, грн", "Найстаріша, днів"], floatfmt=".2f"))
+        else:
+            rows = system.get_totals_by_work_type() if args.field == "work_type" else system.get_totals_by_brand()
+            if args.json:
+                print(json.dumps(rows, ensure_ascii=False))
+            else:
+                title = "Тип робіт" if args.field == "work_type" else "Марка"
+                print(tabulate([[r[args.field], r['orders'], r['total'], r['paid'], r['unpaid']] for r in rows],
+                               headers=[title, "Заявок", "Сума, грн", "Оплачено, грн", "Не оплачено, грн"],
+                               floatfmt=".2f"))
+        return 0
+    finally:
+        system.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
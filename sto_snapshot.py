@@ -0,0 +1,107 @@
+import gc
+import sys
+import json
+import pickle
+import struct
+import argparse
+from contextlib import contextmanager
+from sto_records import RECORD_TYPES, format_id, records_from_dicts
+
+
+MAGIC = b"STOSNAP\x00"
+FORMAT_VERSION = 2
+HEADER = struct.Struct("<8sH")
+
+
+class _SnapshotUnpickler(pickle.Unpickler):
+    # Знімок містить лише списки, кортежі, рядки та числа — будь-які інші об'єкти відхиляємо.
+    def find_class(self, module, name):
+        raise pickle.UnpicklingError(f"Недопустимий об'єкт у знімку: {module}.{name}")
+
+
+def is_binary_snapshot(path):
+    try:
+        with open(path, "rb") as file:
+            return file.read(len(MAGIC)) == MAGIC
+    except OSError:
+        return False
+
+
+def dump_binary(data, file):
+    payload = {table: [record.to_row() for record in records.values()] for table, records in data.items()}
+    file.write(HEADER.pack(MAGIC, FORMAT_VERSION))
+    pickle.dump(payload, file, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def load_binary(file):
+    magic, version = HEADER.unpack(file.read(HEADER.size))
+    if magic != MAGIC:
+        raise ValueError("Файл не є бінарним знімком СТО.")
+    if version > FORMAT_VERSION:
+        raise ValueError(f"Непідтримувана версія бінарного знімка: {version}.")
+
+    with _gc_paused():
+        payload = _SnapshotUnpickler(file).load()
+        if version == 1:
+            # Версія 1 зберігала словники з публічними полями.
+            return records_from_dicts(payload)
+
+        data = {}
+        for table, rows in payload.items():
+            record_type = RECORD_TYPES[table]
+            data[table] = {row[0]: record_type(*row) for row in rows}
+        return data
+
+
+@contextmanager
+def _gc_paused():
+    # Знімок складається з сотень тисяч дрібних об'єктів; збирач сміття під час
+    # розбору лише марно обходить їх, тому вимикаємо його на час завантаження.
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if gc_enabled:
+            gc.enable()
+
+
+def write_snapshot(data, path, snapshot_format="json"):
+    if snapshot_format == "binary":
+        with open(path, "wb") as file:
+            dump_binary(data, file)
+    else:
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump({table: {format_id(key): record.to_dict() for key, record in records.items()}
+                       for table, records in data.items()},
+                      file, ensure_ascii=False, indent=2)
+
+
+def read_snapshot(path):
+    if is_binary_snapshot(path):
+        with open(path, "rb") as file:
+            return load_binary(file), "binary"
+    with open(path, "r", encoding="utf-8") as file, _gc_paused():
+        return records_from_dicts(json.load(file)), "json"
+
+
+def convert(src, dst, snapshot_format):
+    data, _ = read_snapshot(src)
+    write_snapshot(data, dst, snapshot_format)
+    return len(data.get("vehicles", {})), len(data.get("repair_orders", {}))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Конвертація знімка даних СТО між JSON та бінарним форматом.")
+    parser.add_argument("command", choices=["to-binary", "to-json"])
+    parser.add_argument("src")
+    parser.add_argument("dst")
+    args = parser.parse_args(argv)
+
+    vehicles, orders = convert(args.src, args.dst, "binary" if args.command == "to-binary" else "json")
+    print(f"Сконвертовано {args.src} -> {args.dst}: транспортних засобів {vehicles}, заявок {orders}.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
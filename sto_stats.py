@@ -0,0 +1,170 @@
+import os
+import time
+from contextlib import contextmanager
+
+
+# Межі кошиків гістограми затримок, с. Останній кошик — усе, що довше за 10 с.
+LATENCY_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0)
+PROFILE_KINDS = ("cprofile", "tracemalloc")
+
+STATS_ENV = "STO_STATS"
+PROFILE_ENV = "STO_PROFILE"
+PROFILE_OUTPUT_ENV = "STO_PROFILE_OUTPUT"
+
+
+def bucket_label(index):
+    if index == len(LATENCY_BUCKETS):
+        return f">{format_seconds(LATENCY_BUCKETS[-1])}"
+    return f"<={format_seconds(LATENCY_BUCKETS[index])}"
+
+
+def format_seconds(seconds):
+    if seconds < 0.001:
+        return f"{seconds * 1000000:g}мкс"
+    if seconds < 1:
+        return f"{seconds * 1000:g}мс"
+    return f"{seconds:g}с"
+
+
+class MethodStats:
+    __slots__ = ("calls", "failures", "total", "max", "bytes_written", "histogram")
+
+    def __init__(self):
+        self.calls = 0
+        self.failures = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.bytes_written = 0
+        self.histogram = [0] * (len(LATENCY_BUCKETS) + 1)
+
+    def add(self, seconds, failed, bytes_written):
+        self.calls += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+        if failed:
+            self.failures += 1
+        self.bytes_written += bytes_written
+        index = 0
+        while index < len(LATENCY_BUCKETS) and seconds > LATENCY_BUCKETS[index]:
+            index += 1
+        self.histogram[index] += 1
+
+    def to_dict(self):
+        return {
+            "calls": self.calls,
+            "failures": self.failures,
+            "total_seconds": self.total,
+            "mean_seconds": self.total / self.calls if self.calls else 0.0,
+            "max_seconds": self.max,
+            "bytes_written": self.bytes_written,
+            "histogram": {bucket_label(index): count for index, count in enumerate(self.histogram) if count}
+        }
+
+
+class Instrumentation:
+    # Лічильники вмикаються явно: обгортки ставляться на екземпляр системи лише тоді,
+    # тож без інструментування виклики методів не мають жодних додаткових витрат.
+    def __init__(self, storage):
+        self.storage = storage
+        self.started = time.time()
+        self.methods = {}
+        self.last_save_bytes = 0
+        self.last_load_seconds = 0.0
+
+    def wrap(self, name, method):
+        stats = self.methods.setdefault(name, MethodStats())
+        storage = self.storage
+
+        def instrumented(*args, **kwargs):
+            bytes_before = storage.bytes_written
+            start = time.perf_counter()
+            failed = True
+            try:
+                result = method(*args, **kwargs)
+                # Методи системи повертають (успіх, повідомлення); False — це відмова.
+                failed = isinstance(result, tuple) and len(result) == 2 and result[0] is False
+                return result
+            finally:
+                elapsed = time.perf_counter() - start
+                written = storage.bytes_written - bytes_before
+                stats.add(elapsed, failed, written)
+                if name == "save_data":
+                    self.last_save_bytes = written
+                elif name == "load_data":
+                    self.last_load_seconds = elapsed
+
+        instrumented.__name__ = name
+        instrumented.__wrapped__ = method
+        return instrumented
+
+    def snapshot(self):
+        return {
+            "enabled": True,
+            "uptime_seconds": time.time() - self.started,
+            "load_seconds": self.last_load_seconds,
+            "last_save_bytes": self.last_save_bytes,
+            "bytes_written": self.storage.bytes_written,
+            "methods": {name: stats.to_dict() for name, stats in self.methods.items() if stats.calls}
+        }
+
+    def reset(self):
+        for name in self.methods:
+            self.methods[name] = MethodStats()
+
+
+def stats_enabled_from_env():
+    return os.environ.get(STATS_ENV, "").lower() in ("1", "true", "yes", "on")
+
+
+@contextmanager
+def profile_session(kind="cprofile", output=None, top=20):
+    # Профілює все, що виконується всередині блоку. Результат cProfile записується у
+    # файл (для pstats/snakeviz), знімок tracemalloc — найбільші місця виділення пам'яті.
+    if kind not in PROFILE_KINDS:
+        raise ValueError(f"Невідомий тип профілювання: {kind}. Доступні: {', '.join(PROFILE_KINDS)}.")
+
+    # Модулі профілювання потрібні лише тут, тож звичайний запуск їх не імпортує.
+    report = {"kind": kind, "output": output}
+    if kind == "cprofile":
+        import cProfile
+
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            yield report
+        finally:
+            profiler.disable()
+            output = output or "sto_profile.prof"
+            profiler.dump_stats(output)
+            report["output"] = output
+            report["top"] = _top_functions(profiler, top)
+        return
+
+    import tracemalloc
+
+    already_tracing = tracemalloc.is_tracing()
+    if not already_tracing:
+        tracemalloc.start()
+    try:
+        yield report
+    finally:
+        snapshot = tracemalloc.take_snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+        if not already_tracing:
+            tracemalloc.stop()
+        report["current_bytes"] = current
+        report["peak_bytes"] = peak
+        report["top"] = [f"{stat.traceback}: {stat.size / 1024:.1f} КБ у {stat.count} блоках"
+                         for stat in snapshot.statistics("lineno")[:top]]
+        if output:
+            snapshot.dump(output)
+
+
+def _top_functions(profiler, top):
+    import pstats
+
+    stats = pstats.Stats(profiler)
+    rows = sorted(stats.stats.items(), key=lambda item: item[1][3], reverse=True)[:top]
+    return [f"{filename}:{line}({function}): {calls} викл., {cumulative:.3f} с"
+            for (filename, line, function), (_, calls, _, cumulative, _) in rows]
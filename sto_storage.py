@@ -0,0 +1,1050 @@
+import os
+import json
+import sqlite3
+import uuid
+import itertools
+import threading
+from pathlib import Path
+from sto_records import (VEHICLE_FIELDS, ORDER_FIELDS, STATS_FIELDS, RECORD_TYPES, VehicleView, OrderView,
+                         parse_id, format_id)
+from sto_snapshot import read_snapshot, write_snapshot
+from sto_index import PrefixIndex, NgramIndex, uuid_prefix_range
+from sto_lock import FileLock
+
+
+BINARY_SUFFIXES = (".bin", ".stob")
+TEXT_SEARCH_FIELDS = ("brand", "model", "owner", "reg_number")
+
+
+class ConflictError(Exception):
+    pass
+
+
+def payment_matches(filter_payment, unpaid_orders):
+    if not filter_payment:
+        return True
+    if filter_payment.lower() == "оплачено":
+        return unpaid_orders == 0
+    if filter_payment.lower() == "не оплачено":
+        return unpaid_orders > 0
+    return True
+
+
+class Storage:
+    """Інтерфейс сховища даних для STOManagementSystem.
+
+    Записи приймаються як словники з полями VEHICLE_FIELDS / ORDER_FIELDS і віддаються
+    як відображення (Mapping) з тими самими полями, доступні лише для читання.
+    Зміни вносяться лише через set_record() між begin() і commit()/rollback().
+    bytes_written — скільки байтів сховище записало на диск від моменту створення.
+    data_version — лічильник, що змінюється з кожною зміною даних (зокрема відкатом чи
+    змінами інших процесів); за ним можна кешувати все, що обчислюється з даних.
+    """
+
+    bytes_written = 0
+    data_version = 0
+
+    def load(self):
+        raise NotImplementedError
+
+    def save(self):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+    def refresh(self):
+        return False
+
+    def check_consistency(self):
+        return True
+
+    def begin(self):
+        raise NotImplementedError
+
+    def savepoint(self):
+        raise NotImplementedError
+
+    def rollback(self, savepoint=None):
+        raise NotImplementedError
+
+    def commit(self):
+        raise NotImplementedError
+
+    def set_record(self, table, record_id, record):
+        raise NotImplementedError
+
+    def get_vehicle(self, vehicle_id):
+        raise NotImplementedError
+
+    def get_order(self, order_id):
+        raise NotImplementedError
+
+    def vehicle_id_by_reg(self, reg_number):
+        raise NotImplementedError
+
+    def has_orders(self, vehicle_id):
+        # Враховуються й заархівовані заявки (через підсумки order_rollups).
+        raise NotImplementedError
+
+    def get_rollup(self, vehicle_id):
+        raise NotImplementedError
+
+    def find_ids_by_prefix(self, table, prefix, limit=2):
+        raise NotImplementedError
+
+    def iter_vehicles(self, filter_brand=None, filter_model=None, filter_payment=None, filter_owner=None,
+                      filter_reg=None):
+        raise NotImplementedError
+
+    def iter_orders(self, vehicle_id=None):
+        raise NotImplementedError
+
+    def iter_order_facts(self):
+        # Кортежі (секунди створення, вартість, статус, тип робіт, марка) для аналітики.
+        raise NotImplementedError
+
+
+class JSONStorage(Storage):
+    def __init__(self, data_file="sto_data.json", journal=False, compact_threshold=1024 * 1024,
+                 snapshot_format=None, shared=False):
+        self.data_file = data_file
+        self.snapshot_format = snapshot_format
+        # Спільний режим: кілька процесів працюють з одним файлом через спільний журнал.
+        self.shared = shared
+        self.journal = journal or shared
+        self.journal_file = data_file + ".journal"
+        self.compact_threshold = compact_threshold
+        self._journal_size = 0
+        self._lock = FileLock(data_file + ".lock") if shared else None
+        self.version = 0
+        self._journal_offset = 0
+        self._journal_generation = None
+        self._compaction_thread = None
+        self._reg_index = {}
+        self._vehicle_orders = {}
+        self._vehicle_stats = {}
+        self._prefix_indexes = {}
+        self._text_indexes = None
+        self._text_order = None
+        self._text_sequence = None
+        self._tx = None
+        self.data = {table: {} for table in RECORD_TYPES}
+
+    def load(self):
+        if self.shared:
+            with self._lock.locked(shared=True):
+                self._load()
+        else:
+            self._load()
+
+    def _load(self):
+        self.wait_for_compaction()
+        if Path(self.data_file).exists():
+            try:
+                self.data, detected_format = read_snapshot(self.data_file)
+                if self.snapshot_format is None:
+                    self.snapshot_format = detected_format
+            except Exception as e:
+                print(f"Помилка завантаження даних: {str(e)}")
+                self.data = {table: {} for table in RECORD_TYPES}
+        if self.snapshot_format is None:
+            self.snapshot_format = "binary" if str(self.data_file).endswith(BINARY_SUFFIXES) else "json"
+
+        for table in RECORD_TYPES:
+            self.data.setdefault(table, {})
+
+        self.version = 0
+        if self.shared:
+            self._replay_journal(self.journal_file + ".compacting")
+            self._journal_offset = 0
+            self._journal_generation = None
+            for entry in self._read_journal_tail(loading=True):
+                self._apply_entry(entry)
+        else:
+            # Журнал відтворюється незалежно від режиму: його міг лишити попередній запуск
+            # з журналом, і без нього знімок застарілий. Наступний save() вбудує його у знімок.
+            self._replay_journal(self.journal_file + ".compacting", self.journal_file)
+
+        self._rebuild_indexes()
+
+    def _rebuild_indexes(self):
+        self.data_version += 1
+        self._reg_index = {}
+        self._vehicle_orders = {}
+        self._vehicle_stats = {vehicle_id: [0, 0, 0] for vehicle_id in self.data["vehicles"]}
+        for vehicle_id, vehicle in self.data["vehicles"].items():
+            self._reg_index[vehicle.reg_number] = vehicle_id
+        for order_id, order in self.data["repair_orders"].items():
+            self._vehicle_orders.setdefault(order.vehicle_uid, []).append(order_id)
+            self._count_order(order, 1)
+        for rollup in self.data["order_rollups"].values():
+            self._count_rollup(rollup, 1)
+        self._prefix_indexes = {table: PrefixIndex(records) for table, records in self.data.items()}
+        # Індекс підрядків будується під час першого пошуку, щоб не сповільнювати завантаження.
+        self._text_indexes = None
+
+    def _build_text_indexes(self):
+        # Індекси стають видимими лише повністю побудованими: недобудований індекс
+        # мовчки давав би неповні результати пошуку.
+        indexes = {field: NgramIndex() for field in TEXT_SEARCH_FIELDS}
+        order = {}
+        sequence = itertools.count()
+        for vehicle_id, vehicle in self.data["vehicles"].items():
+            for field, index in indexes.items():
+                index.add(vehicle_id, getattr(vehicle, field))
+            order[vehicle_id] = next(sequence)
+        self._text_indexes, self._text_order, self._text_sequence = indexes, order, sequence
+
+    def _update_text_indexes(self, vehicle_id, old_vehicle, vehicle):
+        for field, index in self._text_indexes.items():
+            old_value = getattr(old_vehicle, field) if old_vehicle is not None else None
+            value = getattr(vehicle, field) if vehicle is not None else None
+            if old_value != value:
+                if old_value is not None:
+                    index.discard(vehicle_id, old_value)
+                if value is not None:
+                    index.add(vehicle_id, value)
+        # Порядок реєстрації, щоб результати пошуку йшли в тому ж порядку, що й повний список.
+        if vehicle is None:
+            self._text_order.pop(vehicle_id, None)
+        elif old_vehicle is None:
+            self._text_order[vehicle_id] = next(self._text_sequence)
+
+    def _count_order(self, order, sign):
+        # Агрегати зберігаються списком [orders_count, unpaid_orders, total_cost].
+        stats = self._vehicle_stats.get(order.vehicle_uid)
+        if stats is None:
+            stats = self._vehicle_stats[order.vehicle_uid] = [0, 0, 0]
+        stats[0] += sign
+        stats[2] += sign * order.estimated_cost
+        if order.status == "Не оплачено":
+            stats[1] += sign
+
+    def _count_rollup(self, rollup, sign):
+        stats = self._vehicle_stats.get(rollup.uid)
+        if stats is None:
+            stats = self._vehicle_stats[rollup.uid] = [0, 0, 0]
+        stats[0] += sign * rollup.orders_count
+        stats[2] += sign * rollup.total_cost
+
+    def check_consistency(self):
+        reg_index, vehicle_orders, vehicle_stats = self._reg_index, self._vehicle_orders, self._vehicle_stats
+        self._rebuild_indexes()
+        if reg_index != self._reg_index:
+            return False
+        if {key: set(value) for key, value in vehicle_orders.items()} != \
+                {key: set(value) for key, value in self._vehicle_orders.items()}:
+            return False
+        for vehicle_id, stats in self._vehicle_stats.items():
+            old_stats = vehicle_stats.get(vehicle_id, [0, 0, 0])
+            if old_stats[:2] != stats[:2] or abs(old_stats[2] - stats[2]) > 1e-6:
+                return False
+        return True
+
+    def save(self):
+        try:
+            if self.shared:
+                # Перед записом знімка дочитуємо зміни інших процесів, щоб не затерти їх.
+                with self._lock.locked():
+                    self._catch_up()
+                    self._compact_shared()
+                return True
+
+            self.wait_for_compaction()
+            self._write_snapshot(self.data)
+            # Знімок уже містить усе з журналу; залишений журнал наступне відкриття
+            # відтворило б поверх новішого знімка.
+            for path in (self.journal_file + ".compacting", self.journal_file):
+                if os.path.exists(path):
+                    os.remove(path)
+            self._journal_size = 0
+            return True
+        except Exception as e:
+            print(f"Помилка збереження даних: {str(e)}")
+            return False
+
+    def _write_snapshot(self, data):
+        tmp_file = self.data_file + ".tmp"
+        write_snapshot(data, tmp_file, self.snapshot_format)
+        self.bytes_written += os.path.getsize(tmp_file)
+        os.replace(tmp_file, self.data_file)
+
+    def _replay_journal(self, *paths):
+        self._journal_size = 0
+        for path in paths:
+            if not os.path.exists(path):
+                continue
+            good_size = 0
+            with open(path, "rb") as file:
+                for line in file:
+                    try:
+                        if not line.endswith(b"\n"):
+                            raise ValueError("неповний рядок")
+                        entry = json.loads(line)
+                    except ValueError:
+                        # Обірваний останній запис після аварійного завершення.
+                        break
+                    self._apply_entry(entry)
+                    good_size += len(line)
+            if good_size != os.path.getsize(path):
+                # Обрізаємо обірваний хвіст, інакше нові записи опиняться після нього і
+                # наступне відтворення зупиниться на ньому, втративши їх.
+                with open(path, "r+b") as file:
+                    file.truncate(good_size)
+            if path == self.journal_file:
+                self._journal_size = good_size
+
+    def _apply_entry(self, entry):
+        if "v" in entry:
+            self.version = entry["v"]
+        if entry["op"] == "base":
+            return
+        table = self.data[entry["table"]]
+        if entry["op"] == "put":
+            record = RECORD_TYPES[entry["table"]].from_dict(entry["record"])
+            table[record.uid] = record
+        elif entry["op"] == "del":
+            table.pop(parse_id(entry["id"]), None)
+
+    def refresh(self):
+        # Підхоплює зміни інших процесів: дочитується лише хвіст спільного журналу після
+        # нашої останньої позиції. Повністю дані перечитуються тільки після ущільнення.
+        if not self.shared or self._tx is not None:
+            return False
+        try:
+            if os.path.getsize(self.journal_file) == self._journal_offset:
+                return False
+        except OSError:
+            if self._journal_generation is None:
+                return False
+        with self._lock.locked(shared=True):
+            return self._catch_up()
+
+    def _catch_up(self):
+        entries = self._read_journal_tail()
+        if entries is None:
+            self._load()
+            return True
+        for entry in entries:
+            self._apply_live_entry(entry)
+        return bool(entries)
+
+    def _read_journal_tail(self, loading=False):
+        # Повертає нові записи журналу або None, якщо журнал замінено (ущільнено)
+        # і позиція в ньому більше нічого не означає.
+        try:
+            file = open(self.journal_file, "rb")
+        except FileNotFoundError:
+            return None if self._journal_generation is not None else []
+        with file:
+            header = json.loads(file.readline() or "{}")
+            generation = header.get("generation")
+            if self._journal_generation is not None and generation != self._journal_generation:
+                return None
+            if self._journal_offset == 0:
+                # Журнал, якого ще не було при завантаженні, міг устигнути пройти ущільнення:
+                # тоді його записи вже лише в новому знімку. Продовжувати з нього можна, тільки
+                # якщо він починається з завантаженої версії, інакше знімок перечитується.
+                if self._journal_generation is None and not loading and header.get("v", 0) != self.version:
+                    return None
+                self._journal_generation = generation
+                self._journal_offset = file.tell()
+                entries = [header] if header else []
+            else:
+                entries = []
+            file.seek(self._journal_offset)
+            payload = file.read()
+
+        # Неповний останній рядок — запис, який інший процес ще не дописав (або обірвав).
+        end = payload.rfind(b"\n") + 1
+        entries.extend(json.loads(line) for line in payload[:end].splitlines() if line)
+        self._journal_offset += end
+        self._journal_size = self._journal_offset
+        return entries
+
+    def _apply_live_entry(self, entry):
+        if "v" in entry:
+            self.version = entry["v"]
+        if entry["op"] == "put":
+            record = RECORD_TYPES[entry["table"]].from_dict(entry["record"])
+            self._apply(entry["table"], record.uid, record)
+        elif entry["op"] == "del":
+            self._apply(entry["table"], parse_id(entry["id"]), None)
+
+    def _commit_shared(self, changes):
+        # Оптимістична конкурентність: транзакція виконувалась над нашою копією даних.
+        # Під ексклюзивним замком відкочуємо її, застосовуємо чужі записи журналу і
+        # накладаємо наші зміни зверху, зливаючи їх з чужими по полях. Якщо ті самі
+        # поля змінено по-різному або порушено цілісність — зміни відхиляються.
+        base = {}
+        for table, record_id, old_record in changes:
+            base.setdefault((table, record_id), old_record)
+        ours = {key: self.data[key[0]].get(key[1]) for key in base}
+
+        with self._lock.locked():
+            self._tx = changes
+            self.rollback()
+            self._catch_up()
+
+            self._tx = []
+            try:
+                merged = {key: self._merge(key, base[key], ours[key]) for key in base}
+                self._check_conflicts(merged)
+                for (table, record_id), record in merged.items():
+                    self._tx.append((table, record_id, self._apply(table, record_id, record)))
+                self._append_shared(list(merged))
+            except Exception:
+                self.rollback()
+                raise
+            self._tx = None
+
+            if self._journal_size >= self.compact_threshold:
+                self._compact_shared()
+
+    def _merge(self, key, base, ours):
+        table, record_id = key
+        current = self.data[table].get(record_id)
+        if table == "order_rollups" and not _same_record(current, base):
+            # Підсумки — лічильники: збіг значень не означає ту саму зміну, а поле за полем
+            # приріст іншого терміналу загубився б. Архівування просто повторюється.
+            raise ConflictError("Підсумки архіву змінено на іншому терміналі. Повторіть архівування.")
+        if _same_record(current, base) or _same_record(current, ours):
+            return ours
+        if base is None or current is None or ours is None:
+            raise ConflictError("Дані змінено або видалено на іншому терміналі. Оновіть дані та повторіть дію.")
+
+        merged = []
+        for base_value, current_value, our_value in zip(base.to_row(), current.to_row(), ours.to_row()):
+            if our_value == base_value:
+                merged.append(current_value)
+            elif current_value == base_value or current_value == our_value:
+                merged.append(our_value)
+            else:
+                raise ConflictError("Ті самі дані змінено на іншому терміналі. Оновіть дані та повторіть дію.")
+        return RECORD_TYPES[table](*merged)
+
+    def _check_conflicts(self, merged):
+        vehicles = self.data["vehicles"]
+        for (table, record_id), record in merged.items():
+            if table == "vehicles" and record is not None:
+                owner = self._reg_index.get(record.reg_number)
+                if owner not in (None, record_id) and ("vehicles", owner) not in merged:
+                    raise ConflictError("Транспортний засіб з таким реєстраційним номером щойно зареєстровано "
+                                        "на іншому терміналі.")
+            elif table == "vehicles" and (self._vehicle_orders.get(record_id) or
+                                          record_id in self.data["order_rollups"]):
+                raise ConflictError("Неможливо видалити: на іншому терміналі додано заявки для цього "
+                                    "транспортного засобу.")
+            elif table == "repair_orders" and record is not None:
+                vehicle_key = ("vehicles", record.vehicle_uid)
+                vehicle = merged[vehicle_key] if vehicle_key in merged else vehicles.get(record.vehicle_uid)
+                if vehicle is None:
+                    raise ConflictError("Транспортний засіб видалено на іншому терміналі.")
+
+    def _append_shared(self, keys):
+        lines = []
+        if self._journal_offset == 0:
+            self._journal_generation = uuid.uuid4().hex
+            lines.append(self._journal_header())
+        for table, record_id in keys:
+            self.version += 1
+            entry = {"op": "del", "table": table, "id": format_id(record_id), "v": self.version}
+            if record_id in self.data[table]:
+                entry["op"] = "put"
+                entry["record"] = self.data[table][record_id].to_dict()
+            lines.append(json.dumps(entry, ensure_ascii=False, separators=(",", ":")) + "\n")
+
+        payload = "".join(lines).encode("utf-8")
+        with open(self.journal_file, "ab") as file:
+            # Хвіст після нашої позиції може лишитися лише від процесу, що впав посеред запису.
+            file.truncate(self._journal_offset)
+            try:
+                file.write(payload)
+                file.flush()
+            except Exception:
+                file.truncate(self._journal_offset)
+                raise
+        self._journal_offset += len(payload)
+        self._journal_size = self._journal_offset
+        self.bytes_written += len(payload)
+
+    def _journal_header(self):
+        header = {"op": "base", "v": self.version, "generation": self._journal_generation}
+        return json.dumps(header, separators=(",", ":")) + "\n"
+
+    def _compact_shared(self):
+        # Викликається під ексклюзивним замком. Новий журнал з іншим поколінням
+        # підміняється атомарно, тож інші процеси побачать заміну і перечитають знімок.
+        self._write_snapshot(self.data)
+        self._journal_generation = uuid.uuid4().hex
+        header = self._journal_header().encode("utf-8")
+        tmp_file = self.journal_file + ".tmp"
+        with open(tmp_file, "wb") as file:
+            file.write(header)
+        os.replace(tmp_file, self.journal_file)
+        compacting_file = self.journal_file + ".compacting"
+        if os.path.exists(compacting_file):
+            os.remove(compacting_file)
+        self.bytes_written += len(header)
+        self._journal_offset = self._journal_size = len(header)
+
+    def _persist(self, keys):
+        if not self.journal:
+            return self.save()
+
+        journal_size = self._journal_size
+        try:
+            lines = []
+            for table, record_id in keys:
+                entry = {"op": "del", "table": table, "id": format_id(record_id)}
+                if record_id in self.data[table]:
+                    entry["op"] = "put"
+                    entry["record"] = self.data[table][record_id].to_dict()
+                lines.append(json.dumps(entry, ensure_ascii=False, separators=(",", ":")) + "\n")
+
+            payload = "".join(lines).encode("utf-8")
+            with open(self.journal_file, "ab") as file:
+                # Усе після відомого розміру — залишок обірваного запису.
+                file.truncate(journal_size)
+                try:
+                    file.write(payload)
+                except Exception:
+                    file.truncate(journal_size)
+                    raise
+            self._journal_size += len(payload)
+            self.bytes_written += len(payload)
+        except Exception as e:
+            print(f"Помилка збереження даних: {str(e)}")
+            return False
+
+        # Записи вже в журналі, тож збій ущільнення не повинен скасовувати транзакцію.
+        if self._journal_size >= self.compact_threshold:
+            try:
+                self.compact()
+            except Exception as e:
+                print(f"Помилка ущільнення журналу: {str(e)}")
+        return True
+
+    def begin(self):
+        # У спільному режиму тут навмисно немає refresh(): базою транзакції лишається стан,
+        # який бачив код перед нею, і чужі зміни після цього зливаються під час commit().
+        self._tx = []
+
+    def savepoint(self):
+        return len(self._tx)
+
+    def rollback(self, savepoint=None):
+        while len(self._tx) > (savepoint or 0):
+            table, record_id, old_record = self._tx.pop()
+            self._apply(table, record_id, old_record)
+        if savepoint is None:
+            self._tx = None
+
+    def commit(self):
+        changes, self._tx = self._tx, None
+        if changes and self.shared:
+            self._commit_shared(changes)
+        elif changes:
+            keys = list(dict.fromkeys((table, record_id) for table, record_id, _ in changes))
+            if not self._persist(keys):
+                self._tx = changes
+                self.rollback()
+                raise IOError("Не вдалося зберегти зміни.")
+
+    def set_record(self, table, record_id, record):
+        if record is not None:
+            record = RECORD_TYPES[table].from_dict(record)
+        record_id = parse_id(record_id)
+        old_record = self._apply(table, record_id, record)
+        if self._tx is not None:
+            self._tx.append((table, record_id, old_record))
+
+    def _apply(self, table, record_id, record):
+        # Усе, що може не вдатися, перевіряється до першої зміни стану: запис у _tx
+        # з'являється лише після повернення, тож частково застосовану зміну відкат не прибрав би.
+        if table == "vehicles" and record is not None:
+            for field in TEXT_SEARCH_FIELDS:
+                if not isinstance(getattr(record, field), str):
+                    raise TypeError(f"Поле {field} транспортного засобу має бути рядком.")
+        self.data_version += 1
+        old_record = self.data[table].get(record_id)
+        if old_record is None and record is not None:
+            self._prefix_indexes[table].add(record_id)
+        elif old_record is not None and record is None:
+            self._prefix_indexes[table].discard(record_id)
+        if table == "vehicles":
+            if self._text_indexes is not None:
+                self._update_text_indexes(record_id, old_record, record)
+            if old_record is not None and self._reg_index.get(old_record.reg_number) == record_id:
+                del self._reg_index[old_record.reg_number]
+            if record is None:
+                self.data["vehicles"].pop(record_id, None)
+                self._vehicle_orders.pop(record_id, None)
+                self._vehicle_stats.pop(record_id, None)
+            else:
+                self.data["vehicles"][record_id] = record
+                self._reg_index[record.reg_number] = record_id
+                self._vehicle_stats.setdefault(record_id, [0, 0, 0])
+        elif table == "order_rollups":
+            if old_record is not None:
+                self._count_rollup(old_record, -1)
+            if record is None:
+                self.data["order_rollups"].pop(record_id, None)
+            else:
+                self.data["order_rollups"][record_id] = record
+                self._count_rollup(record, 1)
+        else:
+            vehicle_id = record.vehicle_uid if record is not None else None
+            if old_record is not None:
+                self._count_order(old_record, -1)
+                if old_record.vehicle_uid != vehicle_id:
+                    order_ids = self._vehicle_orders.get(old_record.vehicle_uid)
+                    if order_ids is not None:
+                        order_ids.remove(record_id)
+                        if not order_ids:
+                            del self._vehicle_orders[old_record.vehicle_uid]
+            if record is None:
+                self.data["repair_orders"].pop(record_id, None)
+            else:
+                self.data["repair_orders"][record_id] = record
+                if old_record is None or old_record.vehicle_uid != vehicle_id:
+                    self._vehicle_orders.setdefault(vehicle_id, []).append(record_id)
+                self._count_order(record, 1)
+        return old_record
+
+    def get_vehicle(self, vehicle_id):
+        self.refresh()
+        return self.data["vehicles"].get(parse_id(vehicle_id))
+
+    def get_order(self, order_id):
+        self.refresh()
+        return self.data["repair_orders"].get(parse_id(order_id))
+
+    def vehicle_id_by_reg(self, reg_number):
+        self.refresh()
+        vehicle_id = self._reg_index.get(reg_number)
+        return format_id(vehicle_id) if vehicle_id is not None else None
+
+    def has_orders(self, vehicle_id):
+        self.refresh()
+        vehicle_id = parse_id(vehicle_id)
+        return bool(self._vehicle_orders.get(vehicle_id)) or vehicle_id in self.data["order_rollups"]
+
+    def get_rollup(self, vehicle_id):
+        self.refresh()
+        return self.data["order_rollups"].get(parse_id(vehicle_id))
+
+    def find_ids_by_prefix(self, table, prefix, limit=2):
+        self.refresh()
+        return self._prefix_indexes[table].find(prefix, limit)
+
+    def iter_vehicles(self, filter_brand=None, filter_model=None, filter_payment=None, filter_owner=None,
+                      filter_reg=None):
+        self.refresh()
+        vehicles = self.data["vehicles"]
+        text_filters = [(field, query) for field, query in
+                        zip(TEXT_SEARCH_FIELDS, (filter_brand, filter_model, filter_owner, filter_reg)) if query]
+        if text_filters:
+            # Перевіряються лише записи-кандидати з індексу підрядків.
+            if self._text_indexes is None:
+                self._build_text_indexes()
+            candidates = None
+            for field, query in text_filters:
+                keys = self._text_indexes[field].search(query)
+                candidates = keys if candidates is None else candidates & keys
+                if not candidates:
+                    return
+            vehicle_ids = sorted(candidates, key=self._text_order.__getitem__)
+        else:
+            vehicle_ids = vehicles
+
+        for vehicle_id in vehicle_ids:
+            orders_count, unpaid_orders, total_cost = self._vehicle_stats[vehicle_id]
+            if not payment_matches(filter_payment, unpaid_orders):
+                continue
+            yield VehicleView(vehicles[vehicle_id], orders_count, unpaid_orders, total_cost)
+
+    def iter_orders(self, vehicle_id=None):
+        self.refresh()
+        vehicles = self.data["vehicles"]
+        orders = self.data["repair_orders"]
+        if vehicle_id:
+            order_ids = self._vehicle_orders.get(parse_id(vehicle_id), ())
+        else:
+            order_ids = orders
+
+        for order_id in order_ids:
+            order = orders[order_id]
+            vehicle = vehicles.get(order.vehicle_uid)
+            if vehicle is not None:
+                yield OrderView(order, vehicle)
+
+    def iter_order_facts(self):
+        self.refresh()
+        vehicles = self.data["vehicles"]
+        for order in self.data["repair_orders"].values():
+            vehicle = vehicles.get(order.vehicle_uid)
+            if vehicle is not None:
+                yield order.created_at, order.estimated_cost, order.status, order.work_type, vehicle.brand
+
+    def compact(self, wait=False):
+        if self._compaction_thread is not None and self._compaction_thread.is_alive():
+            if wait:
+                self._compaction_thread.join()
+            return
+
+        compacting_file = self.journal_file + ".compacting"
+        if os.path.exists(self.journal_file):
+            if os.path.exists(compacting_file):
+                # Попереднє ущільнення не завершилось: його записи ще не потрапили у знімок.
+                with open(self.journal_file, "rb") as src, open(compacting_file, "ab") as dst:
+                    dst.write(src.read())
+                os.remove(self.journal_file)
+            else:
+                os.replace(self.journal_file, compacting_file)
+        self._journal_size = 0
+
+        # Записи незмінні (зміна замінює об'єкт цілком), тож для знімка досить копії словників.
+        snapshot = {table: dict(records) for table, records in self.data.items()}
+
+        self._compaction_thread = threading.Thread(target=self._run_compaction,
+                                                   args=(snapshot, compacting_file))
+        self._compaction_thread.start()
+        if wait:
+            self._compaction_thread.join()
+
+    def _run_compaction(self, snapshot, compacting_file):
+        try:
+            self._write_snapshot(snapshot)
+            if os.path.exists(compacting_file):
+                os.remove(compacting_file)
+        except Exception as e:
+            print(f"Помилка ущільнення журналу: {str(e)}")
+
+    def wait_for_compaction(self):
+        if self._compaction_thread is not None:
+            self._compaction_thread.join()
+            self._compaction_thread = None
+
+    def close(self):
+        self.wait_for_compaction()
+        if self._lock is not None:
+            self._lock.close()
+
+
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS vehicles (
+    id TEXT PRIMARY KEY,
+    brand TEXT NOT NULL,
+    model TEXT NOT NULL,
+    year INTEGER,
+    reg_number TEXT NOT NULL,
+    owner TEXT NOT NULL,
+    registration_date TEXT,
+    brand_key TEXT NOT NULL,
+    model_key TEXT NOT NULL,
+    orders_count INTEGER NOT NULL DEFAULT 0,
+    unpaid_orders INTEGER NOT NULL DEFAULT 0,
+    total_cost REAL NOT NULL DEFAULT 0
+);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_vehicles_reg_number ON vehicles (reg_number);
+
+-- Індекс триграм для пошуку за підрядком; регістр ігнорується (з урахуванням Unicode).
+CREATE VIRTUAL TABLE IF NOT EXISTS vehicles_fts USING fts5(
+    brand, model, owner, reg_number, content='vehicles', content_rowid='rowid', tokenize='trigram'
+);
+CREATE TRIGGER IF NOT EXISTS trg_vehicles_fts_insert AFTER INSERT ON vehicles BEGIN
+    INSERT INTO vehicles_fts (rowid, brand, model, owner, reg_number)
+    VALUES (NEW.rowid, NEW.brand, NEW.model, NEW.owner, NEW.reg_number);
+END;
+CREATE TRIGGER IF NOT EXISTS trg_vehicles_fts_delete AFTER DELETE ON vehicles BEGIN
+    INSERT INTO vehicles_fts (vehicles_fts, rowid, brand, model, owner, reg_number)
+    VALUES ('delete', OLD.rowid, OLD.brand, OLD.model, OLD.owner, OLD.reg_number);
+END;
+CREATE TRIGGER IF NOT EXISTS trg_vehicles_fts_update AFTER UPDATE OF brand, model, owner, reg_number ON vehicles BEGIN
+    INSERT INTO vehicles_fts (vehicles_fts, rowid, brand, model, owner, reg_number)
+    VALUES ('delete', OLD.rowid, OLD.brand, OLD.model, OLD.owner, OLD.reg_number);
+    INSERT INTO vehicles_fts (rowid, brand, model, owner, reg_number)
+    VALUES (NEW.rowid, NEW.brand, NEW.model, NEW.owner, NEW.reg_number);
+END;
+
+CREATE TABLE IF NOT EXISTS repair_orders (
+    id TEXT PRIMARY KEY,
+    vehicle_id TEXT NOT NULL,
+    date_created TEXT,
+    work_type TEXT,
+    parts TEXT,
+    resources TEXT,
+    estimated_cost REAL NOT NULL,
+    status TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_orders_vehicle_id ON repair_orders (vehicle_id);
+CREATE INDEX IF NOT EXISTS idx_orders_status ON repair_orders (status, vehicle_id);
+CREATE INDEX IF NOT EXISTS idx_orders_date_created ON repair_orders (date_created);
+
+CREATE TRIGGER IF NOT EXISTS trg_orders_insert AFTER INSERT ON repair_orders BEGIN
+    UPDATE vehicles SET orders_count = orders_count + 1,
+                        unpaid_orders = unpaid_orders + (NEW.status = 'Не оплачено'),
+                        total_cost = total_cost + NEW.estimated_cost
+    WHERE id = NEW.vehicle_id;
+END;
+CREATE TRIGGER IF NOT EXISTS trg_orders_delete AFTER DELETE ON repair_orders BEGIN
+    UPDATE vehicles SET orders_count = orders_count - 1,
+                        unpaid_orders = unpaid_orders - (OLD.status = 'Не оплачено'),
+                        total_cost = total_cost - OLD.estimated_cost
+    WHERE id = OLD.vehicle_id;
+END;
+CREATE TABLE IF NOT EXISTS order_rollups (
+    vehicle_id TEXT PRIMARY KEY,
+    orders_count INTEGER NOT NULL,
+    total_cost REAL NOT NULL
+);
+CREATE TRIGGER IF NOT EXISTS trg_rollups_insert AFTER INSERT ON order_rollups BEGIN
+    UPDATE vehicles SET orders_count = orders_count + NEW.orders_count, total_cost = total_cost + NEW.total_cost
+    WHERE id = NEW.vehicle_id;
+END;
+CREATE TRIGGER IF NOT EXISTS trg_rollups_delete AFTER DELETE ON order_rollups BEGIN
+    UPDATE vehicles SET orders_count = orders_count - OLD.orders_count, total_cost = total_cost - OLD.total_cost
+    WHERE id = OLD.vehicle_id;
+END;
+CREATE TRIGGER IF NOT EXISTS trg_rollups_update AFTER UPDATE ON order_rollups BEGIN
+    UPDATE vehicles SET orders_count = orders_count - OLD.orders_count + NEW.orders_count,
+                        total_cost = total_cost - OLD.total_cost + NEW.total_cost
+    WHERE id = NEW.vehicle_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_orders_update AFTER UPDATE ON repair_orders BEGIN
+    UPDATE vehicles SET orders_count = orders_count - 1,
+                        unpaid_orders = unpaid_orders - (OLD.status = 'Не оплачено'),
+                        total_cost = total_cost - OLD.estimated_cost
+    WHERE id = OLD.vehicle_id;
+    UPDATE vehicles SET orders_count = orders_count + 1,
+                        unpaid_orders = unpaid_orders + (NEW.status = 'Не оплачено'),
+                        total_cost = total_cost + NEW.estimated_cost
+    WHERE id = NEW.vehicle_id;
+END;
+"""
+
+
+SQLITE_SCHEMA_VERSION = 1
+SHORT_QUERY_COLUMNS = {"brand": "brand_key", "model": "model_key", "owner": "casefold(owner)",
+                       "reg_number": "casefold(reg_number)"}
+
+
+def _casefold(value):
+    return value.casefold() if isinstance(value, str) else value
+
+
+def _fts_phrase(field, query):
+    # Фраза з триграм запиту в межах одного стовпця — це і є пошук за підрядком.
+    escaped = query.replace('"', '""')
+    return f'{field} : "{escaped}"'
+
+
+class SQLiteStorage(Storage):
+    def __init__(self, data_file="sto_data.db"):
+        self.data_file = data_file
+        self.connection = None
+        self._savepoints = 0
+        self._changes = 0
+        self._external_version = None
+
+    @property
+    def data_version(self):
+        # PRAGMA data_version змінюється, коли базу змінило інше з'єднання; власні зміни
+        # рахуються в _changes.
+        external = self.connection.execute("PRAGMA data_version").fetchone()[0]
+        if external != self._external_version:
+            self._external_version = external
+            self._changes += 1
+        return self._changes
+
+    def load(self):
+        self._changes += 1
+        if self.connection is None:
+            self.connection = sqlite3.connect(self.data_file, isolation_level=None, check_same_thread=False)
+            self.connection.row_factory = sqlite3.Row
+            self.connection.create_function("casefold", 1, _casefold, deterministic=True)
+            self.connection.executescript(SQLITE_SCHEMA)
+            if self.connection.execute("PRAGMA user_version").fetchone()[0] < SQLITE_SCHEMA_VERSION:
+                # База створена до появи індексу підрядків — заповнюємо його з наявних даних.
+                self.connection.execute("INSERT INTO vehicles_fts (vehicles_fts) VALUES ('rebuild')")
+                self.connection.execute(f"PRAGMA user_version = {SQLITE_SCHEMA_VERSION}")
+
+    def save(self):
+        return True
+
+    def close(self):
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+
+    def check_consistency(self):
+        row = self.connection.execute("""
+            SELECT COUNT(*) FROM vehicles v
+            LEFT JOIN (SELECT vehicle_id, COUNT(*) AS cnt, SUM(status = 'Не оплачено') AS unpaid,
+                              SUM(estimated_cost) AS total
+                       FROM repair_orders GROUP BY vehicle_id) o ON o.vehicle_id = v.id
+            LEFT JOIN order_rollups r ON r.vehicle_id = v.id
+            WHERE v.orders_count != COALESCE(o.cnt, 0) + COALESCE(r.orders_count, 0)
+               OR v.unpaid_orders != COALESCE(o.unpaid, 0)
+               OR ABS(v.total_cost - COALESCE(o.total, 0) - COALESCE(r.total_cost, 0)) > 1e-6
+        """).fetchone()
+        return row[0] == 0
+
+    def begin(self):
+        # IMMEDIATE бере замок на запис одразу: інакше два процеси, що почали читати
+        # в транзакції, не зможуть обидва перейти до запису і один отримає "database is locked".
+        self.connection.execute("BEGIN IMMEDIATE")
+
+    def savepoint(self):
+        self._savepoints += 1
+        name = f"sp_{self._savepoints}"
+        self.connection.execute(f"SAVEPOINT {name}")
+        return name
+
+    def rollback(self, savepoint=None):
+        self._changes += 1
+        if savepoint is None:
+            self.connection.execute("ROLLBACK")
+        else:
+            self.connection.execute(f"ROLLBACK TO {savepoint}")
+
+    def commit(self):
+        try:
+            self.connection.execute("COMMIT")
+        except sqlite3.Error:
+            self.connection.execute("ROLLBACK")
+            raise IOError("Не вдалося зберегти зміни.")
+
+    def set_record(self, table, record_id, record):
+        self._changes += 1
+        if record is None:
+            key = "vehicle_id" if table == "order_rollups" else "id"
+            self.connection.execute(f"DELETE FROM {table} WHERE {key} = ?", (record_id,))
+        elif table == "order_rollups":
+            self.connection.execute("""
+                INSERT INTO order_rollups (vehicle_id, orders_count, total_cost) VALUES (?, ?, ?)
+                ON CONFLICT (vehicle_id) DO UPDATE SET
+                    orders_count = excluded.orders_count, total_cost = excluded.total_cost
+            """, (record_id, record["orders_count"], record["total_cost"]))
+        elif table == "vehicles":
+            self.connection.execute("""
+                INSERT INTO vehicles (id, brand, model, year, reg_number, owner, registration_date,
+                                      brand_key, model_key)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (id) DO UPDATE SET
+                    brand = excluded.brand, model = excluded.model, year = excluded.year,
+                    reg_number = excluded.reg_number, owner = excluded.owner,
+                    registration_date = excluded.registration_date,
+                    brand_key = excluded.brand_key, model_key = excluded.model_key
+            """, tuple(record[field] for field in VEHICLE_FIELDS) + (record["brand"].casefold(),
+                                                                     record["model"].casefold()))
+        else:
+            self.connection.execute("""
+                INSERT INTO repair_orders (id, vehicle_id, date_created, work_type, parts, resources,
+                                           estimated_cost, status)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (id) DO UPDATE SET
+                    vehicle_id = excluded.vehicle_id, date_created = excluded.date_created,
+                    work_type = excluded.work_type, parts = excluded.parts, resources = excluded.resources,
+                    estimated_cost = excluded.estimated_cost, status = excluded.status
+            """, tuple(record[field] for field in ORDER_FIELDS))
+
+    def get_vehicle(self, vehicle_id):
+        row = self.connection.execute(
+            f"SELECT {', '.join(VEHICLE_FIELDS)} FROM vehicles WHERE id = ?", (vehicle_id,)).fetchone()
+        return dict(row) if row is not None else None
+
+    def get_order(self, order_id):
+        row = self.connection.execute(
+            f"SELECT {', '.join(ORDER_FIELDS)} FROM repair_orders WHERE id = ?", (order_id,)).fetchone()
+        return dict(row) if row is not None else None
+
+    def vehicle_id_by_reg(self, reg_number):
+        row = self.connection.execute("SELECT id FROM vehicles WHERE reg_number = ?", (reg_number,)).fetchone()
+        return row[0] if row is not None else None
+
+    def has_orders(self, vehicle_id):
+        row = self.connection.execute("SELECT 1 FROM repair_orders WHERE vehicle_id = ? LIMIT 1",
+                                      (vehicle_id,)).fetchone()
+        if row is None:
+            row = self.connection.execute("SELECT 1 FROM order_rollups WHERE vehicle_id = ?", (vehicle_id,)).fetchone()
+        return row is not None
+
+    def get_rollup(self, vehicle_id):
+        row = self.connection.execute("SELECT vehicle_id, orders_count, total_cost FROM order_rollups "
+                                      "WHERE vehicle_id = ?", (vehicle_id,)).fetchone()
+        return dict(row) if row is not None else None
+
+    def find_ids_by_prefix(self, table, prefix, limit=2):
+        if uuid_prefix_range(prefix) is not None:
+            prefix = prefix.lower()
+        rows = self.connection.execute(f"SELECT id FROM {table} WHERE id >= ? AND id < ? ORDER BY id LIMIT ?",
+                                       (prefix, prefix + "\U0010ffff", limit))
+        return [row[0] for row in rows]
+
+    def iter_vehicles(self, filter_brand=None, filter_model=None, filter_payment=None, filter_owner=None,
+                      filter_reg=None):
+        conditions = []
+        params = []
+        for field, query in zip(TEXT_SEARCH_FIELDS, (filter_brand, filter_model, filter_owner, filter_reg)):
+            if not query:
+                continue
+            if len(query) >= 3:
+                conditions.append("rowid IN (SELECT rowid FROM vehicles_fts WHERE vehicles_fts MATCH ?)")
+                params.append(_fts_phrase(field, query))
+            else:
+                # Коротший за триграму запит індекс не прискорить.
+                conditions.append(f"instr({SHORT_QUERY_COLUMNS[field]}, ?) > 0")
+                params.append(query.casefold())
+        if filter_payment and filter_payment.lower() == "оплачено":
+            conditions.append("id NOT IN (SELECT vehicle_id FROM repair_orders WHERE status = 'Не оплачено')")
+        elif filter_payment and filter_payment.lower() == "не оплачено":
+            conditions.append("id IN (SELECT vehicle_id FROM repair_orders WHERE status = 'Не оплачено')")
+
+        query = f"SELECT {', '.join(VEHICLE_FIELDS + STATS_FIELDS)} FROM vehicles"
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY rowid"
+
+        for row in self.connection.execute(query, params):
+            yield dict(row)
+
+    def iter_orders(self, vehicle_id=None):
+        query = f"""
+            SELECT {', '.join('o.' + field for field in ORDER_FIELDS)},
+                   v.brand, v.model, v.reg_number, v.owner
+            FROM repair_orders o JOIN vehicles v ON v.id = o.vehicle_id
+        """
+        params = []
+        if vehicle_id:
+            query += " WHERE o.vehicle_id = ?"
+            params.append(vehicle_id)
+        query += " ORDER BY o.rowid"
+
+        for row in self.connection.execute(query, params):
+            yield dict(row)
+
+    def iter_order_facts(self):
+        # Час переводиться в секунди від 1970-01-01 без часової зони, як і в JSON-сховищі.
+        return self.connection.execute("""
+            SELECT CAST(strftime('%s', o.date_created) AS INTEGER), o.estimated_cost, o.status, o.work_type,
+                   v.brand
+            FROM repair_orders o JOIN vehicles v ON v.id = o.vehicle_id
+        """)
+
+
+def _same_record(first, second):
+    if first is None or second is None:
+        return first is second
+    return first is second or first.to_row() == second.to_row()
+
+
+def open_storage(data_file, journal=False, compact_threshold=1024 * 1024, snapshot_format=None, shared=False):
+    # SQLite сам блокує базу між процесами, тож спільний режим стосується лише JSON/бінарних файлів.
+    if str(data_file).endswith((".db", ".sqlite", ".sqlite3")):
+        return SQLiteStorage(data_file)
+    return JSONStorage(data_file, journal=journal, compact_threshold=compact_threshold,
+                       snapshot_format=snapshot_format, shared=shared)
@@ -1,68 +1,237 @@
 import os
+import sys
+import time
 import datetime
-from tabulate import tabulate
 import uuid
 import json
-from pathlib import Path
+import math
+import heapq
+import itertools
+from types import MappingProxyType
+from contextlib import contextmanager, ExitStack
+from sto_storage import open_storage
+from sto_cache import ResultCache
+from sto_bulk import IMPORT_CHUNK_SIZE, ErrorReport, read_chunks, write_rows
+from sto_archive import OrderArchive, ARCHIVE_SUFFIX, ARCHIVE_AGE_DAYS, ARCHIVE_CHUNK_SIZE
+from sto_records import VEHICLE_FIELDS, ORDER_FIELDS, STATS_FIELDS, ORDER_VEHICLE_FIELDS, TableView, freeze_rows
+from sto_table import Column, browse, iter_pages
+from sto_invoices import invoice_values, render_invoice, write_invoices
+from sto_stats import Instrumentation, profile_session, stats_enabled_from_env, PROFILE_ENV, PROFILE_OUTPUT_ENV
+
+
+# Ключ сортування та напрямок (reverse). Ідентифікатор у ключі робить порядок повним,
+# тож останній ключ сторінки однозначно задає курсор для наступної.
+VEHICLE_SORT_KEYS = {
+    "year": (lambda v: (v["year"], v["id"]), True),
+    "owner": (lambda v: (v["owner"].lower(), v["id"]), False),
+    "total_cost": (lambda v: (v["total_cost"], v["id"]), True),
+    "orders_count": (lambda v: (v["orders_count"], v["id"]), True),
+    "unpaid_orders": (lambda v: (v["unpaid_orders"], v["id"]), True),
+}
+ORDER_SORT_KEYS = {
+    "date_created": (lambda o: (o["date_created"], o["id"]), True),
+    "estimated_cost": (lambda o: (o["estimated_cost"], o["id"]), True),
+}
+# Типи елементів ключа сортування — щоб курсор від клієнта перевірявся до порівнянь з рядками.
+_NUMBER = (int, float)
+SORT_KEY_TYPES = {
+    "year": (int, str),
+    "owner": (str, str),
+    "total_cost": (_NUMBER, str),
+    "orders_count": (int, str),
+    "unpaid_orders": (int, str),
+    "date_created": (str, str),
+    "estimated_cost": (_NUMBER, str),
+}
+PAGE_SIZE = 20
+INSTRUMENTED_METHODS = (
+    "load_data", "save_data", "register_vehicle", "bulk_register_vehicles", "edit_vehicle", "delete_vehicle",
+    "add_repair_order", "bulk_add_repair_orders", "mark_order_paid", "generate_invoice", "generate_invoices",
+    "find_vehicle_by_prefix", "find_order_by_prefix", "get_vehicles", "get_repair_orders", "get_vehicles_page",
+    "get_repair_orders_page", "get_revenue", "get_receivables_ageing", "get_totals_by_work_type",
+    "get_totals_by_brand", "import_vehicles", "import_repair_orders", "export_vehicles", "export_repair_orders",
+    "archive_paid_orders", "get_archived_orders",
+)
+ORDER_STATUSES = ("Не оплачено", "Оплачено")
+VEHICLE_COLUMNS = [
+    Column("ID", lambda v: v['id'][:8], width=8),
+    Column("Марка", lambda v: v['brand'], max_width=20),
+    Column("Модель", lambda v: v['model'], max_width=20),
+    Column("Рік", lambda v: v['year'], width=4, align="right"),
+    Column("Реєстр. номер", lambda v: v['reg_number'], max_width=16),
+    Column("Власник", lambda v: v['owner'], max_width=30),
+    Column("Заявок", lambda v: v['orders_count'], align="right"),
+    Column("Неоплачено", lambda v: v['unpaid_orders'], align="right"),
+    Column("Загальна вартість", lambda v: f"{v['total_cost']:.2f} грн", align="right"),
+]
+ORDER_COLUMNS = [
+    Column("ID", lambda o: o['id'][:8], width=8),
+    Column("Транспорт", lambda o: f"{o['brand']} {o['model']}", max_width=30),
+    Column("Реєстр. номер", lambda o: o['reg_number'], max_width=16),
+    Column("Дата", lambda o: o['date_created'], width=19),
+    Column("Тип робіт", lambda o: o['work_type'], max_width=30),
+    Column("Вартість", lambda o: f"{o['estimated_cost']:.2f}", align="right"),
+    Column("Статус", lambda o: f"{o['status']} (архів)" if o.get('archived_at') else o['status']),
+]
+REVENUE_PERIODS = {"1": ("day", "днями"), "2": ("week", "тижнями"), "3": ("month", "місяцями")}
 
 
 class STOManagementSystem:
-    def __init__(self, data_file="sto_data.json"):
+    def __init__(self, data_file="sto_data.json", journal=False, compact_threshold=1024 * 1024,
+                 snapshot_format=None, storage=None, instrument=None, shared=False, cache_size=64):
         self.data_file = data_file
-        self.data = {
-            "vehicles": {},
-            "repair_orders": {}
-        }
+        self.storage = storage or open_storage(data_file, journal=journal, compact_threshold=compact_threshold,
+                                               snapshot_format=snapshot_format, shared=shared)
+        self._tx_depth = 0
+        self._analytics = None
+        # Холодне сховище заархівованих заявок лежить поруч з файлом даних.
+        self.archive = OrderArchive(str(data_file) + ARCHIVE_SUFFIX)
+        # cache_size=0 вимикає кешування результатів запитів.
+        self.cache = ResultCache(cache_size)
+        self.instrumentation = None
+        if instrument if instrument is not None else stats_enabled_from_env():
+            self.enable_instrumentation()
         self.load_data()
 
+    def enable_instrumentation(self):
+        # Обгортки ставляться на екземпляр, тож без інструментування методи викликаються напряму.
+        if self.instrumentation is None:
+            self.instrumentation = Instrumentation(self.storage)
+            for name in INSTRUMENTED_METHODS:
+                setattr(self, name, self.instrumentation.wrap(name, getattr(self, name)))
+        return self.instrumentation
+
+    def get_stats(self):
+        if self.instrumentation is None:
+            stats = {"enabled": False, "bytes_written": self.storage.bytes_written}
+        else:
+            stats = self.instrumentation.snapshot()
+        stats["cache"] = self.cache.stats()
+        return stats
+
+    def reset_stats(self):
+        self.cache.reset_stats()
+        if self.instrumentation is not None:
+            self.instrumentation.reset()
+
+    def profile(self, kind="cprofile", output=None):
+        return profile_session(kind, output)
+
+    @property
+    def data(self):
+        # Таблиці як відображення ID -> запис лише для читання, незалежно від сховища.
+        # Зміни вносяться лише методами системи.
+        return MappingProxyType({
+            "vehicles": TableView(self.storage.get_vehicle, self.storage.iter_vehicles),
+            "repair_orders": TableView(self.storage.get_order, self.storage.iter_orders)
+        })
+
     def load_data(self):
-        if Path(self.data_file).exists():
-            try:
-                with open(self.data_file, "r", encoding="utf-8") as file:
-                    self.data = json.load(file)
-            except Exception as e:
-                print(f"Помилка завантаження даних: {str(e)}")
-                self.data = {"vehicles": {}, "repair_orders": {}}
+        self.storage.load()
 
     def save_data(self):
+        return self.storage.save()
+
+    def check_consistency(self):
+        return self.storage.check_consistency()
+
+    def refresh(self):
+        # У спільному режимі підхоплює зміни інших терміналів; інакше нічого не робить.
+        return self.storage.refresh()
+
+    def close(self):
+        self.storage.close()
+
+    @contextmanager
+    def transaction(self):
+        if self._tx_depth:
+            savepoint = self.storage.savepoint()
+            self._tx_depth += 1
+            try:
+                yield self
+            except BaseException:
+                self.storage.rollback(savepoint)
+                raise
+            finally:
+                self._tx_depth -= 1
+            return
+
+        self.storage.begin()
+        self._tx_depth = 1
         try:
-            with open(self.data_file, "w", encoding="utf-8") as file:
-                json.dump(self.data, file, ensure_ascii=False, indent=2)
-            return True
-        except Exception as e:
-            print(f"Помилка збереження даних: {str(e)}")
-            return False
+            yield self
+        except BaseException:
+            self.storage.rollback()
+            raise
+        finally:
+            self._tx_depth = 0
+        self.storage.commit()
+
+    def _set(self, table, record_id, record):
+        self.storage.set_record(table, record_id, record)
 
     def register_vehicle(self, brand, model, year, reg_number, owner):
         try:
-            for vehicle in self.data["vehicles"].values():
-                if vehicle["reg_number"] == reg_number:
-                    return False, "Помилка: транспортний засіб з таким реєстраційним номером вже існує."
-
-            vehicle_id = str(uuid.uuid4())
-            registration_date = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-
-            self.data["vehicles"][vehicle_id] = {
-                "id": vehicle_id,
-                "brand": brand,
-                "model": model,
-                "year": year,
-                "reg_number": reg_number,
-                "owner": owner,
-                "registration_date": registration_date
-            }
+            if self.storage.vehicle_id_by_reg(reg_number) is not None:
+                return False, "Помилка: транспортний засіб з таким реєстраційним номером вже існує."
 
-            self.save_data()
+            with self.transaction():
+                self._create_vehicle(brand, model, year, reg_number, owner)
             return True, "Транспортний засіб успішно зареєстровано."
         except Exception as e:
             return False, f"Помилка при реєстрації транспортного засобу: {str(e)}"
 
+    def _create_vehicle(self, brand, model, year, reg_number, owner, vehicle_id=None, registration_date=None):
+        vehicle_id = vehicle_id or str(uuid.uuid4())
+        registration_date = registration_date or datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+        self._set("vehicles", vehicle_id, {
+            "id": vehicle_id,
+            "brand": brand,
+            "model": model,
+            "year": year,
+            "reg_number": reg_number,
+            "owner": owner,
+            "registration_date": registration_date
+        })
+        return vehicle_id
+
+    def bulk_register_vehicles(self, vehicles):
+        try:
+            vehicles = list(vehicles)
+            errors = []
+            seen_reg_numbers = set()
+            for row_number, vehicle in enumerate(vehicles, 1):
+                reg_number = vehicle.get("reg_number")
+                if not reg_number:
+                    errors.append(f"Рядок {row_number}: не вказано реєстраційний номер.")
+                elif self.storage.vehicle_id_by_reg(reg_number) is not None or reg_number in seen_reg_numbers:
+                    errors.append(f"Рядок {row_number}: транспортний засіб з номером {reg_number} вже існує.")
+                seen_reg_numbers.add(reg_number)
+                if not isinstance(vehicle.get("year"), int):
+                    errors.append(f"Рядок {row_number}: рік випуску має бути числом.")
+
+            if errors:
+                return False, "\n".join(errors)
+
+            with self.transaction():
+                for vehicle in vehicles:
+                    self._create_vehicle(vehicle.get("brand", ""), vehicle.get("model", ""), vehicle["year"],
+                                         vehicle["reg_number"], vehicle.get("owner", ""))
+            return True, f"Зареєстровано транспортних засобів: {len(vehicles)}."
+        except Exception as e:
+            return False, f"Помилка при реєстрації транспортних засобів: {str(e)}"
+
     def edit_vehicle(self, vehicle_id, brand=None, model=None, year=None, reg_number=None, owner=None):
         try:
-            if vehicle_id not in self.data["vehicles"]:
+            vehicle = self.storage.get_vehicle(vehicle_id)
+            if vehicle is None:
                 return False, "Транспортний засіб не знайдено."
 
-            vehicle = self.data["vehicles"][vehicle_id]
+            if reg_number and self.storage.vehicle_id_by_reg(reg_number) not in (None, vehicle_id):
+                return False, "Помилка: транспортний засіб з таким реєстраційним номером вже існує."
+
+            vehicle = dict(vehicle)
 
             if brand:
                 vehicle["brand"] = brand
@@ -73,168 +242,581 @@ class STOManagementSystem:
             if owner:
                 vehicle["owner"] = owner
             if reg_number:
-                for v_id, v in self.data["vehicles"].items():
-                    if v["reg_number"] == reg_number and v_id != vehicle_id:
-                        return False, "Помилка: транспортний засіб з таким реєстраційним номером вже існує."
                 vehicle["reg_number"] = reg_number
 
-            self.save_data()
+            with self.transaction():
+                self._set("vehicles", vehicle_id, vehicle)
             return True, "Інформацію про транспортний засіб успішно оновлено."
         except Exception as e:
             return False, f"Помилка при редагуванні інформації: {str(e)}"
 
     def delete_vehicle(self, vehicle_id):
         try:
-            if vehicle_id not in self.data["vehicles"]:
+            if self.storage.get_vehicle(vehicle_id) is None:
                 return False, "Транспортний засіб не знайдено."
 
-            for order in self.data["repair_orders"].values():
-                if order["vehicle_id"] == vehicle_id:
-                    return False, "Неможливо видалити: є активні заявки на ремонт для цього транспортного засобу."
+            if self.storage.has_orders(vehicle_id):
+                return False, "Неможливо видалити: є активні заявки на ремонт для цього транспортного засобу."
 
-            del self.data["vehicles"][vehicle_id]
-            self.save_data()
+            with self.transaction():
+                self._set("vehicles", vehicle_id, None)
             return True, "Транспортний засіб успішно видалено."
         except Exception as e:
             return False, f"Помилка при видаленні транспортного засобу: {str(e)}"
 
-    def add_repair_order(self, vehicle_id, work_type, parts, resources, estimated_cost):
+    def add_repair_order(self, vehicle_id, work_type, parts, resources, estimated_cost, order_id=None):
         try:
-            if vehicle_id not in self.data["vehicles"]:
+            if self.storage.get_vehicle(vehicle_id) is None:
                 return False, "Транспортний засіб не знайдено."
 
-            order_id = str(uuid.uuid4())
-            date_created = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-
-            self.data["repair_orders"][order_id] = {
-                "id": order_id,
-                "vehicle_id": vehicle_id,
-                "date_created": date_created,
-                "work_type": work_type,
-                "parts": parts,
-                "resources": resources,
-                "estimated_cost": estimated_cost,
-                "status": "Не оплачено"
-            }
-
-            self.save_data()
+            with self.transaction():
+                self._create_repair_order(vehicle_id, work_type, parts, resources, estimated_cost, order_id)
             return True, "Заявку на ремонт успішно додано."
         except Exception as e:
             return False, f"Помилка при додаванні заявки на ремонт: {str(e)}"
 
+    def _create_repair_order(self, vehicle_id, work_type, parts, resources, estimated_cost, order_id=None,
+                             date_created=None, status="Не оплачено"):
+        order_id = order_id or str(uuid.uuid4())
+        date_created = date_created or datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+        self._set("repair_orders", order_id, {
+            "id": order_id,
+            "vehicle_id": vehicle_id,
+            "date_created": date_created,
+            "work_type": work_type,
+            "parts": parts,
+            "resources": resources,
+            "estimated_cost": estimated_cost,
+            "status": status
+        })
+        return order_id
+
+    def bulk_add_repair_orders(self, orders):
+        try:
+            orders = list(orders)
+            errors = []
+            for row_number, order in enumerate(orders, 1):
+                if self.storage.get_vehicle(order.get("vehicle_id")) is None:
+                    errors.append(f"Рядок {row_number}: транспортний засіб не знайдено.")
+                cost = order.get("estimated_cost")
+                if isinstance(cost, bool) or not isinstance(cost, (int, float)):
+                    errors.append(f"Рядок {row_number}: вартість має бути числом.")
+
+            if errors:
+                return False, "\n".join(errors)
+
+            with self.transaction():
+                for order in orders:
+                    self._create_repair_order(order["vehicle_id"], order.get("work_type", ""), order.get("parts", ""),
+                                              order.get("resources", ""), order["estimated_cost"])
+            return True, f"Додано заявок на ремонт: {len(orders)}."
+        except Exception as e:
+            return False, f"Помилка при додаванні заявок на ремонт: {str(e)}"
+
     def mark_order_paid(self, order_id):
         try:
-            if order_id not in self.data["repair_orders"]:
+            order = self.storage.get_order(order_id)
+            if order is None:
                 return False, "Заявку не знайдено."
 
-            self.data["repair_orders"][order_id]["status"] = "Оплачено"
-            self.save_data()
+            with self.transaction():
+                self._set("repair_orders", order_id, dict(order, status="Оплачено"))
             return True, "Заявку успішно позначено як оплачену."
         except Exception as e:
             return False, f"Помилка при оновленні статусу заявки: {str(e)}"
 
     def generate_invoice(self, order_id):
         try:
-            if order_id not in self.data["repair_orders"]:
+            # Заархівовану заявку теж можна надрукувати повторно; якщо засіб уже змінено
+            # чи видалено, беруться дані, збережені разом із заявкою в архіві.
+            order = self.storage.get_order(order_id) or self.archive.get_order(order_id)
+            if order is None:
                 return False, "Заявку не знайдено."
 
-            order = self.data["repair_orders"][order_id]
-            vehicle = self.data["vehicles"][order["vehicle_id"]]
-
-            invoice = f"""
-==================================================
-                РАХУНОК НА ОПЛАТУ
-==================================================
-Номер рахунку: {order_id[:8]}
-Дата створення: {order["date_created"]}
---------------------------------------------------
-Власник: {vehicle["owner"]}
-Транспортний засіб: {vehicle["brand"]} {vehicle["model"]}
-Реєстраційний номер: {vehicle["reg_number"]}
---------------------------------------------------
-Тип робіт: {order["work_type"]}
-Запчастини: {order["parts"] or "Не вказано"}
-Ресурси: {order["resources"] or "Не вказано"}
---------------------------------------------------
-Загальна вартість: {order["estimated_cost"]:.2f} грн.
-Статус оплати: {order["status"]}
-==================================================
-            """
-
-            return True, invoice
+            vehicle = self.storage.get_vehicle(order["vehicle_id"]) or order
+            return True, render_invoice(invoice_values(order_id, order, vehicle))
         except Exception as e:
             return False, f"Помилка при генерації рахунку: {str(e)}"
 
-    def get_vehicles(self, filter_brand=None, filter_model=None, filter_payment=None):
+    def generate_invoices(self, order_ids=None, status=None, date_from=None, date_to=None,
+                          output="invoices", archive=False, workers=None):
         try:
-            vehicles_list = []
+            rows = self._invoice_rows(order_ids, status, date_from, date_to)
+            return True, write_invoices(rows, output, archive=archive, workers=workers)
+        except Exception as e:
+            return False, f"Помилка при пакетній генерації рахунків: {str(e)}"
+
+    def _invoice_rows(self, order_ids, status, date_from, date_to):
+        # Дати перевіряються одразу, а не тоді, коли генератор дійде до першого рахунку.
+        date_from = _parse_date(date_from)
+        date_to = _parse_date(date_to)
+        if order_ids is not None:
+            return self._invoice_rows_by_id(order_ids)
+        return self._filtered_invoice_rows(status, date_from, date_to)
+
+    def _invoice_rows_by_id(self, order_ids):
+        # Як і generate_invoice, шукаємо також в архіві, а дані засобу беремо зі збереженої заявки,
+        # якщо засіб уже видалено.
+        for order_id in order_ids:
+            order = self.storage.get_order(order_id) or self.archive.get_order(order_id)
+            if order is None:
+                continue
+            vehicle = self.storage.get_vehicle(order["vehicle_id"]) or order
+            yield invoice_values(order["id"], order, vehicle)
 
-            for vehicle_id, vehicle in self.data["vehicles"].items():
-                vehicle_data = vehicle.copy()
+    def _filtered_invoice_rows(self, status, date_from, date_to):
+        for order in self.storage.iter_orders():
+            if status and order["status"] != status:
+                continue
+            if date_from and order["date_created"][:10] < date_from:
+                continue
+            if date_to and order["date_created"][:10] > date_to:
+                continue
+            yield invoice_values(order["id"], order, order)
 
-                orders_count = 0
-                unpaid_orders = 0
-                total_cost = 0
+    def import_vehicles(self, path, file_format=None, chunk_size=IMPORT_CHUNK_SIZE, error_report=None):
+        try:
+            return True, self._import(path, file_format, chunk_size, error_report, self._prepare_vehicle,
+                                      self._create_vehicle)
+        except Exception as e:
+            return False, f"Помилка при імпорті транспортних засобів: {str(e)}"
 
-                for order in self.data["repair_orders"].values():
-                    if order["vehicle_id"] == vehicle_id:
-                        orders_count += 1
-                        total_cost += order["estimated_cost"]
-                        if order["status"] == "Не оплачено":
-                            unpaid_orders += 1
+    def import_repair_orders(self, path, file_format=None, chunk_size=IMPORT_CHUNK_SIZE, error_report=None):
+        try:
+            return True, self._import(path, file_format, chunk_size, error_report, self._prepare_repair_order,
+                                      self._create_repair_order)
+        except Exception as e:
+            return False, f"Помилка при імпорті заявок на ремонт: {str(e)}"
+
+    def _import(self, path, file_format, chunk_size, error_report, prepare, create):
+        # Файл читається пакетами: рядки пакета перевіряються, хибні йдуть у звіт про
+        # помилки, а решта записується однією транзакцією (одним збереженням). Номери,
+        # зайняті попередніми пакетами, вже є у сховищі, тож пам'ять не залежить від
+        # розміру файлу.
+        started = time.perf_counter()
+        imported = 0
+        report = ErrorReport(error_report or f"{path}.errors.csv")
+        try:
+            for chunk in read_chunks(path, file_format, chunk_size):
+                valid = []
+                pending = set()
+                for row_number, row, error in chunk:
+                    if error is None:
+                        try:
+                            valid.append(prepare(row, pending))
+                        except ValueError as e:
+                            error = str(e)
+                    if error is not None:
+                        report.add(row_number, error)
+                if valid:
+                    try:
+                        with self.transaction():
+                            for values in valid:
+                                create(*values)
+                    except Exception as e:
+                        raise IOError(f"{str(e)} Імпортовано рядків до збою: {imported}.")
+                    imported += len(valid)
+        finally:
+            report.close()
+
+        elapsed = time.perf_counter() - started
+        return {
+            "imported": imported,
+            "rejected": report.count,
+            "seconds": elapsed,
+            "per_second": (imported + report.count) / elapsed if elapsed > 0 else 0.0,
+            "errors": report.path if report.count else None
+        }
 
-                vehicle_data["orders_count"] = orders_count
-                vehicle_data["unpaid_orders"] = unpaid_orders
-                vehicle_data["total_cost"] = total_cost
+    def _prepare_vehicle(self, row, pending):
+        reg_number = _text(row.get("reg_number")).strip()
+        if not reg_number:
+            raise ValueError("Не вказано реєстраційний номер.")
+        if reg_number in pending or self.storage.vehicle_id_by_reg(reg_number) is not None:
+            raise ValueError(f"Транспортний засіб з номером {reg_number} вже існує.")
+        year = _parse_year(row.get("year"))
+        vehicle_id = _parse_id(row.get("id"), pending, self.storage.get_vehicle)
+        registration_date = _parse_timestamp(row.get("registration_date"))
+        pending.add(reg_number)
+        return (_text(row.get("brand")), _text(row.get("model")), year, reg_number, _text(row.get("owner")),
+                vehicle_id, registration_date)
+
+    def _prepare_repair_order(self, row, pending):
+        # Транспортний засіб шукається за vehicle_id, а якщо його немає — за реєстраційним номером.
+        vehicle = None
+        if row.get("vehicle_id"):
+            vehicle = self.storage.get_vehicle(_text(row["vehicle_id"]).strip())
+        if vehicle is None and row.get("reg_number"):
+            vehicle_id = self.storage.vehicle_id_by_reg(_text(row["reg_number"]).strip())
+            vehicle = self.storage.get_vehicle(vehicle_id) if vehicle_id is not None else None
+        if vehicle is None:
+            raise ValueError("Транспортний засіб не знайдено.")
+        cost = _parse_cost(row.get("estimated_cost"))
+        status = _text(row.get("status")).strip() or "Не оплачено"
+        if status not in ORDER_STATUSES:
+            raise ValueError(f"Невідомий статус: {status}. Допустимі: {', '.join(ORDER_STATUSES)}.")
+        order_id = _parse_id(row.get("id"), pending, self.storage.get_order)
+        date_created = _parse_timestamp(row.get("date_created"))
+        return (vehicle["id"], _text(row.get("work_type")), _text(row.get("parts")), _text(row.get("resources")),
+                cost, order_id, date_created, status)
+
+    def export_vehicles(self, path, file_format=None):
+        try:
+            return True, write_rows(path, self.storage.iter_vehicles(), VEHICLE_FIELDS + STATS_FIELDS, file_format)
+        except Exception as e:
+            return False, f"Помилка при експорті транспортних засобів: {str(e)}"
 
-                vehicles_list.append(vehicle_data)
+    def export_repair_orders(self, path, file_format=None):
+        try:
+            return True, write_rows(path, self.storage.iter_orders(), ORDER_FIELDS + ORDER_VEHICLE_FIELDS,
+                                    file_format)
+        except Exception as e:
+            return False, f"Помилка при експорті заявок на ремонт: {str(e)}"
+
+    def archive_paid_orders(self, older_than_days=ARCHIVE_AGE_DAYS, chunk_size=ARCHIVE_CHUNK_SIZE):
+        try:
+            started = time.perf_counter()
+            cutoff = (datetime.datetime.now() - datetime.timedelta(days=older_than_days)).strftime("%Y-%m-%d %H:%M:%S")
+            order_ids = [order["id"] for order in self.storage.iter_orders()
+                         if order["status"] == "Оплачено" and order["date_created"] < cutoff]
+            archived = 0
+            for start in range(0, len(order_ids), chunk_size):
+                archived += self._archive_chunk(order_ids[start:start + chunk_size])
+
+            elapsed = time.perf_counter() - started
+            return True, {
+                "archived": archived,
+                "seconds": elapsed,
+                "per_second": archived / elapsed if elapsed > 0 else 0.0,
+                "output": self.archive.path
+            }
+        except Exception as e:
+            return False, f"Помилка при архівуванні заявок: {str(e)}"
+
+    def _archive_chunk(self, order_ids):
+        # Спершу заявки дописуються в архів, а потім однією транзакцією видаляються з
+        # робочих даних разом з оновленням підсумків засобів. Якщо транзакція не вдалась,
+        # заявки лишаються в робочих даних, а їхні копії в архіві не враховуються.
+        archived_at = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        rows = []
+        totals = {}
+        for order_id in order_ids:
+            order = self.storage.get_order(order_id)
+            if order is None or order["status"] != "Оплачено":
+                continue
+            vehicle = self.storage.get_vehicle(order["vehicle_id"])
+            row = dict(order, archived_at=archived_at)
+            row.update((field, vehicle[field]) for field in ORDER_VEHICLE_FIELDS)
+            rows.append(row)
+            vehicle_totals = totals.setdefault(row["vehicle_id"], [0, 0.0])
+            vehicle_totals[0] += 1
+            vehicle_totals[1] += row["estimated_cost"]
+        if not rows:
+            return 0
+
+        self.archive.append(rows)
+        with self.transaction():
+            for vehicle_id, (orders_count, total_cost) in totals.items():
+                rollup = self.storage.get_rollup(vehicle_id)
+                if rollup is not None:
+                    orders_count += rollup["orders_count"]
+                    total_cost += rollup["total_cost"]
+                self._set("order_rollups", vehicle_id,
+                          {"vehicle_id": vehicle_id, "orders_count": orders_count, "total_cost": total_cost})
+            for row in rows:
+                self._set("repair_orders", row["id"], None)
+        return len(rows)
+
+    def get_archived_orders(self, vehicle_id=None):
+        try:
+            return list(self.archive.iter_orders(vehicle_id, self.storage.get_order))
+        except Exception as e:
+            print(f"Помилка при отриманні архівних заявок: {str(e)}")
+            return []
 
-            filtered_vehicles = []
-            for vehicle in vehicles_list:
-                include = True
+    def find_vehicle_by_prefix(self, prefix):
+        try:
+            matches = self.storage.find_ids_by_prefix("vehicles", prefix.strip())
+            if not matches:
+                return False, "Транспортний засіб не знайдено."
+            if len(matches) > 1:
+                return False, "Знайдено кілька транспортних засобів з таким ID. Введіть більше символів ID."
+            return True, self.storage.get_vehicle(matches[0])
+        except Exception as e:
+            return False, f"Помилка при пошуку транспортного засобу: {str(e)}"
 
-                if filter_brand and filter_brand.lower() not in vehicle["brand"].lower():
-                    include = False
+    def find_order_by_prefix(self, prefix):
+        try:
+            matches = self.storage.find_ids_by_prefix("repair_orders", prefix.strip())
+            get_order = self.storage.get_order
+            if not matches:
+                matches = self.archive.find_ids_by_prefix(prefix.strip())
+                get_order = self.archive.get_order
+            if not matches:
+                return False, "Заявку не знайдено."
+            if len(matches) > 1:
+                return False, "Знайдено кілька заявок з таким ID. Введіть більше символів ID."
+            return True, get_order(matches[0])
+        except Exception as e:
+            return False, f"Помилка при пошуку заявки: {str(e)}"
 
-                if filter_model and filter_model.lower() not in vehicle["model"].lower():
-                    include = False
+    def _cached(self, name, args, compute, size=len):
+        # Результат живе в кеші, доки не зміниться версія даних сховища. Рядки в ньому
+        # лише для читання (compute() обгортає словники через freeze_rows), тож назовні
+        # віддається новий список з тими самими рядками.
+        self.storage.refresh()
 
-                if filter_payment:
-                    if filter_payment.lower() == "оплачено" and vehicle["unpaid_orders"] > 0:
-                        include = False
-                    elif filter_payment.lower() == "не оплачено" and vehicle["unpaid_orders"] == 0:
-                        include = False
+        def compute_entry():
+            value = compute()
+            return value, size(value)
 
-                if include:
-                    filtered_vehicles.append(vehicle)
+        return self.cache.get((name,) + args, (self.storage.data_version, self.archive.version), compute_entry)
 
-            return filtered_vehicles
+    def get_vehicles(self, filter_brand=None, filter_model=None, filter_payment=None, filter_owner=None,
+                     filter_reg=None):
+        try:
+            args = (filter_brand, filter_model, filter_payment, filter_owner, filter_reg)
+            return list(self._cached("get_vehicles", args, lambda: freeze_rows(self.storage.iter_vehicles(*args))))
         except Exception as e:
             print(f"Помилка при отриманні списку транспортних засобів: {str(e)}")
             return []
 
-    def get_repair_orders(self, vehicle_id=None):
+    def get_repair_orders(self, vehicle_id=None, include_archived=False):
         try:
-            orders_list = []
+            def compute():
+                rows = self.storage.iter_orders(vehicle_id)
+                if include_archived:
+                    rows = itertools.chain(rows, self.archive.iter_orders(vehicle_id, self.storage.get_order))
+                return freeze_rows(rows)
 
-            for order_id, order in self.data["repair_orders"].items():
-                if vehicle_id and order["vehicle_id"] != vehicle_id:
-                    continue
+            return list(self._cached("get_repair_orders", (vehicle_id, include_archived), compute))
+        except Exception as e:
+            print(f"Помилка при отриманні списку заявок: {str(e)}")
+            return []
 
-                if order["vehicle_id"] in self.data["vehicles"]:
-                    vehicle = self.data["vehicles"][order["vehicle_id"]]
-                    order_data = order.copy()
-                    order_data["brand"] = vehicle["brand"]
-                    order_data["model"] = vehicle["model"]
-                    order_data["reg_number"] = vehicle["reg_number"]
-                    order_data["owner"] = vehicle["owner"]
-                    orders_list.append(order_data)
+    def iter_vehicles(self, filter_brand=None, filter_model=None, filter_payment=None, sort_by=None, limit=None,
+                      cursor=None, filter_owner=None, filter_reg=None):
+        rows = self.storage.iter_vehicles(filter_brand, filter_model, filter_payment, filter_owner, filter_reg)
+        return self._paginate(rows, VEHICLE_SORT_KEYS, sort_by, limit, cursor)[0]
 
-            return orders_list
+    def iter_repair_orders(self, vehicle_id=None, sort_by=None, limit=None, cursor=None, include_archived=False):
+        rows = self.storage.iter_orders(vehicle_id)
+        if include_archived:
+            # Архів читається лише тоді, коли робочі заявки вже видано.
+            rows = itertools.chain(rows, self.archive.iter_orders(vehicle_id, self.storage.get_order))
+        return self._paginate(rows, ORDER_SORT_KEYS, sort_by, limit, cursor)[0]
+
+    def get_vehicles_page(self, filter_brand=None, filter_model=None, filter_payment=None, sort_by=None,
+                          limit=PAGE_SIZE, cursor=None, filter_owner=None, filter_reg=None):
+        try:
+            args = (filter_brand, filter_model, filter_payment, filter_owner, filter_reg)
+
+            def compute():
+                rows = self.storage.iter_vehicles(*args)
+                page, next_cursor = self._paginate(rows, VEHICLE_SORT_KEYS, sort_by, limit, cursor)
+                return freeze_rows(page), next_cursor
+
+            page, next_cursor = self._cached("get_vehicles_page", args + (sort_by, limit, cursor), compute,
+                                             size=lambda value: len(value[0]))
+            return list(page), next_cursor
+        except Exception as e:
+            print(f"Помилка при отриманні списку транспортних засобів: {str(e)}")
+            return [], None
+
+    def get_repair_orders_page(self, vehicle_id=None, sort_by=None, limit=PAGE_SIZE, cursor=None):
+        try:
+            def compute():
+                rows = self.storage.iter_orders(vehicle_id)
+                page, next_cursor = self._paginate(rows, ORDER_SORT_KEYS, sort_by, limit, cursor)
+                return freeze_rows(page), next_cursor
+
+            page, next_cursor = self._cached("get_repair_orders_page", (vehicle_id, sort_by, limit, cursor), compute,
+                                             size=lambda value: len(value[0]))
+            return list(page), next_cursor
         except Exception as e:
             print(f"Помилка при отриманні списку заявок: {str(e)}")
+            return [], None
+
+    def analytics(self):
+        if self._analytics is None:
+            # NumPy завантажується лише тоді, коли справді потрібні звіти.
+            from sto_analytics import OrderAnalytics
+            self._analytics = OrderAnalytics(self.storage, self.archive)
+        return self._analytics
+
+    def get_revenue(self, period="month", date_from=None, date_to=None):
+        try:
+            return self.analytics().revenue(period, date_from, date_to)
+        except Exception as e:
+            print(f"Помилка при побудові звіту про виручку: {str(e)}")
+            return []
+
+    def get_receivables_ageing(self, as_of=None):
+        try:
+            return self.analytics().receivables_ageing(as_of)
+        except Exception as e:
+            print(f"Помилка при побудові звіту про заборгованість: {str(e)}")
+            return []
+
+    def get_totals_by_work_type(self):
+        try:
+            return self.analytics().totals_by("work_type")
+        except Exception as e:
+            print(f"Помилка при побудові звіту за типами робіт: {str(e)}")
+            return []
+
+    def get_totals_by_brand(self):
+        try:
+            return self.analytics().totals_by("brand")
+        except Exception as e:
+            print(f"Помилка при побудові звіту за марками: {str(e)}")
             return []
 
+    @staticmethod
+    def _paginate(rows, sort_keys, sort_by, limit, cursor):
+        # Повертає (рядки сторінки, курсор наступної сторінки або None). Без сортування
+        # рядки віддаються потоком зі зсувом; із сортуванням перша сторінка обирається
+        # купою (top-k) за один прохід, а курсор — ключ останнього рядка сторінки.
+        if limit is not None and (isinstance(limit, bool) or not isinstance(limit, int) or limit < 1):
+            raise ValueError("Розмір сторінки має бути додатним цілим числом.")
+        if sort_by and sort_by not in sort_keys:
+            raise ValueError(f"Невідоме поле сортування: {sort_by}")
+        position = STOManagementSystem._parse_cursor(cursor, sort_by)
+
+        if not sort_by:
+            offset = position["offset"] if position else 0
+            if limit is None:
+                return itertools.islice(rows, offset, None), None
+            page = list(itertools.islice(rows, offset, offset + limit + 1))
+            if len(page) > limit:
+                return page[:limit], json.dumps({"offset": offset + limit})
+            return page, None
+
+        sort_key, reverse = sort_keys[sort_by]
+
+        keyed = ((sort_key(row), row) for row in rows)
+        if position:
+            after = tuple(position["after"])
+            keyed = (item for item in keyed if (item[0] < after if reverse else item[0] > after))
+
+        if limit is None:
+            page = sorted(keyed, key=lambda item: item[0], reverse=reverse)
+        elif reverse:
+            page = heapq.nlargest(limit + 1, keyed, key=lambda item: item[0])
+        else:
+            page = heapq.nsmallest(limit + 1, keyed, key=lambda item: item[0])
+
+        next_cursor = None
+        if limit is not None and len(page) > limit:
+            page = page[:limit]
+            next_cursor = json.dumps({"sort_by": sort_by, "after": list(page[-1][0])}, ensure_ascii=False)
+        return (row for _, row in page), next_cursor
+
+    @staticmethod
+    def _parse_cursor(cursor, sort_by):
+        # Курсор приходить від клієнта, тож перевіряється повністю ще до читання рядків.
+        if not cursor:
+            return None
+        try:
+            position = json.loads(cursor)
+        except ValueError:
+            raise ValueError("Некоректний курсор.")
+        if not isinstance(position, dict):
+            raise ValueError("Некоректний курсор.")
+        if sort_by:
+            if position.get("sort_by") != sort_by:
+                raise ValueError("Курсор належить до іншого сортування.")
+            after = position.get("after")
+            types = SORT_KEY_TYPES[sort_by]
+            if not isinstance(after, list) or len(after) != len(types) or not all(
+                    isinstance(value, expected) and not isinstance(value, bool)
+                    for value, expected in zip(after, types)):
+                raise ValueError("Некоректний курсор.")
+        else:
+            offset = position.get("offset")
+            if "sort_by" in position or isinstance(offset, bool) or not isinstance(offset, int) or offset < 0:
+                raise ValueError("Некоректний курсор.")
+        return position
+
+
+def _text(value):
+    return "" if value is None else str(value)
+
+
+def _parse_year(value):
+    if isinstance(value, bool):
+        raise ValueError("Рік випуску має бути числом.")
+    try:
+        return value if isinstance(value, int) else int(_text(value).strip())
+    except ValueError:
+        raise ValueError("Рік випуску має бути числом.") from None
+
+
+def _parse_cost(value):
+    # У CSV з української локалі дробова частина часто відділена комою.
+    if isinstance(value, bool):
+        raise ValueError("Вартість має бути числом.")
+    try:
+        cost = float(value) if isinstance(value, (int, float)) else float(_text(value).strip().replace(",", "."))
+    except ValueError:
+        raise ValueError("Вартість має бути числом.") from None
+    if not math.isfinite(cost):
+        raise ValueError("Вартість має бути числом.")
+    return cost
+
+
+def _parse_timestamp(value):
+    value = _text(value).strip()
+    if not value:
+        return None
+    try:
+        datetime.datetime.strptime(value, "%Y-%m-%d %H:%M:%S")
+    except ValueError:
+        raise ValueError(f"Некоректна дата: {value}. Очікується РРРР-ММ-ДД ГГ:ХХ:СС.") from None
+    return value
+
+
+def _parse_date(value):
+    value = _text(value).strip()
+    if not value:
+        return None
+    try:
+        date = datetime.datetime.strptime(value, "%Y-%m-%d")
+    except ValueError:
+        raise ValueError(f"Некоректна дата: {value}. Очікується РРРР-ММ-ДД.") from None
+    # Дати заявок порівнюються як рядки, тож "2024-1-5" зводимо до "2024-01-05".
+    return date.strftime("%Y-%m-%d")
+
+
+def _parse_id(value, pending, lookup):
+    # Ідентифікатор із файлу зберігається (наприклад, при перенесенні даних між сховищами),
+    # якщо він ще не зайнятий; порожній — буде згенеровано новий.
+    value = _text(value).strip()
+    if not value:
+        return None
+    if value in pending or lookup(value) is not None:
+        raise ValueError(f"Запис з ID {value} вже існує.")
+    pending.add(value)
+    return value
+
+
+def tabulate(rows, headers=(), **kwargs):
+    # tabulate імпортується лише при першому виведенні таблиці: він сам по собі
+    # завантажується довше, ніж решта програми, а скриптовим командам часто не потрібен.
+    from tabulate import tabulate as render
+    return render(rows, headers=headers, **kwargs)
+
+
+def clear_screen():
+    # Escape-послідовність замість os.system('clear'): без запуску окремого процесу на кожен показ меню.
+    if not sys.stdout.isatty():
+        return
+    if os.name == 'nt':
+        os.system('cls')
+    else:
+        print("\033[H\033[2J", end="", flush=True)
+
 
 def display_menu():
     menu = """
@@ -250,19 +832,58 @@ def display_menu():
 7. Переглянути список транспортних засобів
 8. Переглянути заявки на ремонт
 9. Вихід
+10. Звіти та аналітика
 =============================================
 """
     print(menu)
 
 
-def main():
-    system = STOManagementSystem()
+def print_stats(stats):
+    cache = stats["cache"]
+    cache_line = (f"Кеш запитів: {cache['hits']} влучань, {cache['misses']} промахів "
+                  f"({cache['hit_rate'] * 100:.0f}%), записів {cache['entries']}, рядків {cache['rows']}, "
+                  f"витіснено {cache['evictions']}, скинуто {cache['invalidations']}")
+    if not stats["enabled"]:
+        print("Інструментування вимкнено. Запустіть програму зі змінною середовища STO_STATS=1.")
+        print(f"Записано на диск: {stats['bytes_written']} байт")
+        print(cache_line)
+        return
+
+    print(f"Час роботи: {stats['uptime_seconds']:.1f} с, завантаження даних: {stats['load_seconds']:.3f} с")
+    print(f"Записано на диск: {stats['bytes_written']} байт, останнє збереження: {stats['last_save_bytes']} байт")
+    print(cache_line)
+    rows = [[name, method["calls"], method["failures"], f"{method['mean_seconds'] * 1000:.3f}",
+             f"{method['max_seconds'] * 1000:.3f}", method["bytes_written"],
+             ", ".join(f"{bucket}: {count}" for bucket, count in method["histogram"].items())]
+            for name, method in sorted(stats["methods"].items())]
+    print(tabulate(rows, headers=["Метод", "Викликів", "Відмов", "Сер., мс", "Макс., мс", "Байтів", "Гістограма"]))
+
+
+def print_profile(report):
+    if report.get("output"):
+        print(f"Профіль ({report['kind']}) записано у {report['output']}")
+    if "peak_bytes" in report:
+        print(f"Пам'ять: зараз {report['current_bytes'] / 1024:.1f} КБ, пік {report['peak_bytes'] / 1024:.1f} КБ")
+    for line in report.get("top", []):
+        print(line)
+
+
+def main(data_file="sto_data.json"):
+    # STO_SHARED=1 — кілька терміналів працюють з одним файлом даних одночасно.
+    system = STOManagementSystem(data_file, journal=True,
+                                 shared=os.environ.get("STO_SHARED", "").lower() in ("1", "true", "yes"))
+    # STO_PROFILE=cprofile|tracemalloc профілює всю сесію до виходу з програми.
+    session = ExitStack()
+    profile_report = None
+    if os.environ.get(PROFILE_ENV):
+        profile_report = session.enter_context(system.profile(os.environ[PROFILE_ENV].lower(),
+                                                              os.environ.get(PROFILE_OUTPUT_ENV)))
 
     while True:
-        os.system('cls' if os.name == 'nt' else 'clear')
+        clear_screen()
         display_menu()
 
-        choice = input("Виберіть опцію (1-9): ")
+        choice = input("Виберіть опцію (1-10): ")
 
         if choice == "1":
             print("\n=== Реєстрація нового транспортного засобу ===")
@@ -292,10 +913,10 @@ def main():
                            headers=["ID", "Марка", "Модель", "Реєстр. номер", "Власник"]))
 
             vehicle_id = input("\nВведіть ID транспортного засобу для редагування: ")
-            target_vehicle = next((v for v in vehicles if v['id'].startswith(vehicle_id)), None)
+            found, target_vehicle = system.find_vehicle_by_prefix(vehicle_id)
 
-            if not target_vehicle:
-                print("Транспортний засіб не знайдено.")
+            if not found:
+                print(target_vehicle)
                 input("Натисніть Enter для продовження...")
                 continue
 
@@ -327,10 +948,10 @@ def main():
                            headers=["ID", "Марка", "Модель", "Реєстр. номер", "Власник"]))
 
             vehicle_id = input("\nВведіть ID транспортного засобу для видалення: ")
-            target_vehicle = next((v for v in vehicles if v['id'].startswith(vehicle_id)), None)
+            found, target_vehicle = system.find_vehicle_by_prefix(vehicle_id)
 
-            if not target_vehicle:
-                print("Транспортний засіб не знайдено.")
+            if not found:
+                print(target_vehicle)
                 input("Натисніть Enter для продовження...")
                 continue
 
@@ -353,10 +974,10 @@ def main():
                            headers=["ID", "Марка", "Модель", "Реєстр. номер", "Власник"]))
 
             vehicle_id = input("\nВведіть ID транспортного засобу для додавання заявки: ")
-            target_vehicle = next((v for v in vehicles if v['id'].startswith(vehicle_id)), None)
+            found, target_vehicle = system.find_vehicle_by_prefix(vehicle_id)
 
-            if not target_vehicle:
-                print("Транспортний засіб не знайдено.")
+            if not found:
+                print(target_vehicle)
                 input("Натисніть Enter для продовження...")
                 continue
 
@@ -395,19 +1016,39 @@ def main():
                            headers=["ID", "Транспорт", "Реєстр. номер", "Тип робіт", "Вартість", "Статус"]))
 
             order_id_input = input("\nВведіть перші 8 символів ID заявки для позначення як оплаченої: ").strip()
-            matching_orders = [o for o in unpaid_orders if o['id'].startswith(order_id_input)]
+            found, target_order = system.find_order_by_prefix(order_id_input)
+
+            if not found:
+                print(target_order)
+                input("Натисніть Enter для продовження...")
+                continue
 
-            if not matching_orders:
+            if target_order['status'] != 'Не оплачено':
                 print("Заявку не знайдено або вона вже оплачена.")
                 input("Натисніть Enter для продовження...")
                 continue
 
-            target_order = matching_orders[0]
             success, message = system.mark_order_paid(target_order['id'])
             print(message)
 
         elif choice == "6":
             print("\n=== Генерація рахунку ===")
+            mode = input("1 - Рахунок для однієї заявки\n2 - Рахунки для всіх неоплачених заявок за період\n"
+                         "Виберіть режим (1-2): ")
+            if mode == "2":
+                date_from = input("Дата від (РРРР-ММ-ДД, порожньо - без обмеження): ") or None
+                date_to = input("Дата до (РРРР-ММ-ДД, порожньо - без обмеження): ") or None
+                output = input("Файл архіву [invoices.zip]: ") or "invoices.zip"
+                success, result = system.generate_invoices(status="Не оплачено", date_from=date_from,
+                                                           date_to=date_to, output=output, archive=True)
+                if success:
+                    print(f"Згенеровано рахунків: {result['count']} за {result['seconds']:.2f} с "
+                          f"({result['per_second']:.0f} рахунків/с). Архів: {result['output']}")
+                else:
+                    print(result)
+                input("\nНатисніть Enter для продовження...")
+                continue
+
             orders = system.get_repair_orders()
             if not orders:
                 print("Немає заявок на ремонт.")
@@ -420,10 +1061,10 @@ def main():
                            headers=["ID", "Транспорт", "Реєстр. номер", "Тип робіт", "Вартість", "Статус"]))
 
             order_id = input("\nВведіть ID заявки для генерації рахунку: ")
-            target_order = next((o for o in orders if o['id'].startswith(order_id)), None)
+            found, target_order = system.find_order_by_prefix(order_id)
 
-            if not target_order:
-                print("Заявку не знайдено.")
+            if not found:
+                print(target_order)
                 input("Натисніть Enter для продовження...")
                 continue
 
@@ -441,9 +1082,7 @@ def main():
         elif choice == "7":
             print("\n=== Перегляд транспортних засобів ===")
 
-            vehicles = system.get_vehicles()
-
-            if not vehicles:
+            if not system.get_vehicles_page(limit=1)[0]:
                 print("Немає зареєстрованих транспортних засобів.")
                 input("Натисніть Enter для продовження...")
                 continue
@@ -459,17 +1098,16 @@ def main():
 
                 if view_choice == "1":
                     print("\n--- СПИСОК ВСІХ ТРАНСПОРТНИХ ЗАСОБІВ ---")
-                    print(tabulate([[v['id'][:8], v['brand'], v['model'], v['year'], v['reg_number'],
-                                     v['owner'], v['orders_count'], v['unpaid_orders'], f"{v['total_cost']:.2f} грн"]
-                                    for v in vehicles],
-                                   headers=["ID", "Марка", "Модель", "Рік", "Реєстр. номер",
-                                            "Власник", "Заявок", "Неоплачено", "Загальна вартість"]))
+                    browse(system.iter_vehicles(), VEHICLE_COLUMNS, PAGE_SIZE,
+                           "Немає зареєстрованих транспортних засобів.")
 
                 elif view_choice == "2":
                     print("\n--- ФІЛЬТРАЦІЯ ТРАНСПОРТНИХ ЗАСОБІВ ---")
                     print("Залиште поля порожніми, якщо не бажаєте застосовувати фільтр")
                     filter_brand = input("Фільтр за маркою: ") or None
                     filter_model = input("Фільтр за моделлю: ") or None
+                    filter_owner = input("Фільтр за власником: ") or None
+                    filter_reg = input("Фільтр за реєстраційним номером: ") or None
 
                     payment_options = "\n1 - Показати тільки оплачені\n2 - Показати тільки неоплачені\n0 - Показати всі"
                     filter_payment_choice = input(f"Фільтр за статусом оплати {payment_options}: ")
@@ -479,18 +1117,11 @@ def main():
                     elif filter_payment_choice == "2":
                         filter_payment = "Не оплачено"
 
-                    filtered_vehicles = system.get_vehicles(filter_brand, filter_model, filter_payment)
-
-                    if not filtered_vehicles:
-                        print("Немає транспортних засобів, що відповідають критеріям фільтрації.")
-                    else:
-                        print("\n--- РЕЗУЛЬТАТИ ФІЛЬТРАЦІЇ ---")
-                        print(tabulate([[v['id'][:8], v['brand'], v['model'], v['year'], v['reg_number'],
-                                         v['owner'], v['orders_count'], v['unpaid_orders'],
-                                         f"{v['total_cost']:.2f} грн"]
-                                        for v in filtered_vehicles],
-                                       headers=["ID", "Марка", "Модель", "Рік", "Реєстр. номер",
-                                                "Власник", "Заявок", "Неоплачено", "Загальна вартість"]))
+                    print("\n--- РЕЗУЛЬТАТИ ФІЛЬТРАЦІЇ ---")
+                    browse(system.iter_vehicles(filter_brand, filter_model, filter_payment, filter_owner=filter_owner,
+                                                filter_reg=filter_reg),
+                           VEHICLE_COLUMNS, PAGE_SIZE,
+                           "Немає транспортних засобів, що відповідають критеріям фільтрації.")
 
                 elif view_choice == "3":
                     print("\n--- СОРТУВАННЯ ТРАНСПОРТНИХ ЗАСОБІВ ---")
@@ -499,32 +1130,31 @@ def main():
                     sort_options += "\n5 - За неоплаченими заявками (більше спочатку)\n0 - Без сортування"
 
                     sort_choice = input(f"Виберіть тип сортування {sort_options}: ")
-                    sorted_vehicles = vehicles.copy()
+                    sort_by = None
 
                     if sort_choice == "1":
-                        sorted_vehicles.sort(key=lambda v: v["year"], reverse=True)
+                        sort_by = "year"
                         print("Застосовано сортування за роком випуску (новіші спочатку)")
                     elif sort_choice == "2":
-                        sorted_vehicles.sort(key=lambda v: v["owner"].lower())
+                        sort_by = "owner"
                         print("Застосовано сортування за власником (за алфавітом)")
                     elif sort_choice == "3":
-                        sorted_vehicles.sort(key=lambda v: v["total_cost"], reverse=True)
+                        sort_by = "total_cost"
                         print("Застосовано сортування за вартістю робіт (більші спочатку)")
                     elif sort_choice == "4":
-                        sorted_vehicles.sort(key=lambda v: v["orders_count"], reverse=True)
+                        sort_by = "orders_count"
                         print("Застосовано сортування за кількістю заявок (більше спочатку)")
                     elif sort_choice == "5":
-                        sorted_vehicles.sort(key=lambda v: v["unpaid_orders"], reverse=True)
+                        sort_by = "unpaid_orders"
                         print("Застосовано сортування за неоплаченими заявками (більше спочатку)")
                     else:
                         print("Сортування не застосовано")
 
                     print("\n--- РЕЗУЛЬТАТИ СОРТУВАННЯ ---")
-                    print(tabulate([[v['id'][:8], v['brand'], v['model'], v['year'], v['reg_number'],
-                                     v['owner'], v['orders_count'], v['unpaid_orders'], f"{v['total_cost']:.2f} грн"]
-                                    for v in sorted_vehicles],
-                                   headers=["ID", "Марка", "Модель", "Рік", "Реєстр. номер",
-                                            "Власник", "Заявок", "Неоплачено", "Загальна вартість"]))
+                    # Сторінки сортованого списку беруться пачками через курсор (top-k), а не повним сортуванням.
+                    browse(iter_pages(lambda cursor, limit: system.get_vehicles_page(sort_by=sort_by, limit=limit,
+                                                                                     cursor=cursor)),
+                           VEHICLE_COLUMNS, PAGE_SIZE, "Немає зареєстрованих транспортних засобів.")
 
                 elif view_choice == "4":
                     break
@@ -539,29 +1169,75 @@ def main():
 
             filter_vehicle = input("Фільтр за ID транспортного засобу (залиште порожнім для всіх): ") or None
             if filter_vehicle:
-                vehicles = system.get_vehicles()
-                target_vehicle = next((v for v in vehicles if v['id'].startswith(filter_vehicle)), None)
-                if target_vehicle:
+                found, target_vehicle = system.find_vehicle_by_prefix(filter_vehicle)
+                if found:
                     filter_vehicle = target_vehicle['id']
                 else:
-                    print("Транспортний засіб не знайдено.")
+                    print(target_vehicle)
                     input("Натисніть Enter для продовження...")
                     continue
 
-            orders = system.get_repair_orders(filter_vehicle)
-
-            if not orders:
-                print("Немає заявок на ремонт, що відповідають критеріям.")
-            else:
-                print(tabulate([[o['id'][:8], f"{o['brand']} {o['model']}", o['reg_number'], o['date_created'],
-                                 o['work_type'], o['estimated_cost'], o['status']]
-                                for o in orders],
-                               headers=["ID", "Транспорт", "Реєстр. номер", "Дата", "Тип робіт", "Вартість", "Статус"]))
+            include_archived = input("Показати також архівні заявки? (y/n): ").lower() == "y"
+            browse(system.iter_repair_orders(filter_vehicle, include_archived=include_archived), ORDER_COLUMNS,
+                   PAGE_SIZE, "Немає заявок на ремонт, що відповідають критеріям.")
 
         elif choice == "9":
             print("Дякуємо за використання Системи управління СТО.")
+            system.close()
+            session.close()
+            if profile_report is not None:
+                print_profile(profile_report)
             break
 
+        elif choice == "10":
+            print("\n=== Звіти та аналітика ===")
+            report = input("1 - Виручка за період\n2 - Дебіторська заборгованість за віком\n"
+                           "3 - Підсумки за типами робіт\n4 - Підсумки за марками\nВиберіть звіт (1-4): ")
+            if report == "1":
+                period, period_name = REVENUE_PERIODS.get(
+                    input("Групувати: 1 - за днями, 2 - за тижнями, 3 - за місяцями [3]: "), REVENUE_PERIODS["3"])
+                date_from = input("Дата від (РРРР-ММ-ДД, порожньо - без обмеження): ") or None
+                date_to = input("Дата до (РРРР-ММ-ДД, порожньо - без обмеження): ") or None
+                rows = system.get_revenue(period, date_from, date_to)
+                print(f"\n--- ВИРУЧКА ЗА {period_name.upper()} ---")
+                print(tabulate([[r['period'], r['orders'], r['total'], r['paid'], r['unpaid']] for r in rows],
+                               headers=["Період", "Заявок", "Сума, грн", "Оплачено, грн", "Не оплачено, грн"],
+                               floatfmt=".2f"))
+            elif report == "2":
+                rows = system.get_receivables_ageing()
+                print("\n--- НЕОПЛАЧЕНІ ЗАЯВКИ ЗА ВІКОМ ---")
+                print(tabulate([[r['bucket'], r['orders'], r['amount'], r['oldest_days']] for r in rows],
+                               headers=["Вік, днів", "Заявок", "Сума, грн", "Найстаріша, днів"], floatfmt=".2f"))
+            elif report in ("3", "4"):
+                field, title = ("work_type", "Тип робіт") if report == "3" else ("brand", "Марка")
+                rows = system.get_totals_by_work_type() if report == "3" else system.get_totals_by_brand()
+                print(f"\n--- ПІДСУМКИ ЗА {'ТИПАМИ РОБІТ' if report == '3' else 'МАРКАМИ'} ---")
+                print(tabulate([[r[field], r['orders'], r['total'], r['paid'], r['unpaid']] for r in rows],
+                               headers=[title, "Заявок", "Сума, грн", "Оплачено, грн", "Не оплачено, грн"],
+                               floatfmt=".2f"))
+            else:
+                print("Невірний вибір. Спробуйте ще раз.")
+
+        elif choice.strip().lower() == "archive":
+            # Прихований пункт меню для обслуговування: перенесення старих оплачених заявок в архів.
+            print("\n=== Архівування оплачених заявок ===")
+            days = input(f"Архівувати оплачені заявки, старші за (днів) [{ARCHIVE_AGE_DAYS}]: ")
+            try:
+                days = int(days) if days else ARCHIVE_AGE_DAYS
+                success, result = system.archive_paid_orders(days)
+                if success:
+                    print(f"Заархівовано заявок: {result['archived']} за {result['seconds']:.2f} с. "
+                          f"Архів: {result['output']}")
+                else:
+                    print(result)
+            except ValueError:
+                print("Помилка: кількість днів має бути числом.")
+
+        elif choice.strip().lower() == "stats":
+            # Прихований пункт меню для діагностики швидкодії.
+            print("\n=== Статистика роботи системи ===")
+            print_stats(system.get_stats())
+
         else:
             print("Невірний вибір. Спробуйте ще раз.")
 
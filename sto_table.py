@@ -0,0 +1,164 @@
+import itertools
+
+
+WIDTH_SAMPLE = 200
+MAX_COLUMN_WIDTH = 40
+NAVIGATION_HELP = {"n": "n - наступна сторінка", "p": "p - попередня", "q": "q - вийти"}
+
+
+class Column:
+    # value(row) повертає текст комірки. width — фіксована ширина; без неї ширина
+    # визначається за вибіркою перших рядків, але не більше за max_width.
+    def __init__(self, header, value, width=None, align="left", max_width=MAX_COLUMN_WIDTH):
+        self.header = header
+        self.value = value
+        self.width = width
+        self.align = align
+        self.max_width = max_width
+
+
+class TableRenderer:
+    # На відміну від tabulate, не вимірює всі рядки перед друком: ширини стовпців задані
+    # наперед або взяті з вибірки, а довший текст обрізається, тож рядки можна друкувати
+    # по мірі надходження.
+    def __init__(self, columns, sample_size=WIDTH_SAMPLE):
+        self.columns = columns
+        self.sample_size = sample_size
+        self.widths = None
+
+    def cells(self, row):
+        return [str(column.value(row)) for column in self.columns]
+
+    def fit(self, sample):
+        # sample — список рядків, уже перетворених на комірки через cells().
+        self.widths = []
+        for index, column in enumerate(self.columns):
+            if column.width:
+                self.widths.append(column.width)
+                continue
+            width = max(itertools.chain([len(column.header)], (len(cells[index]) for cells in sample)))
+            self.widths.append(max(len(column.header), min(width, column.max_width)))
+
+    def header(self):
+        return [self._line([column.header for column in self.columns]),
+                "  ".join("-" * width for width in self.widths)]
+
+    def format(self, cells):
+        return self._line(cells)
+
+    def _line(self, cells):
+        parts = []
+        for cell, width, column in zip(cells, self.widths, self.columns):
+            if len(cell) > width:
+                cell = cell[:width - 1] + "…"
+            parts.append(cell.rjust(width) if column.align == "right" else cell.ljust(width))
+        return "  ".join(parts).rstrip()
+
+    def render(self, rows):
+        # Потоковий друк: рядки вибірки буферизуються для підбору ширини, решта
+        # форматуються по одному.
+        rows = iter(rows)
+        sample = [self.cells(row) for row in itertools.islice(rows, self.sample_size)]
+        if self.widths is None:
+            self.fit(sample)
+        yield from self.header()
+        for cells in sample:
+            yield self.format(cells)
+        for row in rows:
+            yield self.format(self.cells(row))
+
+
+class Pager:
+    # Рядки тягнуться з ітератора лише тоді, коли перегляд доходить до їхньої сторінки
+    # (плюс вибірка для ширини стовпців); вже отримані рядки лишаються в пам'яті для
+    # повернення на попередні сторінки.
+    def __init__(self, rows, renderer, page_size=20):
+        self.renderer = renderer
+        self.page_size = page_size
+        self.exhausted = False
+        self._rows = iter(rows)
+        self._fetched = []
+
+    def _fetch(self, count):
+        missing = count - len(self._fetched)
+        if missing <= 0 or self.exhausted:
+            return
+        fetched = [self.renderer.cells(row) for row in itertools.islice(self._rows, missing)]
+        self._fetched.extend(fetched)
+        if len(fetched) < missing:
+            self.exhausted = True
+            self.close()
+
+    def page(self, index):
+        # Повертає рядки сторінки (вже як текст) або None, якщо такої сторінки немає.
+        if self.renderer.widths is None:
+            self._fetch(max(self.page_size, self.renderer.sample_size))
+            self.renderer.fit(self._fetched)
+        start = index * self.page_size
+        # Зайвий рядок показує, чи є наступна сторінка.
+        self._fetch(start + self.page_size + 1)
+        if index < 0 or (start >= len(self._fetched) and index > 0):
+            return None
+        return [self.renderer.format(cells) for cells in self._fetched[start:start + self.page_size]]
+
+    def has_page(self, index):
+        self._fetch(index * self.page_size + 1)
+        return 0 <= index * self.page_size < len(self._fetched)
+
+    def page_count(self):
+        # Відома лише тоді, коли ітератор вичерпано.
+        if not self.exhausted:
+            return None
+        return max(1, -(-len(self._fetched) // self.page_size))
+
+    def close(self):
+        # Генератор сховища (наприклад, курсор SQLite) закривається одразу, щойно перегляд завершено.
+        close = getattr(self._rows, "close", None)
+        if close is not None:
+            close()
+
+
+def iter_pages(fetch, chunk_size=500):
+    # Потік рядків із посторінкового запиту fetch(cursor, limit) -> (рядки, наступний курсор);
+    # наступна пачка запитується лише тоді, коли попередню вже прочитано.
+    cursor = None
+    while True:
+        rows, cursor = fetch(cursor, chunk_size)
+        yield from rows
+        if not cursor:
+            return
+
+
+def browse(rows, columns, page_size=20, empty_message="Немає даних.", prompt=input, output=print):
+    # Посторінковий перегляд у терміналі з переходом уперед і назад.
+    pager = Pager(rows, TableRenderer(columns), page_size)
+    index = 0
+    try:
+        while True:
+            lines = pager.page(index)
+            if not lines and index == 0:
+                output(empty_message)
+                return
+            for line in pager.renderer.header() + lines:
+                output(line)
+
+            has_next = pager.has_page(index + 1)
+            pages = pager.page_count()
+            first = index * page_size + 1
+            output(f"\nСторінка {index + 1}{f' з {pages}' if pages else ''}, "
+                   f"рядки {first}–{first + len(lines) - 1}")
+            if not has_next and index == 0:
+                return
+
+            options = [NAVIGATION_HELP[key] for key, available in (("n", has_next), ("p", index > 0), ("q", True))
+                       if available]
+            choice = prompt(f"{', '.join(options)}: ").strip().lower()
+            if choice in ("", "n") and has_next:
+                index += 1
+            elif choice == "p" and index > 0:
+                index -= 1
+            elif choice in ("", "q"):
+                break
+            output("")
+    finally:
+        pager.close()
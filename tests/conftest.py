@@ -0,0 +1,24 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sto_system import STOManagementSystem  # noqa: E402
+
+
+@pytest.fixture(params=["sto.json", "sto.db"])
+def system(request, tmp_path):
+    system = STOManagementSystem(str(tmp_path / request.param))
+    yield system
+    system.close()
+
+
+def register(system, reg_number, owner="Іван"):
+    assert system.register_vehicle("Toyota", "Corolla", 2015, reg_number, owner)[0]
+    return system.storage.vehicle_id_by_reg(reg_number)
+
+
+def add_order(system, vehicle_id, cost=100.0, order_id=None, work_type="Діагностика"):
+    assert system.add_repair_order(vehicle_id, work_type, "", "", cost, order_id)[0]
@@ -0,0 +1,49 @@
+import uuid
+
+import pytest
+
+from conftest import register, add_order
+
+
+def stats(system, vehicle_id):
+    row = next(row for row in system.get_vehicles() if row["id"] == vehicle_id)
+    return row["orders_count"], row["unpaid_orders"], row["total_cost"]
+
+
+def test_aggregates_follow_orders(system):
+    vehicle_id = register(system, "R1")
+    assert stats(system, vehicle_id) == (0, 0, 0)
+    order_id = str(uuid.uuid4())
+    add_order(system, vehicle_id, 100.0, order_id)
+    add_order(system, vehicle_id, 250.5)
+    assert stats(system, vehicle_id) == (2, 2, pytest.approx(350.5))
+
+    assert system.mark_order_paid(order_id)[0]
+    assert stats(system, vehicle_id) == (2, 1, pytest.approx(350.5))
+    assert system.check_consistency()
+
+
+def test_payment_filter_uses_aggregates(system):
+    paid_id = register(system, "R1")
+    unpaid_id = register(system, "R2")
+    order_id = str(uuid.uuid4())
+    add_order(system, paid_id, 100.0, order_id)
+    assert system.mark_order_paid(order_id)[0]
+    add_order(system, unpaid_id, 100.0)
+
+    assert [row["id"] for row in system.get_vehicles(filter_payment="Не оплачено")] == [unpaid_id]
+    assert [row["id"] for row in system.get_vehicles(filter_payment="Оплачено")] == [paid_id]
+
+
+def test_rollback_restores_aggregates(system):
+    vehicle_id = register(system, "R1")
+    order_id = str(uuid.uuid4())
+    add_order(system, vehicle_id, 100.0, order_id)
+    with pytest.raises(RuntimeError):
+        with system.transaction():
+            system._create_repair_order(vehicle_id, "Заміна масла", "", "", 40.0)
+            system._set("repair_orders", order_id, dict(system.storage.get_order(order_id), status="Оплачено"))
+            raise RuntimeError("скасування")
+
+    assert stats(system, vehicle_id) == (1, 1, pytest.approx(100.0))
+    assert system.check_consistency()
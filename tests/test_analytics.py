@@ -0,0 +1,113 @@
+import random
+import datetime
+
+import pytest
+
+pytest.importorskip("numpy")
+
+BRANDS = ["Toyota", "Honda", "Skoda"]
+WORK_TYPES = ["Діагностика", "Заміна масла", "Ремонт ходової", "Шиномонтаж"]
+START = datetime.datetime(2023, 11, 20)
+
+
+@pytest.fixture
+def orders(system):
+    rng = random.Random(7)
+    vehicle_ids = []
+    for index, brand in enumerate(BRANDS):
+        assert system.register_vehicle(brand, "Model", 2015, f"R{index}", "Іван")[0]
+        vehicle_ids.append((system.storage.vehicle_id_by_reg(f"R{index}"), brand))
+    with system.transaction():
+        for _ in range(300):
+            vehicle_id, _ = rng.choice(vehicle_ids)
+            created = START + datetime.timedelta(seconds=rng.randrange(200 * 86400))
+            system._create_repair_order(vehicle_id, rng.choice(WORK_TYPES), "", "", round(rng.uniform(10, 900), 2),
+                                        date_created=created.strftime("%Y-%m-%d %H:%M:%S"),
+                                        status=rng.choice(["Оплачено", "Не оплачено"]))
+    brands = dict(vehicle_ids)
+    return system, [dict(order, brand=brands[order["vehicle_id"]]) for order in system.get_repair_orders()]
+
+
+def summarize(groups):
+    return {key: (len(rows), pytest.approx(sum(o["estimated_cost"] for o in rows)),
+                  pytest.approx(sum(o["estimated_cost"] for o in rows if o["status"] == "Не оплачено")))
+            for key, rows in groups.items()}
+
+
+def group(rows, key):
+    groups = {}
+    for row in rows:
+        groups.setdefault(key(row), []).append(row)
+    return groups
+
+
+def week_start(order):
+    day = datetime.date.fromisoformat(order["date_created"][:10])
+    return (day - datetime.timedelta(days=day.weekday())).isoformat()
+
+
+@pytest.mark.parametrize("period, key", [
+    ("day", lambda order: order["date_created"][:10]),
+    ("week", week_start),
+    ("month", lambda order: order["date_created"][:7]),
+])
+def test_revenue_matches_reference(orders, period, key):
+    system, rows = orders
+    result = system.get_revenue(period)
+    assert [row["period"] for row in result] == sorted(row["period"] for row in result)
+    assert {row["period"]: (row["orders"], row["total"], row["unpaid"]) for row in result} == \
+        summarize(group(rows, key))
+    for row in result:
+        assert row["paid"] == pytest.approx(row["total"] - row["unpaid"])
+
+
+def test_revenue_date_range(orders):
+    system, rows = orders
+    inside = [row for row in rows if "2024-01-01" <= row["date_created"][:10] <= "2024-01-31"]
+    result = system.get_revenue("month", "2024-01-01", "2024-01-31")
+    assert {row["period"]: (row["orders"], row["total"], row["unpaid"]) for row in result} == \
+        summarize({"2024-01": inside})
+
+
+def test_receivables_ageing_matches_reference(orders):
+    system, rows = orders
+    now = datetime.datetime(2024, 5, 1, 23, 59, 59)
+    buckets = {}
+    for row in rows:
+        if row["status"] != "Не оплачено":
+            continue
+        age = (now - datetime.datetime.fromisoformat(row["date_created"])).days
+        label = "0–30" if age <= 30 else "31–60" if age <= 60 else "61–90" if age <= 90 else "понад 90"
+        orders_count, amount, oldest = buckets.get(label, (0, 0.0, 0))
+        buckets[label] = (orders_count + 1, amount + row["estimated_cost"], max(oldest, age))
+
+    result = system.get_receivables_ageing("2024-05-01")
+    assert [row["bucket"] for row in result] == ["0–30", "31–60", "61–90", "понад 90"]
+    for row in result:
+        orders_count, amount, oldest = buckets.get(row["bucket"], (0, 0.0, 0))
+        assert (row["orders"], row["amount"], row["oldest_days"]) == (orders_count, pytest.approx(amount), oldest)
+
+
+@pytest.mark.parametrize("field", ["work_type", "brand"])
+def test_totals_match_reference(orders, field):
+    system, rows = orders
+    result = system.get_totals_by_work_type() if field == "work_type" else system.get_totals_by_brand()
+    assert {row[field]: (row["orders"], row["total"], row["unpaid"]) for row in result} == \
+        summarize(group(rows, lambda order: order[field]))
+    totals = [row["total"] for row in result]
+    assert totals == sorted(totals, reverse=True)
+
+
+def test_reports_follow_data_changes(orders):
+    system, _ = orders
+    before = sum(row["orders"] for row in system.get_totals_by_brand())
+    vehicle_id = system.storage.vehicle_id_by_reg("R0")
+    assert system.add_repair_order(vehicle_id, "Діагностика", "", "", 100.0)[0]
+    assert sum(row["orders"] for row in system.get_totals_by_brand()) == before + 1
+
+
+def test_unknown_period_is_reported(orders):
+    system, _ = orders
+    assert system.get_revenue("year") == []
+    assert system.get_revenue("month", "не дата") == []
+
@@ -0,0 +1,111 @@
+import csv
+import json
+
+from conftest import register
+
+
+def read_report(path):
+    with open(path, encoding="utf-8", newline="") as file:
+        return [(int(row["row"]), row["error"]) for row in csv.DictReader(file)]
+
+
+def write_csv(path, fields, rows):
+    with open(path, "w", encoding="utf-8", newline="") as file:
+        writer = csv.writer(file)
+        writer.writerow(fields)
+        writer.writerows(rows)
+
+
+def test_invalid_rows_are_reported_with_file_row_numbers(system, tmp_path):
+    register(system, "AA0001AA")
+    source = tmp_path / "vehicles.csv"
+    write_csv(source, ["brand", "model", "year", "reg_number", "owner"], [
+        ["Toyota", "Corolla", "2015", "BB0001BB", "Іван"],
+        ["Honda", "Civic", "рік", "BB0002BB", "Петро"],
+        ["Skoda", "Octavia", "2018", "AA0001AA", "Олена"],
+        ["Skoda", "Fabia", "2019", "", "Олена"],
+        ["Skoda", "Superb", "2020", "BB0001BB", "Олена"],
+        ["Kia", "Rio", "2021", "BB0003BB", "Марія"],
+    ])
+
+    success, result = system.import_vehicles(str(source), chunk_size=2)
+    assert success, result
+    assert (result["imported"], result["rejected"]) == (2, 4)
+    assert result["errors"] == f"{source}.errors.csv"
+    assert [row for row, _ in read_report(result["errors"])] == [2, 3, 4, 5]
+    assert system.storage.vehicle_id_by_reg("BB0003BB") is not None
+    assert system.storage.vehicle_id_by_reg("BB0002BB") is None
+
+
+def test_clean_import_writes_no_report(system, tmp_path):
+    source = tmp_path / "vehicles.jsonl"
+    source.write_text(json.dumps({"brand": "Kia", "model": "Rio", "year": 2021, "reg_number": "CC0001CC",
+                                  "owner": "Марія"}, ensure_ascii=False) + "\n", encoding="utf-8")
+    report = tmp_path / "report.csv"
+    success, result = system.import_vehicles(str(source), error_report=str(report))
+    assert success, result
+    assert (result["imported"], result["rejected"], result["errors"]) == (1, 0, None)
+    assert not report.exists()
+
+
+def test_truncated_jsonl_tail_is_rejected(system, tmp_path):
+    vehicle_id = register(system, "AA0001AA")
+    lines = [json.dumps({"vehicle_id": vehicle_id, "work_type": "Діагностика", "estimated_cost": 100 + i})
+             for i in range(3)]
+    source = tmp_path / "orders.jsonl"
+    # Файл обірвано посеред останнього запису, а між записами є порожній рядок і не-об'єкт.
+    source.write_text(lines[0] + "\n\n[1, 2]\n" + lines[1] + "\n" + lines[2][:20], encoding="utf-8")
+
+    success, result = system.import_repair_orders(str(source))
+    assert success, result
+    assert (result["imported"], result["rejected"]) == (2, 2)
+    report = read_report(result["errors"])
+    assert [row for row, _ in report] == [3, 5]
+    assert report[1][1].startswith("Некоректний JSON")
+    assert sorted(order["estimated_cost"] for order in system.get_repair_orders()) == [100, 101]
+
+
+def test_failed_chunk_keeps_earlier_chunks(system, tmp_path, monkeypatch):
+    source = tmp_path / "vehicles.csv"
+    write_csv(source, ["brand", "model", "year", "reg_number", "owner"],
+              [["Toyota", "Corolla", "2015", f"DD{i:04d}DD", "Іван"] for i in range(5)])
+    create = system._create_vehicle
+
+    def failing_create(*values):
+        if values[3] == "DD0003DD":
+            raise OSError("диск заповнено")
+        return create(*values)
+
+    monkeypatch.setattr(system, "_create_vehicle", failing_create)
+    success, message = system.import_vehicles(str(source), chunk_size=2)
+    assert not success
+    assert "диск заповнено" in message and "Імпортовано рядків до збою: 2." in message
+    # Перший пакет збережено, пакет зі збоєм відкочено повністю, решту не читали.
+    assert [system.storage.vehicle_id_by_reg(f"DD{i:04d}DD") is not None for i in range(5)] == \
+        [True, True, False, False, False]
+
+
+def test_import_of_missing_file_fails(system, tmp_path):
+    success, message = system.import_vehicles(str(tmp_path / "missing.csv"))
+    assert not success
+    assert message.startswith("Помилка при імпорті транспортних засобів")
+    assert not (tmp_path / "missing.csv.errors.csv").exists()
+
+
+def test_unknown_format_fails(system, tmp_path):
+    source = tmp_path / "vehicles.txt"
+    source.write_text("", encoding="utf-8")
+    assert not system.import_vehicles(str(source))[0]
+    assert system.import_vehicles(str(source), file_format="jsonl")[0]
+
+
+def test_export_then_import_round_trip(system, tmp_path):
+    vehicle_id = register(system, "AA0001AA")
+    assert system.add_repair_order(vehicle_id, "Діагностика", "", "", 150.0)[0]
+    for suffix in ("csv", "jsonl"):
+        vehicles, orders = tmp_path / f"v.{suffix}", tmp_path / f"o.{suffix}"
+        assert system.export_vehicles(str(vehicles))[1]["count"] == 1
+        assert system.export_repair_orders(str(orders))[1]["count"] == 1
+        # Ті самі ID та номери вже існують, тож повторний імпорт повністю відхиляється.
+        assert system.import_vehicles(str(vehicles))[1]["rejected"] == 1
+        assert system.import_repair_orders(str(orders))[1]["rejected"] == 1
@@ -0,0 +1,19 @@
+import pytest
+
+from sto_system import STOManagementSystem
+
+
+@pytest.mark.parametrize("data_file", ["sto.db", "sto.json"])
+def test_cached_rows_are_read_only(tmp_path, data_file):
+    system = STOManagementSystem(str(tmp_path / data_file))
+    try:
+        assert system.register_vehicle("Toyota", "Corolla", 2015, "R1", "Іван")[0]
+        vehicle = system.get_vehicles()[0]
+        with pytest.raises(TypeError):
+            vehicle["owner"] = "Хтось інший"
+        copy = dict(vehicle)
+        copy["owner"] = "Хтось інший"
+        assert system.get_vehicles()[0]["owner"] == "Іван"
+        assert system.get_vehicles_page()[0][0]["owner"] == "Іван"
+    finally:
+        system.close()
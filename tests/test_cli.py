@@ -0,0 +1,40 @@
+import json
+
+import pytest
+
+import sto_cli
+from sto_storage import ConflictError, JSONStorage
+
+
+@pytest.mark.parametrize("argv", [["--json", "list-vehicles"], ["list-vehicles", "--json"]])
+def test_json_flag_before_or_after_command(tmp_path, capsys, argv):
+    assert sto_cli.main(["--data", str(tmp_path / "sto.json")] + argv) == 0
+    assert json.loads(capsys.readouterr().out) == {"ok": True, "items": [], "command": "list-vehicles"}
+
+
+def test_json_flag_per_batch_line(tmp_path, capsys):
+    batch = tmp_path / "batch.txt"
+    batch.write_text("register Toyota Corolla 2015 R1 Іван --json\nlist-vehicles\n", encoding="utf-8")
+    assert sto_cli.main(["--data", str(tmp_path / "sto.json"), "--batch", str(batch)]) == 0
+    first, *rest = capsys.readouterr().out.splitlines()
+    assert json.loads(first)["command"] == "register"
+    assert any("R1" in line for line in rest)
+
+
+@pytest.mark.parametrize("error", [ConflictError("дані змінено іншим процесом"), OSError("диск заповнено")])
+def test_batch_commit_failure_is_reported(tmp_path, capsys, monkeypatch, error):
+    data = str(tmp_path / "sto.json")
+    batch = tmp_path / "batch.txt"
+    batch.write_text("register Toyota Corolla 2015 R1 Іван\n", encoding="utf-8")
+
+    def failing_commit(self):
+        self.rollback()
+        raise error
+
+    monkeypatch.setattr(JSONStorage, "commit", failing_commit)
+    assert sto_cli.main(["--data", data, "--batch", str(batch)]) == 1
+    assert f"({str(error)}), зміни не збережено." in capsys.readouterr().err
+
+    monkeypatch.undo()
+    assert sto_cli.main(["--data", data, "list-vehicles", "--json"]) == 0
+    assert json.loads(capsys.readouterr().out)["items"] == []
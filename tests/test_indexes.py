@@ -0,0 +1,87 @@
+import pytest
+
+from conftest import register
+from sto_storage import JSONStorage
+
+
+def vehicle(vehicle_id, brand="Toyota", reg_number="AA1234BB"):
+    return {"id": vehicle_id, "brand": brand, "model": "Corolla", "year": 2015, "reg_number": reg_number,
+            "owner": "Іван", "registration_date": "2024-01-01 10:00:00"}
+
+
+VEHICLE_ID = "abcdef12-0000-4000-8000-000000000001"
+
+
+@pytest.mark.parametrize("build_text_first", [False, True])
+def test_failed_apply_leaves_no_phantom_keys(tmp_path, build_text_first):
+    storage = JSONStorage(str(tmp_path / "sto.json"))
+    storage.load()
+    if build_text_first:
+        assert list(storage.iter_vehicles(filter_brand="toy")) == []
+    storage.begin()
+    with pytest.raises(TypeError):
+        storage.set_record("vehicles", VEHICLE_ID, vehicle(VEHICLE_ID, brand=5))
+    storage.rollback()
+    storage.commit()
+
+    assert storage.find_ids_by_prefix("vehicles", "abcdef") == []
+    assert storage.vehicle_id_by_reg("AA1234BB") is None
+    assert storage.check_consistency()
+
+
+def test_failed_text_index_build_is_not_kept(tmp_path, monkeypatch):
+    storage = JSONStorage(str(tmp_path / "sto.json"))
+    storage.load()
+    storage.set_record("vehicles", VEHICLE_ID, vehicle(VEHICLE_ID))
+
+    def broken_add(self, key, text):
+        raise MemoryError
+
+    monkeypatch.setattr("sto_index.NgramIndex.add", broken_add)
+    with pytest.raises(MemoryError):
+        storage._build_text_indexes()
+    assert storage._text_indexes is None
+    monkeypatch.undo()
+    assert [row["reg_number"] for row in storage.iter_vehicles(filter_brand="toy")] == ["AA1234BB"]
+
+
+def test_reg_index_follows_edit_and_delete(system):
+    vehicle_id = register(system, "R1")
+    assert system.edit_vehicle(vehicle_id, reg_number="R2")[0]
+    assert system.storage.vehicle_id_by_reg("R1") is None
+    assert system.storage.vehicle_id_by_reg("R2") == vehicle_id
+    # Звільнений номер знову можна зареєструвати.
+    other_id = register(system, "R1")
+    assert not system.edit_vehicle(other_id, reg_number="R2")[0]
+
+    assert system.delete_vehicle(vehicle_id)[0]
+    assert system.storage.vehicle_id_by_reg("R2") is None
+    assert system.check_consistency()
+
+
+def test_vehicle_orders_index(system):
+    first_id = register(system, "R1")
+    second_id = register(system, "R2")
+    assert system.add_repair_order(first_id, "Діагностика", "", "", 100.0)[0]
+    assert system.storage.has_orders(first_id)
+    assert not system.storage.has_orders(second_id)
+    assert [order["vehicle_id"] for order in system.get_repair_orders(first_id)] == [first_id]
+    assert system.get_repair_orders(second_id) == []
+    assert not system.delete_vehicle(first_id)[0]
+    assert system.check_consistency()
+
+
+def test_rollback_restores_indexes(system):
+    vehicle_id = register(system, "R1")
+    with pytest.raises(RuntimeError):
+        with system.transaction():
+            system._set("vehicles", vehicle_id, dict(system.storage.get_vehicle(vehicle_id), reg_number="R2"))
+            system._create_vehicle("Honda", "Civic", 2017, "R3", "Олена")
+            system._create_repair_order(vehicle_id, "Діагностика", "", "", 100.0)
+            raise RuntimeError("скасування")
+
+    assert system.storage.vehicle_id_by_reg("R1") == vehicle_id
+    assert system.storage.vehicle_id_by_reg("R2") is None
+    assert system.storage.vehicle_id_by_reg("R3") is None
+    assert not system.storage.has_orders(vehicle_id)
+    assert system.check_consistency()
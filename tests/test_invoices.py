@@ -0,0 +1,81 @@
+import zipfile
+
+import pytest
+
+from conftest import add_order, register
+from sto_invoices import invoice_values, write_invoices
+
+
+ORDER_IDS = ["abcdef12-0000-4000-8000-000000000001", "abcdef12-0000-4000-8000-000000000002"]
+
+
+def rows():
+    vehicle = {"owner": "Іван", "brand": "Toyota", "model": "Corolla", "reg_number": "AA1234BB"}
+    for index, order_id in enumerate(ORDER_IDS):
+        order = {"date_created": "2024-01-01 10:00:00", "work_type": f"Робота {index}", "parts": "",
+                 "resources": "", "estimated_cost": 100.0 + index, "status": "Не оплачено"}
+        yield invoice_values(order_id, order, vehicle)
+
+
+def test_directory_names_are_unique(tmp_path):
+    result = write_invoices(rows(), str(tmp_path / "out"), workers=1)
+    assert result["count"] == 2
+    names = sorted(path.name for path in (tmp_path / "out").iterdir())
+    assert names == [f"invoice_{order_id}.txt" for order_id in ORDER_IDS]
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_archive_names_are_unique(tmp_path, workers):
+    output = str(tmp_path / "invoices.zip")
+    write_invoices(rows(), output, archive=True, workers=workers)
+    with zipfile.ZipFile(output) as archive:
+        names = archive.namelist()
+        assert sorted(names) == [f"invoice_{order_id}.txt" for order_id in ORDER_IDS]
+        assert "Робота 1" in archive.read(f"invoice_{ORDER_IDS[1]}.txt").decode("utf-8")
+
+
+def old_paid_order(system, vehicle_id, work_type):
+    with system.transaction():
+        system._create_repair_order(vehicle_id, work_type, "", "", 250.0, date_created="2020-01-15 10:00:00",
+                                    status="Оплачено")
+    return next(order["id"] for order in system.get_repair_orders() if order["work_type"] == work_type)
+
+
+def test_explicit_ids_include_archived_orders(system, tmp_path):
+    vehicle_id = register(system, "AA0001AA")
+    archived_id = old_paid_order(system, vehicle_id, "Архівна робота")
+    add_order(system, vehicle_id, work_type="Поточна робота")
+    active_id = next(order["id"] for order in system.get_repair_orders() if order["id"] != archived_id)
+    assert system.archive_paid_orders()[0]
+    assert system.storage.get_order(archived_id) is None
+
+    output = tmp_path / "out"
+    success, result = system.generate_invoices([archived_id, active_id, "немає-такої"], output=str(output),
+                                               workers=1)
+    assert success, result
+    assert result["count"] == 2
+    text = (output / f"invoice_{archived_id}.txt").read_text(encoding="utf-8")
+    assert "Архівна робота" in text and "AA0001AA" in text
+    assert system.generate_invoice(archived_id)[1] == text
+
+
+@pytest.mark.parametrize("dates", [{"date_from": "15.01.2024"}, {"date_to": "2024-13-01"},
+                                   {"date_to": "завтра"}])
+def test_invalid_dates_are_rejected(system, tmp_path, dates):
+    output = tmp_path / "out"
+    success, message = system.generate_invoices(output=str(output), workers=1, **dates)
+    assert not success
+    assert "Некоректна дата" in message
+    assert not output.exists()
+
+
+def test_date_range_filter(system, tmp_path):
+    vehicle_id = register(system, "AA0001AA")
+    with system.transaction():
+        for day in ("2024-01-10", "2024-01-20", "2024-02-01"):
+            system._create_repair_order(vehicle_id, f"Робота {day}", "", "", 100.0,
+                                        date_created=f"{day} 12:00:00")
+    success, result = system.generate_invoices(date_from="2024-1-10", date_to="2024-01-31",
+                                               output=str(tmp_path / "out"), workers=1)
+    assert success, result
+    assert result["count"] == 2
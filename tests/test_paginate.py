@@ -0,0 +1,65 @@
+import json
+
+import pytest
+
+from sto_system import STOManagementSystem, ORDER_SORT_KEYS
+
+
+ROWS = [{"id": f"id{i:02d}", "date_created": f"2024-01-{i + 1:02d} 10:00:00", "estimated_cost": float(i)}
+        for i in range(10)]
+
+
+def paginate(sort_by=None, limit=None, cursor=None):
+    page, next_cursor = STOManagementSystem._paginate(iter(ROWS), ORDER_SORT_KEYS, sort_by, limit, cursor)
+    return list(page), next_cursor
+
+
+def collect(sort_by, limit):
+    rows, cursor = paginate(sort_by, limit)
+    while cursor:
+        page, cursor = paginate(sort_by, limit, cursor)
+        rows.extend(page)
+    return rows
+
+
+@pytest.mark.parametrize("sort_by", [None, "estimated_cost"])
+def test_pages_cover_all_rows(sort_by):
+    rows = collect(sort_by, 3)
+    assert sorted(row["id"] for row in rows) == [row["id"] for row in ROWS]
+    assert len(rows) == len(ROWS)
+
+
+@pytest.mark.parametrize("sort_by", [None, "estimated_cost"])
+@pytest.mark.parametrize("limit", [0, -1, True, 2.5])
+def test_rejects_bad_limit(sort_by, limit):
+    with pytest.raises(ValueError):
+        paginate(sort_by, limit)
+
+
+@pytest.mark.parametrize("sort_by, cursor", [
+    (None, "не json"),
+    (None, "[1]"),
+    (None, json.dumps({"offset": -1})),
+    (None, json.dumps({"offset": "3"})),
+    (None, json.dumps({"sort_by": "estimated_cost", "after": [1.0, "id01"]})),
+    ("estimated_cost", json.dumps({"offset": 3})),
+    ("estimated_cost", json.dumps({"sort_by": "date_created", "after": ["x", "id01"]})),
+    ("estimated_cost", json.dumps({"sort_by": "estimated_cost", "after": 1})),
+    ("estimated_cost", json.dumps({"sort_by": "estimated_cost", "after": ["x", "id01"]})),
+    ("estimated_cost", json.dumps({"sort_by": "estimated_cost", "after": [1.0]})),
+    ("date_created", json.dumps({"sort_by": "date_created", "after": ["2024-01-02 10:00:00", 7]})),
+])
+def test_rejects_malformed_cursor(sort_by, cursor):
+    with pytest.raises(ValueError):
+        paginate(sort_by, 3, cursor)
+
+
+@pytest.mark.parametrize("sort_by", ["estimated_cost", "date_created"])
+def test_accepts_own_cursor(sort_by):
+    page, cursor = paginate(sort_by, 3)
+    assert len(list(paginate(sort_by, 3, cursor)[0])) == 3
+
+
+def test_rejects_unknown_sort():
+    with pytest.raises(ValueError):
+        paginate("colour", 3)
@@ -0,0 +1,63 @@
+import pytest
+
+from conftest import add_order
+from sto_index import PrefixIndex, uuid_prefix_range
+from sto_records import parse_id
+
+
+IDS = ["abcdef12-0000-4000-8000-000000000001", "abcdef12-0000-4000-8000-000000000002",
+       "abcdef99-0000-4000-8000-000000000003", "12345678-0000-4000-8000-000000000004"]
+
+
+def index(ids=IDS):
+    return PrefixIndex(parse_id(value) for value in ids)
+
+
+@pytest.mark.parametrize("prefix, expected", [
+    ("abcdef12", IDS[:2]),
+    ("ABCDEF99", IDS[2:3]),
+    ("abcdef12-0000-4000-8000-000000000002", IDS[1:2]),
+    ("1234", IDS[3:]),
+    ("", [IDS[3], IDS[0]]),
+    ("ffff", []),
+    ("xyz", []),
+])
+def test_find(prefix, expected):
+    assert sorted(index().find(prefix, limit=2)) == sorted(expected)
+
+
+def test_pending_keys_add_and_discard():
+    prefixes = index(IDS[:1])
+    prefixes.add(parse_id(IDS[1]))
+    assert sorted(prefixes.find("abcdef12")) == IDS[:2]
+    prefixes.discard(parse_id(IDS[1]))
+    prefixes.discard(parse_id(IDS[0]))
+    assert prefixes.find("abcdef12") == []
+
+
+def test_text_keys():
+    prefixes = PrefixIndex(["ручний-1", parse_id(IDS[0])])
+    assert prefixes.find("руч") == ["ручний-1"]
+    prefixes.discard("ручний-1")
+    assert prefixes.find("руч") == []
+
+
+@pytest.mark.parametrize("prefix", ["abcdef1g", "abcdef12_", "a" * 37])
+def test_non_uuid_prefix_has_no_range(prefix):
+    assert uuid_prefix_range(prefix) is None
+
+
+def test_system_resolves_short_ids(system):
+    for index_number, vehicle_id in enumerate(IDS[:3]):
+        system._set("vehicles", vehicle_id, {"id": vehicle_id, "brand": "Toyota", "model": "Corolla", "year": 2015,
+                                             "reg_number": f"R{index_number}", "owner": "Іван",
+                                             "registration_date": "2024-01-01 10:00:00"})
+    found, vehicle = system.find_vehicle_by_prefix(" abcdef99 ")
+    assert found and vehicle["id"] == IDS[2]
+    found, message = system.find_vehicle_by_prefix("abcdef12")
+    assert not found and "кілька" in message
+    assert not system.find_vehicle_by_prefix("ffff")[0]
+
+    add_order(system, IDS[2], order_id=IDS[3])
+    found, order = system.find_order_by_prefix("1234")
+    assert found and order["id"] == IDS[3]
@@ -0,0 +1,55 @@
+import uuid
+
+import pytest
+
+from sto_records import (Vehicle, RepairOrder, OrderRollup, format_id, number_to_timestamp, parse_id,
+                         timestamp_to_number)
+
+
+def test_uuid_ids_are_stored_as_ints():
+    value = str(uuid.uuid4())
+    key = parse_id(value)
+    assert isinstance(key, int)
+    assert format_id(key) == value
+    assert parse_id(value.upper()) == key
+
+
+@pytest.mark.parametrize("value", ["ручний-id", "", None])
+def test_non_uuid_ids_are_kept(value):
+    assert parse_id(value) == value
+    assert format_id(parse_id(value)) == value
+
+
+@pytest.mark.parametrize("value", ["1970-01-01 00:00:00", "2024-02-29 23:59:59", "1969-12-31 12:00:00",
+                                   "2038-01-19 03:14:08"])
+def test_timestamps_round_trip(value):
+    number = timestamp_to_number(value)
+    assert isinstance(number, int)
+    assert number_to_timestamp(number) == value
+
+
+@pytest.mark.parametrize("value", [None, "", "вчора"])
+def test_unparseable_timestamps_are_kept(value):
+    assert timestamp_to_number(value) == value
+    assert number_to_timestamp(value) == value
+
+
+def test_vehicle_round_trip():
+    data = {"id": str(uuid.uuid4()), "brand": "Toyota", "model": "Corolla", "year": 2015, "reg_number": "AA1234BB",
+            "owner": "Іван", "registration_date": "2024-01-01 10:00:00"}
+    vehicle = Vehicle.from_dict(data)
+    assert isinstance(vehicle.uid, int) and isinstance(vehicle.registered_at, int)
+    assert vehicle.to_dict() == data
+    assert dict(vehicle) == data
+    with pytest.raises(TypeError):
+        vehicle["owner"] = "Петро"
+
+
+def test_order_and_rollup_round_trip():
+    order = {"id": str(uuid.uuid4()), "vehicle_id": str(uuid.uuid4()), "date_created": "2024-03-05 08:30:00",
+             "work_type": "Діагностика", "parts": "", "resources": "", "estimated_cost": 150.0,
+             "status": "Не оплачено"}
+    assert RepairOrder.from_dict(order).to_dict() == order
+    assert RepairOrder(*RepairOrder.from_dict(order).to_row()).to_dict() == order
+    rollup = {"vehicle_id": order["vehicle_id"], "orders_count": 3, "total_cost": 450.0}
+    assert OrderRollup.from_dict(rollup).to_dict() == rollup
@@ -0,0 +1,76 @@
+import json
+import asyncio
+
+import pytest
+
+from sto_server import STOService
+from sto_system import STOManagementSystem
+
+
+def request(tmp_path, raw):
+    async def run():
+        system = STOManagementSystem(str(tmp_path / "sto.json"), journal=True)
+        service = STOService(system)
+        server = await service.serve("127.0.0.1", 0)
+        try:
+            reader, writer = await asyncio.open_connection(*server.sockets[0].getsockname()[:2])
+            writer.write(raw)
+            await writer.drain()
+            response = await reader.read()
+            writer.close()
+        finally:
+            server.close()
+            await service.writer.stop()
+            system.close()
+        head, _, body = response.partition(b"\r\n\r\n")
+        return int(head.split()[1]), json.loads(body)
+
+    return asyncio.run(run())
+
+
+@pytest.mark.parametrize("length", [b"abc", b"-5"])
+def test_bad_content_length(tmp_path, length):
+    status, payload = request(tmp_path, b"POST /vehicles HTTP/1.1\r\nContent-Length: " + length + b"\r\n\r\n")
+    assert status == 400
+    assert not payload["ok"]
+
+
+@pytest.mark.parametrize("query", [
+    "/vehicles?limit=0",
+    "/vehicles?limit=-1",
+    "/vehicles?sort_by=colour",
+    "/vehicles?cursor=abc",
+    "/orders?sort_by=estimated_cost&cursor=%7B%22offset%22%3A%201%7D",
+    "/vehicles?sort_by=year&cursor=%7B%22sort_by%22%3A%22year%22%2C%22after%22%3A%5B%22x%22%5D%7D",
+])
+def test_bad_page_params(tmp_path, query):
+    status, payload = request(tmp_path, f"GET {query} HTTP/1.1\r\nConnection: close\r\n\r\n".encode())
+    assert status == 400
+    assert not payload["ok"]
+
+
+def test_list_vehicles(tmp_path):
+    status, payload = request(tmp_path, b"GET /vehicles?limit=5 HTTP/1.1\r\nConnection: close\r\n\r\n")
+    assert status == 200
+    assert payload["items"] == []
+
+
+def post(path, payload):
+    body = json.dumps(payload).encode("utf-8")
+    return (f"POST {path} HTTP/1.1\r\nConnection: close\r\nContent-Length: {len(body)}\r\n\r\n").encode() + body
+
+
+@pytest.mark.parametrize("field", ["brand", "model", "reg_number", "owner"])
+def test_register_rejects_non_string_fields(tmp_path, field):
+    payload = {"brand": "Toyota", "model": "Corolla", "year": 2015, "reg_number": "AA1234BB", "owner": "Іван"}
+    payload[field] = 5
+    status, response = request(tmp_path, post("/vehicles", payload))
+    assert status == 400
+    assert field in response["error"]
+
+
+def test_add_order_rejects_non_string_fields(tmp_path):
+    payload = {"vehicle_id": "abc", "work_type": ["Діагностика"], "estimated_cost": 100}
+    status, response = request(tmp_path, post("/orders", payload))
+    assert status == 400
+    assert "work_type" in response["error"]
@@ -0,0 +1,48 @@
+import pytest
+
+from sto_shards import ShardedSystem, ShardError
+from sto_system import STOManagementSystem
+
+
+def test_refuses_non_shared_journal(tmp_path):
+    data_file = str(tmp_path / "north.json")
+    system = STOManagementSystem(data_file, journal=True)
+    assert system.register_vehicle("Toyota", "Corolla", 2015, "R1", "Іван")[0]
+
+    with pytest.raises(ShardError, match="north"):
+        ShardedSystem({"north": data_file})
+    system.close()
+
+
+def test_opens_shared_journal(tmp_path):
+    data_file = str(tmp_path / "north.json")
+    system = STOManagementSystem(data_file, journal=True, shared=True)
+    assert system.register_vehicle("Toyota", "Corolla", 2015, "R1", "Іван")[0]
+
+    network = ShardedSystem({"north": data_file, "south": str(tmp_path / "south.json")}, home="south")
+    try:
+        assert [row["reg_number"] for row in network.get_vehicles()] == ["R1"]
+    finally:
+        network.close()
+        system.close()
+
+
+def test_failed_send_does_not_desync_replies(tmp_path):
+    network = ShardedSystem({name: str(tmp_path / f"{name}.json") for name in ("a", "b", "c")}, home="a")
+    try:
+        assert network.register_vehicle("Toyota", "Corolla", 2015, "R1", "Іван")[0]
+        worker = network.workers["c"]
+        send = worker.send
+
+        def broken_send(query, *args):
+            raise OSError("зв'язок обірвано")
+
+        worker.send = broken_send
+        with pytest.raises(ShardError):
+            network._scatter("reg", "R1")
+        worker.send = send
+
+        assert network._scatter("reg", "R2") == {"a": None, "b": None, "c": None}
+        assert [row["reg_number"] for row in network.get_vehicles()] == ["R1"]
+    finally:
+        network.close()
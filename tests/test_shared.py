@@ -0,0 +1,16 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"))
+
+import stress_shared  # noqa: E402
+
+
+@pytest.mark.parametrize("seed", [1, 2, 4, 7])
+def test_concurrent_processes_lose_no_writes(seed, capsys):
+    # Малий поріг ущільнення: журнал замінюється багато разів, поки інші процеси пишуть.
+    code = stress_shared.main(["--processes", "6", "--operations", "300", "--compact-threshold", "4096",
+                               "--seed", str(seed)])
+    assert code == 0, capsys.readouterr().out
@@ -0,0 +1,73 @@
+import io
+import os
+import pickle
+import uuid
+
+import pytest
+
+from conftest import register, add_order
+from sto_snapshot import (HEADER, MAGIC, FORMAT_VERSION, convert, is_binary_snapshot, load_binary,
+                          read_snapshot, write_snapshot)
+from sto_system import STOManagementSystem
+
+
+def sample_data(tmp_path):
+    system = STOManagementSystem(str(tmp_path / "source.json"))
+    vehicle_id = register(system, "R1")
+    register(system, "R2", owner="Петро")
+    order_id = str(uuid.uuid4())
+    add_order(system, vehicle_id, 120.5, order_id)
+    assert system.mark_order_paid(order_id)[0]
+    system.close()
+    return read_snapshot(str(tmp_path / "source.json"))[0]
+
+
+def as_dicts(data):
+    return {table: {key: record.to_dict() for key, record in records.items()} for table, records in data.items()}
+
+
+def test_binary_round_trip(tmp_path):
+    data = sample_data(tmp_path)
+    path = str(tmp_path / "sto.bin")
+    write_snapshot(data, path, "binary")
+    assert is_binary_snapshot(path)
+    loaded, snapshot_format = read_snapshot(path)
+    assert snapshot_format == "binary"
+    assert as_dicts(loaded) == as_dicts(data)
+
+
+def test_convert_json_binary_json(tmp_path):
+    source = str(tmp_path / "source.json")
+    data = sample_data(tmp_path)
+    assert convert(source, str(tmp_path / "sto.bin"), "binary") == (2, 1)
+    assert convert(str(tmp_path / "sto.bin"), str(tmp_path / "back.json"), "json") == (2, 1)
+    assert not is_binary_snapshot(str(tmp_path / "back.json"))
+    assert as_dicts(read_snapshot(str(tmp_path / "back.json"))[0]) == as_dicts(data)
+
+
+def test_binary_snapshot_opens_through_system(tmp_path):
+    data = sample_data(tmp_path)
+    path = str(tmp_path / "sto.bin")
+    write_snapshot(data, path, "binary")
+    system = STOManagementSystem(path)
+    assert sorted(row["reg_number"] for row in system.get_vehicles()) == ["R1", "R2"]
+    assert system.check_consistency()
+    system.close()
+
+
+class Foreign:
+    def __reduce__(self):
+        return (os.getcwd, ())
+
+
+def test_unpickler_rejects_foreign_classes():
+    file = io.BytesIO(HEADER.pack(MAGIC, FORMAT_VERSION) + pickle.dumps({"vehicles": [Foreign()]}))
+    with pytest.raises(pickle.UnpicklingError):
+        load_binary(file)
+
+
+def test_rejects_newer_format_and_bad_magic():
+    with pytest.raises(ValueError):
+        load_binary(io.BytesIO(HEADER.pack(MAGIC, FORMAT_VERSION + 1) + pickle.dumps({})))
+    with pytest.raises(ValueError):
+        load_binary(io.BytesIO(HEADER.pack(b"NOTSNAP\x00", FORMAT_VERSION) + pickle.dumps({})))
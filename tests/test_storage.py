@@ -0,0 +1,117 @@
+import uuid
+
+import pytest
+
+from sto_storage import ConflictError
+from sto_system import STOManagementSystem
+
+
+def open_system(path, **kwargs):
+    return STOManagementSystem(str(path), journal=True, **kwargs)
+
+
+def test_torn_journal_line_is_truncated(tmp_path):
+    path = tmp_path / "sto.json"
+    system = open_system(path)
+    assert system.register_vehicle("Toyota", "Corolla", 2015, "R1", "Іван")[0]
+    system.close()
+    with open(str(path) + ".journal", "a", encoding="utf-8") as file:
+        file.write('{"op":"put","table":"vehi')
+
+    system = open_system(path)
+    assert system.register_vehicle("Toyota", "Camry", 2016, "R2", "Петро")[0]
+    assert system.register_vehicle("Honda", "Civic", 2017, "R3", "Олена")[0]
+    system.close()
+
+    system = open_system(path)
+    for reg in ("R1", "R2", "R3"):
+        assert system.storage.vehicle_id_by_reg(reg) is not None
+    system.close()
+
+
+def test_failed_compaction_keeps_commit(tmp_path, monkeypatch):
+    path = tmp_path / "sto.json"
+    system = open_system(path)
+    system.storage.compact_threshold = 1
+
+    def broken_compact(wait=False):
+        raise OSError("диск заповнено")
+
+    monkeypatch.setattr(system.storage, "compact", broken_compact)
+    assert system.register_vehicle("Toyota", "Corolla", 2015, "R1", "Іван")[0]
+    assert system.storage.vehicle_id_by_reg("R1") is not None
+    system.close()
+
+    system = open_system(path)
+    assert system.storage.vehicle_id_by_reg("R1") is not None
+    system.close()
+
+
+def test_concurrent_rollup_update_conflicts(tmp_path, monkeypatch):
+    path = tmp_path / "sto.json"
+    first = open_system(path, shared=True)
+    assert first.register_vehicle("Toyota", "Corolla", 2015, "R1", "Іван")[0]
+    vehicle_id = first.storage.vehicle_id_by_reg("R1")
+    order_ids = []
+    for _ in range(3):
+        order_id = str(uuid.uuid4())
+        assert first.add_repair_order(vehicle_id, "Діагностика", "", "", 100.0, order_id)[0]
+        assert first.mark_order_paid(order_id)[0]
+        order_ids.append(order_id)
+    assert first._archive_chunk(order_ids[:1]) == 1
+
+    second = open_system(path, shared=True)
+    get_rollup = second.storage.get_rollup
+
+    def racing_get_rollup(rollup_vehicle_id):
+        # Перший термінал архівує, поки другий уже в транзакції і читає підсумок.
+        assert first._archive_chunk(order_ids[1:2]) == 1
+        return get_rollup(rollup_vehicle_id)
+
+    monkeypatch.setattr(second.storage, "get_rollup", racing_get_rollup)
+    with pytest.raises(ConflictError):
+        second._archive_chunk(order_ids[2:])
+    second.close()
+    first.close()
+
+    system = open_system(path, shared=True)
+    rollup = system.storage.get_rollup(vehicle_id)
+    assert (rollup["orders_count"], rollup["total_cost"]) == (2, 200.0)
+    assert system.storage.get_order(order_ids[2]) is not None
+    system.close()
+
+
+def test_shared_reader_reloads_journal_compacted_before_first_read(tmp_path):
+    path = tmp_path / "sto.json"
+    reader = open_system(path, shared=True)
+    writer = open_system(path, shared=True)
+    assert writer.register_vehicle("Toyota", "Corolla", 2015, "R1", "Іван")[0]
+    with writer.storage._lock.locked():
+        writer.storage._compact_shared()
+    assert writer.register_vehicle("Toyota", "Camry", 2016, "R2", "Петро")[0]
+
+    reader.storage.refresh()
+    for reg in ("R1", "R2"):
+        assert reader.storage.vehicle_id_by_reg(reg) is not None
+    writer.close()
+    reader.close()
+
+
+def test_snapshot_mode_replays_and_folds_existing_journal(tmp_path):
+    path = tmp_path / "sto.json"
+    system = open_system(path)
+    assert system.register_vehicle("Toyota", "Corolla", 2015, "R1", "Іван")[0]
+    system.close()
+
+    system = STOManagementSystem(str(path))
+    assert system.storage.vehicle_id_by_reg("R1") is not None
+    assert not system.register_vehicle("Toyota", "Camry", 2016, "R1", "Петро")[0]
+    assert system.register_vehicle("Honda", "Civic", 2017, "R2", "Олена")[0]
+    assert system.check_consistency()
+    system.close()
+    assert not (tmp_path / "sto.json.journal").exists()
+
+    system = open_system(path)
+    for reg in ("R1", "R2"):
+        assert system.storage.vehicle_id_by_reg(reg) is not None
+    system.close()
@@ -0,0 +1,34 @@
+import pytest
+
+from conftest import add_order, register
+
+
+def test_data_is_a_read_only_view(system):
+    vehicle_id = register(system, "R1")
+    add_order(system, vehicle_id, cost=150.0)
+    data = system.data
+    assert len(data["vehicles"]) == 1
+    assert list(data["vehicles"]) == [vehicle_id]
+    assert data["vehicles"][vehicle_id]["reg_number"] == "R1"
+    order_id, = data["repair_orders"]
+    assert data["repair_orders"][order_id]["estimated_cost"] == 150.0
+    assert data["repair_orders"][order_id]["vehicle_id"] == vehicle_id
+
+    with pytest.raises(TypeError):
+        data["vehicles"][vehicle_id]["owner"] = "Петро"
+    with pytest.raises(TypeError):
+        data["vehicles"] = {}
+    assert system.storage.get_vehicle(vehicle_id)["owner"] == "Іван"
+
+
+def test_data_follows_changes(system):
+    vehicles = system.data["vehicles"]
+    assert len(vehicles) == 0
+    vehicle_id = register(system, "R1")
+    assert vehicle_id in vehicles
+    assert system.delete_vehicle(vehicle_id)[0]
+    assert vehicle_id not in vehicles
+    with pytest.raises(KeyError):
+        vehicles[vehicle_id]
+    with pytest.raises(KeyError):
+        vehicles[None]
@@ -0,0 +1,129 @@
+import pytest
+
+from sto_table import WIDTH_SAMPLE, Column, Pager, TableRenderer, browse, iter_pages
+
+
+COLUMNS = [Column("№", lambda row: row, align="right"), Column("Текст", lambda row: "x" * row)]
+
+
+class CountingRows:
+    # Ітератор, що рахує прочитані рядки і чи його закрили.
+    def __init__(self, count):
+        self.rows = iter(range(count))
+        self.pulled = 0
+        self.closed = False
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        row = next(self.rows)
+        self.pulled += 1
+        return row
+
+    def close(self):
+        self.closed = True
+
+
+def make_pager(count, page_size=10, sample_size=5):
+    rows = CountingRows(count)
+    return rows, Pager(rows, TableRenderer(COLUMNS, sample_size), page_size)
+
+
+def test_renderer_truncates_and_aligns():
+    renderer = TableRenderer([Column("№", str, align="right"), Column("Текст", lambda row: "x" * row, max_width=6)],
+                             sample_size=2)
+    lines = list(renderer.render([3, 12, 500]))
+    assert lines == [" №  Текст", "--  ------", " 3  xxx", "12  xxxxx…", "5…  xxxxx…"]
+
+
+def test_renderer_widths_come_from_sample_only():
+    renderer = TableRenderer([Column("Текст", lambda row: "x" * row)], sample_size=2)
+    lines = list(renderer.render([1, 7, 30]))
+    assert renderer.widths == [7]
+    assert lines[-1] == "xxxxxx…"
+
+
+def test_pages_are_fetched_lazily():
+    rows, pager = make_pager(100)
+    assert len(pager.page(0)) == 10
+    # Сторінка плюс один рядок, щоб знати, чи є наступна.
+    assert rows.pulled == 11
+    assert pager.page_count() is None
+    assert len(pager.page(2)) == 10
+    assert rows.pulled == 31
+    assert not rows.closed
+
+
+def test_previous_pages_are_not_refetched():
+    rows, pager = make_pager(100)
+    first = pager.page(0)
+    pager.page(3)
+    pulled = rows.pulled
+    assert pager.page(0) == first
+    assert rows.pulled == pulled
+
+
+def test_last_page_and_page_count():
+    rows, pager = make_pager(25)
+    assert len(pager.page(2)) == 5
+    assert pager.page_count() == 3
+    assert not pager.has_page(3)
+    assert pager.page(3) is None
+    assert pager.page(-1) is None
+    assert rows.closed
+
+
+@pytest.mark.parametrize("count, pages", [(0, 1), (10, 1), (11, 2)])
+def test_page_count_boundaries(count, pages):
+    _, pager = make_pager(count)
+    assert len(pager.page(0)) == min(count, 10)
+    assert not pager.has_page(pages)
+    assert pager.page_count() == pages
+
+
+def test_iter_pages_requests_next_chunk_on_demand():
+    calls = []
+
+    def fetch(cursor, limit):
+        calls.append(cursor)
+        start = cursor or 0
+        rows = list(range(start, min(start + limit, 7)))
+        return rows, (start + limit if start + limit < 7 else None)
+
+    rows = iter_pages(fetch, chunk_size=3)
+    assert [next(rows) for _ in range(3)] == [0, 1, 2]
+    assert calls == [None]
+    assert list(rows) == [3, 4, 5, 6]
+    assert calls == [None, 3, 6]
+
+
+def run_browse(count, answers, page_size=10):
+    rows = CountingRows(count)
+    answers = iter(answers)
+    output = []
+    browse(rows, COLUMNS, page_size, "Порожньо.", prompt=lambda text: next(answers), output=output.append)
+    return rows, output
+
+
+def test_browse_navigates_forward_and_back():
+    rows, output = run_browse(25, ["n", "p", "n", "n", "q"])
+    footers = [line.strip() for line in output if line.strip().startswith("Сторінка")]
+    assert footers == ["Сторінка 1 з 3, рядки 1–10", "Сторінка 2 з 3, рядки 11–20", "Сторінка 1 з 3, рядки 1–10",
+                       "Сторінка 2 з 3, рядки 11–20", "Сторінка 3 з 3, рядки 21–25"]
+    assert rows.closed
+
+
+def test_browse_quits_without_reading_everything():
+    rows, output = run_browse(1000, ["q"])
+    # Прочитано лише вибірку для ширини стовпців, тож загальна кількість сторінок невідома.
+    assert rows.pulled == WIDTH_SAMPLE
+    assert output[-1].strip() == "Сторінка 1, рядки 1–10"
+    assert rows.closed
+
+
+def test_browse_single_page_and_empty():
+    _, output = run_browse(3, [])
+    assert output[-1].strip() == "Сторінка 1 з 1, рядки 1–3"
+    _, output = run_browse(0, [])
+    assert output == ["Порожньо."]
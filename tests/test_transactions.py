@@ -0,0 +1,64 @@
+import pytest
+
+from conftest import register
+from sto_system import STOManagementSystem
+
+
+def vehicle(reg_number, year=2015):
+    return {"brand": "Toyota", "model": "Corolla", "year": year, "reg_number": reg_number, "owner": "Іван"}
+
+
+def test_bulk_register_is_all_or_nothing(system):
+    register(system, "R1")
+    ok, message = system.bulk_register_vehicles([vehicle("R2"), vehicle("R1"), vehicle("R3", year="2015"),
+                                                 vehicle("R2")])
+    assert not ok
+    assert "Рядок 2" in message and "Рядок 3" in message and "Рядок 4" in message
+    assert [row["reg_number"] for row in system.get_vehicles()] == ["R1"]
+
+    assert system.bulk_register_vehicles([vehicle("R2"), vehicle("R3")])[0]
+    assert sorted(row["reg_number"] for row in system.get_vehicles()) == ["R1", "R2", "R3"]
+
+
+def test_bulk_orders_are_all_or_nothing(system):
+    vehicle_id = register(system, "R1")
+    orders = [{"vehicle_id": vehicle_id, "work_type": "Діагностика", "estimated_cost": 100.0},
+              {"vehicle_id": "немає", "work_type": "Діагностика", "estimated_cost": 100.0},
+              {"vehicle_id": vehicle_id, "work_type": "Діагностика", "estimated_cost": "100"}]
+    ok, message = system.bulk_add_repair_orders(orders)
+    assert not ok
+    assert "Рядок 2" in message and "Рядок 3" in message
+    assert system.get_repair_orders() == []
+
+    assert system.bulk_add_repair_orders(orders[:1] * 3)[0]
+    assert len(system.get_repair_orders()) == 3
+
+
+def test_nested_transaction_rolls_back_to_savepoint(system):
+    with system.transaction():
+        system._create_vehicle("Toyota", "Corolla", 2015, "R1", "Іван")
+        with pytest.raises(RuntimeError):
+            with system.transaction():
+                system._create_vehicle("Honda", "Civic", 2017, "R2", "Олена")
+                raise RuntimeError("скасування")
+    assert system.storage.vehicle_id_by_reg("R1") is not None
+    assert system.storage.vehicle_id_by_reg("R2") is None
+    assert system.check_consistency()
+
+
+@pytest.mark.parametrize("data_file, journal", [("sto.json", False), ("sto.json", True), ("sto.db", False)])
+def test_committed_transaction_survives_reload(tmp_path, data_file, journal):
+    path = str(tmp_path / data_file)
+    system = STOManagementSystem(path, journal=journal)
+    with system.transaction():
+        for index in range(3):
+            system._create_vehicle("Toyota", "Corolla", 2015, f"R{index}", "Іван")
+    with pytest.raises(RuntimeError):
+        with system.transaction():
+            system._create_vehicle("Toyota", "Corolla", 2015, "R9", "Іван")
+            raise RuntimeError("скасування")
+    system.close()
+
+    system = STOManagementSystem(path, journal=journal)
+    assert sorted(row["reg_number"] for row in system.get_vehicles()) == ["R0", "R1", "R2"]
+    system.close()